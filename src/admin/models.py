@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+
+class DatabasePoolStatus(BaseModel):
+    size: int = Field(..., description="Connections the pool keeps open")
+    checked_out: int = Field(..., description="Connections currently in use")
+    overflow: int = Field(..., description="Connections open beyond the pool size, negative if the pool isn't full yet")
+    checkouts: int = Field(..., description="Connections checked out since the worker started")
+    timeouts: int = Field(..., description="Checkouts that timed out waiting for a connection")
+    average_wait: float = Field(..., description="Average time in seconds spent waiting for a connection")
+    max_wait: float = Field(..., description="Longest time in seconds spent waiting for a connection")
+
+
+class RouteSessionUsage(BaseModel):
+    route: str = Field(..., description="Path of the route")
+    sessions: int = Field(..., description="Requests that were given a database session")
+    unused: int = Field(..., description="Sessions that never ran a query, so never checked out a connection")
@@ -1,4 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, status
+
+import database
+from admin.models import DatabasePoolStatus, RouteSessionUsage
+from dependencies import perm_admin
+from utils.shared_models import DetailModel
 
 router = APIRouter(
     prefix="/admin",
@@ -6,3 +11,54 @@ router = APIRouter(
 )
 
 # TODO: get logs info & enable admins to access it
+
+
+@router.get(
+    "/database/pool",
+    description="""
+        Connection pool usage of the worker that handles this request. Each gunicorn worker has its own pool.
+        Checkouts that wait or time out mean the pool is too small for the load.
+    """,
+    response_model=DatabasePoolStatus,
+    responses={
+        403: {"description": "must be a website admin", "model": DetailModel},
+        503: {"description": "the database pool isn't instrumented", "model": DetailModel},
+    },
+    operation_id="get_database_pool_status",
+    dependencies=[Depends(perm_admin)],
+)
+async def get_database_pool_status():
+    pool = database.sessionmanager.engine.pool if database.sessionmanager is not None else None
+    if not isinstance(pool, database.InstrumentedQueuePool):
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "database pool isn't instrumented")
+
+    metrics = pool.metrics
+    return DatabasePoolStatus(
+        size=pool.size(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+        checkouts=metrics.checkouts,
+        timeouts=metrics.timeouts,
+        average_wait=metrics.total_wait / metrics.checkouts if metrics.checkouts else 0.0,
+        max_wait=metrics.max_wait,
+    )
+
+
+@router.get(
+    "/database/sessions",
+    description="""
+        How often each route's database session went unused, for the worker that handles this request.
+        An unused session never checks out a connection from the pool.
+    """,
+    response_model=list[RouteSessionUsage],
+    responses={
+        403: {"description": "must be a website admin", "model": DetailModel},
+    },
+    operation_id="get_database_session_usage",
+    dependencies=[Depends(perm_admin)],
+)
+async def get_database_session_usage():
+    return [
+        RouteSessionUsage(route=route, sessions=usage.sessions, unused=usage.unused)
+        for route, usage in sorted(database.session_usage.items())
+    ]
@@ -0,0 +1,29 @@
+"""flag officer terms until they end
+
+Revision ID: c2f67d848b72
+Revises: 64c4c589b8f0
+Create Date: 2026-10-19 00:34:14.638529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f67d848b72'
+down_revision: Union[str, None] = '64c4c589b8f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # is_active now means the term hasn't ended yet, so upcoming terms are flagged as soon as they're inserted
+    op.alter_column('officer_term', 'is_active', server_default=sa.text('true'))
+    op.execute("UPDATE officer_term SET is_active = end_date IS NULL OR end_date >= current_date")
+
+
+def downgrade() -> None:
+    op.alter_column('officer_term', 'is_active', server_default=sa.text('false'))
+    op.execute("UPDATE officer_term SET is_active = start_date <= current_date AND (end_date IS NULL OR end_date >= current_date)")
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
 
+import admin.urls
 import candidates.urls
 import database
 import elections.urls
@@ -15,6 +16,7 @@ router = APIRouter(
     dependencies=[Depends(require_trusted_origin)],
 )
 
+router.include_router(admin.urls.router)
 router.include_router(elections.urls.router)
 router.include_router(candidates.urls.router)
 router.include_router(nominees.urls.router)
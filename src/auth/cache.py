@@ -0,0 +1,149 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+
+from auth.constants import SESSION_CACHE_MAX_ENTRIES, SESSION_CACHE_TTL, UserRole
+from auth.tables import SiteUserRoleDB
+
+_logger = logging.getLogger(__name__)
+
+# Key used to remember which users had their roles changed within an ORM session
+_ROLE_CHANGES_KEY = "auth_cache_role_changes"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedSession:
+    """
+    A resolved user session.
+
+    Attributes:
+        computing_id: the computing ID the session belongs to
+        expires_at: the datetime when the session expires
+        roles: every role the user satisfies, including the ones implied by the role hierarchy
+    """
+
+    computing_id: str
+    expires_at: datetime
+    roles: frozenset[UserRole]
+
+
+class SessionCache:
+    """
+    In-memory TTL cache from a session hash to its resolved session, used by `/auth/verify`.
+
+    Each gunicorn worker has its own cache, so invalidations only apply to the current process.
+    Other workers will pick up changes once their entries reach the TTL. Other routes read sessions from the
+    database, so they never accept a session that has been logged out or revoked.
+    """
+
+    def __init__(self, ttl: float = SESSION_CACHE_TTL, max_entries: int = SESSION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[bytes, tuple[float, CachedSession]] = {}
+        # computing_id -> session hashes, so a user's sessions can be dropped without a full scan
+        self._user_index: dict[str, set[bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, session_hash: bytes) -> CachedSession | None:
+        """Returns the cached session, or None if it isn't cached, is stale, or has expired."""
+        entry = self._entries.get(session_hash)
+        if entry is None:
+            return None
+
+        cached_at, session = entry
+        if time.monotonic() - cached_at > self.ttl or session.expires_at < datetime.now(UTC):
+            self.invalidate_session(session_hash)
+            return None
+
+        return session
+
+    def put(self, session_hash: bytes, session: CachedSession) -> None:
+        if session_hash not in self._entries and len(self._entries) >= self.max_entries:
+            self._evict()
+
+        self.invalidate_session(session_hash)
+        self._entries[session_hash] = (time.monotonic(), session)
+        self._user_index.setdefault(session.computing_id, set()).add(session_hash)
+
+    def invalidate_session(self, session_hash: bytes) -> None:
+        entry = self._entries.pop(session_hash, None)
+        if entry is None:
+            return
+
+        computing_id = entry[1].computing_id
+        user_sessions = self._user_index.get(computing_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_hash)
+            if not user_sessions:
+                del self._user_index[computing_id]
+
+    def invalidate_user(self, computing_id: str) -> None:
+        for session_hash in self._user_index.pop(computing_id, set()):
+            self._entries.pop(session_hash, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._user_index.clear()
+
+    def _evict(self) -> None:
+        """Drop stale entries, or the oldest one if everything is still fresh."""
+        now = time.monotonic()
+        stale = [session_hash for session_hash, (cached_at, _) in self._entries.items() if now - cached_at > self.ttl]
+        for session_hash in stale:
+            self.invalidate_session(session_hash)
+
+        if len(self._entries) >= self.max_entries:
+            # dicts keep insertion order, so the first key is the oldest entry
+            self.invalidate_session(next(iter(self._entries)))
+
+
+session_cache = SessionCache()
+
+
+# ----------------------- #
+# invalidation
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_role_changes(session: Session, _: UOWTransaction):
+    changed = {
+        instance.computing_id
+        for instance in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(instance, SiteUserRoleDB)
+    }
+    if not changed:
+        return
+
+    for computing_id in changed:
+        session_cache.invalidate_user(computing_id)
+    session.info.setdefault(_ROLE_CHANGES_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_role_changes(session: Session):
+    # Entries may have been re-populated between the flush and the commit, so invalidate again
+    for computing_id in session.info.pop(_ROLE_CHANGES_KEY, set()):
+        session_cache.invalidate_user(computing_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_role_changes(session: Session, _):
+    session.info.pop(_ROLE_CHANGES_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_bulk_role_changes(orm_execute_state: ORMExecuteState):
+    # Bulk INSERT/UPDATE/DELETE statements don't go through the unit of work, so we can't tell who changed
+    if orm_execute_state.is_select:
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is SiteUserRoleDB:
+        _logger.debug("bulk change to site_user_role, clearing the session cache")
+        session_cache.clear()
@@ -16,6 +16,12 @@ SESSION_MAX_AGE = timedelta(seconds=COOKIE_MAX_AGE)
 
 REDIRECT_TTL = 60 * 5  # 5 minutes in seconds
 
+SESSION_CACHE_TTL = 30  # seconds a resolved session is trusted before it's read from the database again
+SESSION_CACHE_MAX_ENTRIES = 10_000
+
+RATE_LIMIT_KEY_LEN = 128  # long enough for a route, an IPv6 address, or a computing ID
+RATE_LIMIT_MAX_ENTRIES = 10_000  # buckets kept by each worker when rate limits are stored in memory
+
 SITE_USER_ROLE_MAX_LENGTH = 32  # Max length of a user permission string
 
 
@@ -3,17 +3,19 @@ from datetime import UTC, datetime, timedelta
 from hashlib import sha256
 
 import sqlalchemy
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
-from auth.constants import REDIRECT_TTL, SESSION_MAX_AGE
-from auth.tables import AuthRedirectDB, SiteUserDB, SiteUserRoleDB, UserSessionDB
+import statements
+from auth.cache import session_cache
+from auth.constants import REDIRECT_TTL, SESSION_MAX_AGE, UserRole
+from auth.tables import AuthRedirectDB, RateLimitBucketDB, SiteUserDB, SiteUserRoleDB, UserSessionDB
 
 _logger = logging.getLogger(__name__)
 
 
-def _hash_session_id(session_id: str) -> bytes:
+def hash_session_id(session_id: str) -> bytes:
     return sha256(session_id.encode("utf-8")).digest()
 
 
@@ -21,11 +23,11 @@ async def create_user_session(db_session: AsyncSession, session_id: str, computi
     """
     Adds the new user to the SiteUser table if it's their first time logging in.
 
-    A user can have multiple sessions.
+    A user can have multiple sessions. The user upsert and the session insert are done in a single statement.
     """
     now = datetime.now(UTC)
 
-    session_hash = _hash_session_id(session_id)
+    session_hash = hash_session_id(session_id)
 
     # Upsert the site user
     # Create a new user if it's their first login...
@@ -38,33 +40,81 @@ async def create_user_session(db_session: AsyncSession, session_id: str, computi
     user_query = user_query.on_conflict_do_update(
         index_elements=[SiteUserDB.computing_id], set_={"last_logged_in": now}
     )
-    await db_session.execute(user_query)
-
-    # Create a new session
-    user_session = UserSessionDB(
-        session_hash=session_hash,
-        computing_id=computing_id,
-        created_at=now,
-        expires_at=now + SESSION_MAX_AGE,
+    site_user = user_query.returning(SiteUserDB.computing_id).cte("site_user_upsert")
+
+    # Create a new session for the upserted user
+    session_query = insert(UserSessionDB).from_select(
+        [UserSessionDB.session_hash, UserSessionDB.computing_id, UserSessionDB.created_at, UserSessionDB.expires_at],
+        sqlalchemy.select(
+            sqlalchemy.literal(session_hash, UserSessionDB.session_hash.type),
+            site_user.c.computing_id,
+            sqlalchemy.literal(now, UserSessionDB.created_at.type),
+            sqlalchemy.literal(now + SESSION_MAX_AGE, UserSessionDB.expires_at.type),
+        ),
     )
-    db_session.add(user_session)
+    await db_session.execute(session_query)
 
     return session_hash
 
 
 async def remove_user_session_by_id(db_session: AsyncSession, session_id: str):
-    session_hash = _hash_session_id(session_id)
+    session_hash = hash_session_id(session_id)
+    session_cache.invalidate_session(session_hash)
     user_session = await db_session.get(UserSessionDB, session_hash)
     if user_session is not None:
         await db_session.delete(user_session)
 
 
 async def remove_user_session_by_hash(db_session: AsyncSession, session_hash: bytes):
+    session_cache.invalidate_session(session_hash)
     user_session = await db_session.get(UserSessionDB, session_hash)
     if user_session is not None:
         await db_session.delete(user_session)
 
 
+async def get_user_sessions(db_session: AsyncSession, computing_id: str) -> list[UserSessionDB]:
+    """
+    Retrieves every session of a user, including expired ones that haven't been cleaned up yet.
+
+    Args:
+        db_session: database transaction
+        computing_id: computing ID of the user
+
+    Returns:
+        The user's sessions, most recently created first.
+    """
+    query = (
+        sqlalchemy.select(UserSessionDB)
+        .where(UserSessionDB.computing_id == computing_id)
+        .order_by(UserSessionDB.created_at.desc())
+    )
+    return list((await db_session.scalars(query)).all())
+
+
+async def remove_user_sessions(db_session: AsyncSession, computing_id: str) -> int:
+    """
+    Deletes every session of a user in a single statement, logging them out everywhere.
+
+    The sessions are only dropped from this worker's session cache. Other workers may still accept them in
+    `/auth/verify` for up to `SESSION_CACHE_TTL` seconds, but every other route reads sessions from the database.
+
+    Args:
+        db_session: database transaction
+        computing_id: computing ID of the user
+
+    Returns:
+        The number of sessions that were deleted.
+    """
+    query = (
+        sqlalchemy.delete(UserSessionDB)
+        .where(UserSessionDB.computing_id == computing_id)
+        .returning(UserSessionDB.session_hash)
+    )
+    session_hashes = (await db_session.scalars(query)).all()
+    session_cache.invalidate_user(computing_id)
+    return len(session_hashes)
+
+
 async def get_session_computing_id(db_session: AsyncSession, session_id: str) -> str | None:
     """
     Retrieves the computing ID from a session.
@@ -76,13 +126,62 @@ async def get_session_computing_id(db_session: AsyncSession, session_id: str) ->
     Returns:
         The computing ID associated with the session, or None if the session is invalid or expired.
     """
-    session_hash = _hash_session_id(session_id)
-    user_session = await db_session.get(UserSessionDB, session_hash)
+    session_hash = hash_session_id(session_id)
+    return await db_session.scalar(statements.session_computing_id(session_hash, datetime.now(UTC)))
+
 
-    if not user_session or user_session.expires_at < datetime.now(UTC):
+async def get_session_with_roles(
+    db_session: AsyncSession, session_hash: bytes
+) -> tuple[str, datetime, list[UserRole]] | None:
+    """
+    Retrieves a session and the roles of its user in a single query.
+
+    Args:
+        db_session: database transaction
+        session_hash: hash of the session ID
+
+    Returns:
+        A tuple of (computing_id, expires_at, roles), or None if the session is invalid or expired.
+    """
+    query = (
+        sqlalchemy.select(UserSessionDB.computing_id, UserSessionDB.expires_at, SiteUserRoleDB.role)
+        .outerjoin(SiteUserRoleDB, SiteUserRoleDB.computing_id == UserSessionDB.computing_id)
+        .where(UserSessionDB.session_hash == session_hash, UserSessionDB.expires_at >= datetime.now(UTC))
+    )
+    rows = (await db_session.execute(query)).all()
+    if not rows:
         return None
 
-    return user_session.computing_id
+    computing_id, expires_at, _ = rows[0]
+    return computing_id, expires_at, [row.role for row in rows if row.role is not None]
+
+
+async def extend_user_sessions(db_session: AsyncSession, session_hashes: list[bytes], expires_at: datetime) -> int:
+    """
+    Extends many sessions in a single statement. Sessions are never shortened.
+
+    Args:
+        db_session: database transaction
+        session_hashes: hashes of the sessions to extend
+        expires_at: the new expiry of the sessions
+
+    Returns:
+        The number of sessions that were extended.
+    """
+    query = (
+        sqlalchemy.update(UserSessionDB)
+        .where(
+            UserSessionDB.session_hash
+            == sqlalchemy.any_(
+                sqlalchemy.bindparam("session_hashes", session_hashes, type_=ARRAY(sqlalchemy.LargeBinary))
+            ),
+            UserSessionDB.expires_at < expires_at,
+        )
+        .values(expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db_session.execute(query)
+    return result.rowcount
 
 
 # remove all out of date user sessions
@@ -94,19 +193,18 @@ async def task_clean_expired_user_sessions(db_session: AsyncSession):
 
 # get the site user given a session ID; returns None when session is invalid
 async def get_site_user(db_session: AsyncSession, session_id: str) -> SiteUserDB | None:
-    session_hash = _hash_session_id(session_id)
-    user_session = await db_session.get(UserSessionDB, session_hash)
-
-    if user_session is None or user_session.expires_at < datetime.now(UTC):
-        return None
-
+    # the session, the user and their roles are all fetched in a single query
     result = await db_session.execute(
         sqlalchemy.select(SiteUserDB)
-        .options(selectinload(SiteUserDB.roles))
-        .where(SiteUserDB.computing_id == user_session.computing_id)
+        .join(UserSessionDB, UserSessionDB.computing_id == SiteUserDB.computing_id)
+        .options(joinedload(SiteUserDB.roles))
+        .where(
+            UserSessionDB.session_hash == hash_session_id(session_id),
+            UserSessionDB.expires_at >= datetime.now(UTC),
+        )
     )
 
-    return result.scalar_one_or_none()
+    return result.unique().scalar_one_or_none()
 
 
 async def site_user_exists(db_session: AsyncSession, computing_id: str) -> bool:
@@ -123,6 +221,13 @@ def create_auth_redirect(db_session: AsyncSession, token: str, return_to: str) -
     db_session.add(entry)
 
 
+# remove the redirects of login attempts that were never completed
+async def task_clean_expired_auth_redirects(db_session: AsyncSession):
+    query = sqlalchemy.delete(AuthRedirectDB).where(AuthRedirectDB.expires_at < datetime.now(UTC))
+    await db_session.execute(query)
+    await db_session.commit()
+
+
 async def get_auth_redirect(db_session: AsyncSession, token: str) -> AuthRedirectDB | None:
     return await db_session.get(AuthRedirectDB, token)
 
@@ -152,3 +257,52 @@ async def get_user_roles(db_session: AsyncSession, computing_id: str) -> list[Si
     )
 
     return list(roles.scalars().all())
+
+
+async def take_rate_limit_token(db_session: AsyncSession, key: str, capacity: int, refill_rate: float) -> bool:
+    """
+    Takes a token from a rate limit bucket, creating a full bucket if it doesn't exist yet.
+
+    This is a single upsert, so concurrent workers can't both take the last token. The update only applies when the
+    refilled bucket has a token left, so a row is returned if and only if the token was taken.
+
+    Args:
+        db_session: database transaction
+        key: what is being rate limited
+        capacity: the maximum number of tokens in the bucket
+        refill_rate: tokens added to the bucket per second
+
+    Returns:
+        True if a token was taken, False if the bucket is empty.
+    """
+    now = sqlalchemy.func.now()
+    elapsed = sqlalchemy.cast(sqlalchemy.extract("epoch", now - RateLimitBucketDB.updated_at), sqlalchemy.Float)
+    refilled = sqlalchemy.func.least(capacity, RateLimitBucketDB.tokens + elapsed * refill_rate)
+
+    query = (
+        insert(RateLimitBucketDB)
+        .values(key=key, tokens=capacity - 1, updated_at=now)
+        .on_conflict_do_update(
+            index_elements=[RateLimitBucketDB.key],
+            set_={"tokens": refilled - 1, "updated_at": now},
+            where=refilled >= 1,
+        )
+        .returning(RateLimitBucketDB.key)
+    )
+    return await db_session.scalar(query) is not None
+
+
+async def task_clean_refilled_rate_limit_buckets(db_session: AsyncSession, refill_time: float):
+    """
+    Deletes the rate limit buckets that haven't been used for long enough to refill.
+    A missing bucket is the same as a full one, so this doesn't change any limits.
+
+    Args:
+        db_session: database transaction
+        refill_time: seconds it takes an empty bucket to refill
+    """
+    query = sqlalchemy.delete(RateLimitBucketDB).where(
+        RateLimitBucketDB.updated_at < datetime.now(UTC) - timedelta(seconds=refill_time)
+    )
+    await db_session.execute(query)
+    await db_session.commit()
@@ -43,3 +43,14 @@ class SiteUser(UserInfo):
 
     first_logged_in: datetime | None = Field(..., description="Time the user was created")
     last_logged_in: datetime | None = Field(..., description="Time the user last logged in")
+
+
+class UserSession(UserBaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    created_at: datetime = Field(..., description="Time the session was created")
+    expires_at: datetime = Field(..., description="Time the session expires")
+
+
+class UserSessionsRevoked(BaseModel):
+    revoked: int = Field(..., description="Number of sessions that were revoked")
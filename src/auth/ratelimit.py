@@ -0,0 +1,142 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import auth.crud
+import database
+from auth.constants import RATE_LIMIT_MAX_ENTRIES
+from config import settings
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """
+    Token bucket parameters.
+
+    Attributes:
+        capacity: the number of requests that can be made in a burst
+        refill_rate: tokens added back to the bucket per second
+    """
+
+    capacity: int
+    refill_rate: float
+
+
+class MemoryRateLimitStore:
+    """
+    Token buckets kept in the worker's memory.
+
+    Each gunicorn worker has its own buckets, so the effective limit is multiplied by the number of workers.
+    """
+
+    def __init__(self, max_entries: int = RATE_LIMIT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # key -> (tokens, monotonic time they were counted at); ordered from least to most recently used
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, _: AsyncSession | None, key: str, limit: RateLimit) -> bool:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (limit.capacity, now))
+        tokens = min(limit.capacity, tokens + (now - updated_at) * limit.refill_rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        if len(self._buckets) >= self.max_entries:
+            # the least recently used bucket has had the longest to refill
+            del self._buckets[next(iter(self._buckets))]
+        self._buckets[key] = (tokens, now)
+        return allowed
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class PostgresRateLimitStore:
+    """Token buckets kept in the `rate_limit_bucket` table, so the limits are shared by every worker."""
+
+    async def take(self, db_session: AsyncSession, key: str, limit: RateLimit) -> bool:
+        allowed = await auth.crud.take_rate_limit_token(db_session, key, limit.capacity, limit.refill_rate)
+        # commit right away, so the token stays taken even if the rest of the request fails
+        await db_session.commit()
+        return allowed
+
+
+memory_rate_limit_store = MemoryRateLimitStore()
+postgres_rate_limit_store = PostgresRateLimitStore()
+
+
+def _login_rate_limit() -> RateLimit:
+    return RateLimit(
+        capacity=settings.login_rate_limit_burst,
+        refill_rate=settings.login_rate_limit_per_minute / 60,
+    )
+
+
+async def check_login_rate_limit(db_session: AsyncSession, key: str) -> None:
+    """
+    Takes a token from the login rate limit bucket for `key`.
+
+    Args:
+        db_session: database transaction, only used when rate limits are stored in postgres
+        key: what is being rate limited
+
+    Raises:
+        HTTPException: 429 if the bucket is empty
+    """
+    limit = _login_rate_limit()
+    store = postgres_rate_limit_store if settings.login_rate_limit_backend == "postgres" else memory_rate_limit_store
+    if await store.take(db_session, key, limit):
+        return
+
+    _logger.warning("login rate limit exceeded for %s", key)
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts, try again later",
+        headers={"Retry-After": str(math.ceil(1 / limit.refill_rate))},
+    )
+
+
+async def task_clean_rate_limit_buckets(db_session: AsyncSession) -> None:
+    """Keeps the `rate_limit_bucket` table from growing with every IP address and user that ever logged in."""
+    if settings.login_rate_limit_backend != "postgres":
+        return
+    limit = _login_rate_limit()
+    await auth.crud.task_clean_refilled_rate_limit_buckets(db_session, limit.capacity / limit.refill_rate)
+
+
+def client_ip(request: Request) -> str:
+    """
+    The IP address of the client that made the request.
+
+    Behind a trusted proxy, the connection comes from the proxy, so the client is the address it forwarded instead.
+    X-Real-IP is preferred, since nginx sets it to the address it saw. Otherwise the last X-Forwarded-For entry is
+    used, as the entries before it come from the client and can be forged.
+    """
+    # connections over a unix socket have no address
+    peer = request.client.host if request.client is not None else "unix"
+    if peer not in settings.trusted_proxies:
+        return peer
+
+    real_ip = request.headers.get("x-real-ip", "").strip()
+    if real_ip:
+        return real_ip
+    forwarded_for = request.headers.get("x-forwarded-for", "").split(",")[-1].strip()
+    if forwarded_for:
+        return forwarded_for
+    return peer
+
+
+async def limit_logins_by_ip(request: Request, db_session: database.DBSession) -> None:
+    """Rate limits each auth route per client IP address; runs before the route touches the database."""
+    await check_login_rate_limit(db_session, f"ip:{request.url.path}:{client_ip(request)}")
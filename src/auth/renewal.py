@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import dataclasses
+import logging
+from datetime import UTC, datetime, timedelta
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import auth.crud
+import database
+from auth.cache import CachedSession, session_cache
+from auth.constants import COOKIE_MAX_AGE, COOKIE_PATH, COOKIE_SAMESITE, COOKIE_SESSION_KEY, SESSION_MAX_AGE
+from config import settings
+
+_logger = logging.getLogger(__name__)
+
+# Key in the request state holding the ID of a session whose cookie needs to be re-issued
+RENEWED_SESSION_STATE_KEY = "renewed_session_id"
+
+
+class SessionRenewer:
+    """
+    Slides session expiry forward for active users.
+
+    A session is extended at most once per `renewal_interval`, and extensions are queued in memory and written
+    in batches of one UPDATE statement, so an active user doesn't cost a write on every request.
+    """
+
+    def __init__(self, renewal_interval: timedelta, flush_interval: float):
+        self.renewal_interval = renewal_interval
+        self.flush_interval = flush_interval
+        self._pending: dict[bytes, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def maybe_renew(self, session_hash: bytes, expires_at: datetime) -> datetime | None:
+        """
+        Queue an extension of the session if it hasn't been extended in the last renewal interval.
+
+        Args:
+            session_hash: hash of the session ID
+            expires_at: the current expiry of the session
+
+        Returns:
+            The new expiry if the session was queued for renewal, None otherwise.
+        """
+        if session_hash in self._pending:
+            return None
+
+        now = datetime.now(UTC)
+        # A session is created or extended with the full max age, so the remaining lifetime tells us
+        # how long ago that happened
+        if expires_at - now > SESSION_MAX_AGE - self.renewal_interval:
+            return None
+
+        new_expires_at = now + SESSION_MAX_AGE
+        self._pending[session_hash] = new_expires_at
+        return new_expires_at
+
+    def clear(self) -> None:
+        self._pending.clear()
+
+    async def flush(self, db_session: AsyncSession) -> int:
+        """
+        Write all queued renewals in one statement.
+
+        Returns:
+            The number of sessions that were extended.
+        """
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        try:
+            # Every renewal in the batch was queued within the last flush interval, so extending them all to the
+            # latest expiry only lengthens some sessions by a few seconds
+            count = await auth.crud.extend_user_sessions(db_session, list(pending), max(pending.values()))
+            await db_session.commit()
+        except Exception:
+            # put them back so the next flush can retry, without clobbering anything queued in the meantime
+            self._pending = pending | self._pending
+            raise
+
+        return count
+
+    async def run(self) -> None:
+        """Flush queued renewals forever; meant to be run as a background task."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush_with_new_session()
+
+    async def flush_with_new_session(self) -> None:
+        if not self._pending or database.sessionmanager is None:
+            return
+
+        try:
+            async with database.sessionmanager.session() as db_session:
+                count = await self.flush(db_session)
+            _logger.debug("renewed %s user sessions", count)
+        except Exception:
+            _logger.exception("failed to renew user sessions")
+
+
+session_renewer = SessionRenewer(
+    renewal_interval=timedelta(seconds=settings.session_renewal_interval),
+    flush_interval=settings.session_renewal_flush_interval,
+)
+
+
+def renew_session(
+    request: Request,
+    session_id: str,
+    user_session: CachedSession,
+    reissue_cookie: bool = True,
+) -> None:
+    """
+    Slide the expiry of an active session forward, and have the session cookie re-issued with the response.
+
+    Args:
+        request: the request the session was used for
+        session_id: the session ID from the request's cookie
+        user_session: the resolved session
+        reissue_cookie: whether to re-issue the cookie; off for responses whose headers never reach the browser
+    """
+    session_hash = auth.crud.hash_session_id(session_id)
+    new_expires_at = session_renewer.maybe_renew(session_hash, user_session.expires_at)
+    if new_expires_at is None:
+        return
+
+    session_cache.put(session_hash, dataclasses.replace(user_session, expires_at=new_expires_at))
+    if reissue_cookie:
+        setattr(request.state, RENEWED_SESSION_STATE_KEY, session_id)
+
+
+def _session_cookie_header(session_id: str) -> bytes:
+    response = Response()
+    response.set_cookie(
+        key=COOKIE_SESSION_KEY,
+        value=session_id,
+        secure=settings.cookie_secure,
+        httponly=True,
+        samesite=COOKIE_SAMESITE,
+        domain=settings.cookie_domain,
+        max_age=COOKIE_MAX_AGE,
+        path=COOKIE_PATH,
+    )
+    return next(value for key, value in response.raw_headers if key == b"set-cookie")
+
+
+class SessionRenewalMiddleware:
+    """Re-issues the session cookie with a fresh max age when the request renewed the session."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+
+        async def send_with_cookie(message: Message) -> None:
+            session_id = state.get(RENEWED_SESSION_STATE_KEY)
+            if message["type"] == "http.response.start" and session_id is not None:
+                headers = MutableHeaders(scope=message)
+                # don't override a response that logs the user in or out
+                if not any(cookie.startswith(f"{COOKIE_SESSION_KEY}=") for cookie in headers.getlist("set-cookie")):
+                    headers.append("set-cookie", _session_cookie_header(session_id).decode("latin-1"))
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+@contextlib.asynccontextmanager
+async def run_session_renewer():
+    """Runs the renewal flush loop for the lifetime of the app, flushing anything left over on shutdown."""
+    task = asyncio.create_task(session_renewer.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await session_renewer.flush_with_new_session()
@@ -1,9 +1,9 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, LargeBinary, String, Text, func
+from sqlalchemy import DateTime, Enum, Float, ForeignKey, LargeBinary, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from auth.constants import SITE_USER_ROLE_MAX_LENGTH, UserRole
+from auth.constants import RATE_LIMIT_KEY_LEN, SITE_USER_ROLE_MAX_LENGTH, UserRole
 from constants import AUTH_REDIRECT_ID_LEN, COMPUTING_ID_LEN, SESSION_ID_LEN
 from database import Base
 
@@ -25,7 +25,8 @@ class UserSessionDB(Base):
     # TODO: Make all timestamps uneditable later
     # time the CAS ticket was issued
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # indexed for cleaning up expired sessions
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
 
 
 class SiteUserDB(Base):
@@ -114,5 +115,25 @@ class AuthRedirectDB(Base):
 
     id: Mapped[str] = mapped_column(String(AUTH_REDIRECT_ID_LEN), primary_key=True)
     return_to: Mapped[str] = mapped_column(Text)
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # indexed for cleaning up abandoned login attempts
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class RateLimitBucketDB(Base):
+    """
+    A token bucket shared by every worker, used when rate limits are stored in postgres.
+
+    Attributes:
+        __tablename__: rate_limit_bucket
+        key: what is being rate limited, e.g. a route and IP address
+        tokens: the number of tokens left as of `updated_at`
+        updated_at: the datetimetz of when a token was last taken
+    """
+
+    __tablename__ = "rate_limit_bucket"
+
+    key: Mapped[str] = mapped_column(String(RATE_LIMIT_KEY_LEN), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    # indexed for cleaning up buckets that have refilled
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
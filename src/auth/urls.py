@@ -22,11 +22,14 @@ from auth.constants import (
     COOKIE_SAMESITE,
     COOKIE_SESSION_KEY,
     REDIRECT_TTL,
+    SESSION_CACHE_TTL,
 )
-from auth.models import UserInfo
+from auth.models import UserInfo, UserSession, UserSessionsRevoked
+from auth.ratelimit import check_login_rate_limit, limit_logins_by_ip, task_clean_rate_limit_buckets
+from auth.renewal import renew_session
 from config import settings
-from dependencies import LoggedInUser, logged_in_user
-from utils.permissions import UserRole, is_user_role, roles_satisfy
+from dependencies import LoggedInUser, logged_in_user, perm_admin
+from utils.permissions import UserRole, get_cached_session, is_user_role
 from utils.shared_models import DetailModel, MessageModel
 
 _logger = logging.getLogger(__name__)
@@ -96,8 +99,10 @@ router = APIRouter(
     responses={
         307: {"description": "Redirect to SFU CAS"},
         400: {"description": "Invalid redirect URL", "model": DetailModel},
+        429: {"description": "Too many login attempts", "model": DetailModel},
     },
     operation_id="login",
+    dependencies=[Depends(limit_logins_by_ip)],
 )
 async def login(db_session: database.DBSession, request: Request, return_to: str | None = None):
     if return_to is None:
@@ -138,9 +143,11 @@ async def login(db_session: database.DBSession, request: Request, return_to: str
     responses={
         400: {"description": "Login attempt invalid", "model": DetailModel},
         401: {"description": "Failed to validate ticket with SFU's CAS", "model": DetailModel},
+        429: {"description": "Too many login attempts", "model": DetailModel},
         502: {"description": "Failed to connect to SFU's CAS", "model": DetailModel},
     },
     operation_id="validate",
+    dependencies=[Depends(limit_logins_by_ip)],
 )
 async def validate_ticket(
     request: Request, db_session: database.DBSession, background_tasks: BackgroundTasks, ticket: str
@@ -192,8 +199,12 @@ async def validate_ticket(
     if not isinstance(computing_id, str) or not computing_id:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Authentication error")
 
-    # clean old sessions after sending the response
+    await check_login_rate_limit(db_session, f"user:{computing_id}")
+
+    # clean old sessions and abandoned login attempts after sending the response
     background_tasks.add_task(crud.task_clean_expired_user_sessions, db_session)
+    background_tasks.add_task(crud.task_clean_expired_auth_redirects, db_session)
+    background_tasks.add_task(task_clean_rate_limit_buckets, db_session)
 
     # Delete auth redirect record and cookie
     return_to = await crud.delete_auth_redirect(db_session, token)
@@ -295,6 +306,49 @@ async def get_user(
     return user_info
 
 
+@router.get(
+    "/sessions/{computing_id}",
+    description="List every session of a user.",
+    response_model=list[UserSession],
+    responses={
+        403: {"description": "must be a website admin", "model": DetailModel},
+    },
+    operation_id="get_user_sessions",
+    dependencies=[Depends(perm_admin)],
+)
+async def get_user_sessions(
+    db_session: database.DBSession,
+    computing_id: str,
+):
+    user_sessions = await crud.get_user_sessions(db_session, computing_id)
+    return JSONResponse(
+        [UserSession.model_validate(user_session).model_dump(mode="json") for user_session in user_sessions]
+    )
+
+
+@router.delete(
+    "/sessions/{computing_id}",
+    description=(
+        "Revoke every session of a user, logging them out everywhere. Does not log out of CAS. API requests with a "
+        "revoked session are rejected straight away, but other workers may still pass them in `/auth/verify` for up "
+        f"to {SESSION_CACHE_TTL} seconds, until their session cache entries expire."
+    ),
+    response_model=UserSessionsRevoked,
+    responses={
+        403: {"description": "must be a website admin", "model": DetailModel},
+    },
+    operation_id="revoke_user_sessions",
+    dependencies=[Depends(require_trusted_origin), Depends(perm_admin)],
+)
+async def revoke_user_sessions(
+    db_session: database.DBSession,
+    computing_id: str,
+):
+    revoked = await crud.remove_user_sessions(db_session, computing_id)
+    await db_session.commit()
+    return UserSessionsRevoked(revoked=revoked)
+
+
 @router.get(
     "/verify",
     description="Verify the user's session exists.",
@@ -302,10 +356,22 @@ async def get_user(
     include_in_schema=False,
 )
 async def verify_session(
+    request: Request,
     db_session: database.DBSession,
-    computing_id: LoggedInUser,
     x_required_role: str | None = Header(default=None, alias="X-Required-Role"),
 ):
+    # nginx calls this for every protected asset, so the session and roles are served from the session cache
+    session_id = request.cookies.get(COOKIE_SESSION_KEY)
+    if session_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="no session id")
+
+    user_session = await get_cached_session(db_session, session_id)
+    if user_session is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="no computing id")
+    # nginx drops the headers of auth_request subrequests, so the session is only renewed server side here; the
+    # cookie is re-issued by the next API response that renews it
+    renew_session(request, session_id, user_session, reissue_cookie=False)
+
     if x_required_role is None:
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     try:
@@ -314,7 +380,7 @@ async def verify_session(
         # If you hit this then check the Nginx config
         raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Invalid required role") from None
 
-    if not (await roles_satisfy(db_session, computing_id, required_role)):
+    if required_role not in user_session.roles:
         raise HTTPException(status.HTTP_403_FORBIDDEN, "User does not have the required role")
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
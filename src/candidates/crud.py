@@ -3,13 +3,15 @@ from collections.abc import Sequence
 import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from candidates.models import Candidate
 from candidates.tables import CandidateDB
 from officers.constants import OfficerPositionEnum
+from utils import model_columns
 
 
-async def get_all_candidates(db_session: AsyncSession) -> Sequence[CandidateDB]:
-    candidates = (await db_session.scalars(sqlalchemy.select(CandidateDB))).all()
-    return candidates
+async def get_all_candidates(db_session: AsyncSession) -> list[Candidate]:
+    query = sqlalchemy.select(*model_columns(Candidate, CandidateDB))
+    return [Candidate.model_validate(row._mapping) for row in await db_session.execute(query)]
 
 
 async def get_all_registrations_of_candidate(
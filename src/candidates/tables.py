@@ -10,7 +10,8 @@ class CandidateDB(Base):
     __tablename__ = "election_nominee_application"
 
     computing_id: Mapped[str] = mapped_column(ForeignKey("election_nominee_info.computing_id"), primary_key=True)
-    nominee_election: Mapped[str] = mapped_column(ForeignKey("election.slug"), primary_key=True)
+    # the primary key starts with computing_id, so listing an election's candidates needs its own index
+    nominee_election: Mapped[str] = mapped_column(ForeignKey("election.slug"), primary_key=True, index=True)
     position: Mapped[OfficerPositionEnum] = mapped_column(String(64), primary_key=True)
 
     speech: Mapped[str | None] = mapped_column(Text)
@@ -2,6 +2,7 @@ from ctypes import Union
 from pathlib import Path
 from typing import Literal
 
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 ENV_FILE = Path(__file__).parent.parent / ".env"
@@ -13,6 +14,30 @@ class Settings(BaseSettings):
     # Application settings
     environment: Literal["dev"] | Literal["prod"] | Literal["test"]
     db_port: int | None = None
+    # Connection pool of each gunicorn worker. Keep `workers * (db_pool_size + db_pool_max_overflow)` below
+    # postgres' `max_connections`, and check GET /api/admin/database/pool to see if requests are waiting on the pool
+    db_pool_size: int = Field(default=5, ge=1)
+    db_pool_max_overflow: int = Field(default=5, ge=0)
+    db_pool_timeout: float = Field(default=10, gt=0)
+    db_pool_recycle: int = 60 * 30
+    db_pool_pre_ping: bool = True
+    # Prepared statements cached per connection by the asyncpg driver, set to 0 when running behind pgbouncer
+    db_prepared_statement_cache_size: int = Field(default=100, ge=0)
+    # Optional read replica for read only routes, e.g. postgresql+asyncpg://replica-host:5432/main. Reads go back to the
+    # primary while the replica is more than `db_replica_max_lag` seconds behind, which is checked every interval
+    db_replica_url: str | None = None
+    db_replica_max_lag: float = Field(default=5, ge=0)
+    db_replica_lag_check_interval: float = Field(default=10, gt=0)
+    # Echo every SQL statement, very slow, only for debugging
+    db_echo: bool = False
+    # Queries slower than the threshold (in seconds), and a random sample of the rest, are logged as JSON
+    query_log_sample_rate: float = Field(default=0, ge=0, le=1)
+    query_log_slow_threshold: float | None = 0.5
+
+    # Log the number of queries and database time of every request
+    query_stats_log: bool = False
+
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
     app_url: str
 
     # CORS and cookie settings
@@ -22,6 +47,17 @@ class Settings(BaseSettings):
 
     # Authentication settings
     allowed_return_origins: list[str] = []
+    # Active sessions are extended at most once per interval (in seconds), and extensions are written in batches
+    session_renewal_interval: int = 60 * 5
+    session_renewal_flush_interval: float = 5
+    # Logins are rate limited per IP address and per computing ID with token buckets, kept either in each worker's
+    # memory or in postgres so the limits are shared by all workers
+    login_rate_limit_backend: Literal["memory", "postgres"] = "memory"
+    login_rate_limit_burst: int = Field(default=10, ge=1)
+    login_rate_limit_per_minute: float = Field(default=10, gt=0)
+    # Reverse proxies trusted to name the client in the X-Real-IP or X-Forwarded-For header; "unix" trusts connections
+    # over a unix socket, which is how nginx reaches gunicorn
+    trusted_proxies: list[str] = ["127.0.0.1", "::1", "unix"]
 
     # API keys and secrets
     translink_api_key: str | None = None
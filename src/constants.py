@@ -2,7 +2,6 @@ from zoneinfo import ZoneInfo
 
 # TODO(future): replace new.sfucsss.org with sfucsss.org during migration
 # TODO(far-future): branch-specific root IP addresses (e.g., devbranch.sfucsss.org)
-# GITHUB_ORG_NAME = "CSSS-Test-Organization" if not IS_PROD else "CSSS"
 TZ_INFO = ZoneInfo("America/Vancouver")
 
 W3_GUILD_ID = "1260652618875797504"
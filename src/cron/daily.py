@@ -1,68 +1,109 @@
-"""This module gets called by cron every day"""
+"""This module gets called by cron every day, see "Scheduled Jobs" in the README"""
 
 import asyncio
 import logging
+from datetime import date
 
+import database
 import github
 import google_api
-import utils
-from database import get_db_session
-from officers.crud import get_all_officers, get_user_by_username
+import officers.crud
+from github.internals import get_user_by_username
+from officers.constants import OfficerPositionEnum
+from officers.tables import OfficerTermDB
 
 _logger = logging.getLogger(__name__)
 
+# the github teams only current officers are in
+CURRENT_OFFICER_TEAMS = [team for team in github.AUTO_GITHUB_TEAMS if team != "past_officers"]
 
-async def update_google_permissions(db_session):
+
+async def update_officer_terms(db_session: database.DBSession):
+    """Clears the flag of the terms that have ended, logging the terms that start today or ended since the last run."""
+    today = date.today()
+    started = await officers.crud.get_terms_starting_on(db_session, today)
+    ended = await officers.crud.update_active_terms(db_session, today)
+    # logged before committing, which expires the terms
+    for term in started:
+        _logger.info(f"term started: id={term.id} computing_id={term.computing_id} position={term.position}")
+    for term in ended:
+        _logger.info(f"term ended: id={term.id} computing_id={term.computing_id} position={term.position}")
+    await db_session.commit()
+
+    _logger.info(f"updated officer terms: {len(started)} started, {len(ended)} ended")
+
+
+async def _current_terms(db_session: database.DBSession) -> dict[OfficerPositionEnum, list[OfficerTermDB]]:
+    return await officers.crud.get_current_terms_by_positions(db_session, list(OfficerPositionEnum))
+
+
+async def update_google_permissions(db_session: database.DBSession):
     # TODO: implement this function
     # google_permissions = google_api.all_permissions()
-    # one_year_ago = datetime.today() - timedelta(days=365)
 
-    # TODO: for performance, only include officers with recent end-date (1 yr)
-    # but measure performance first
-    for term in await get_all_officers(db_session):
-        if utils.is_active(term):
+    for terms in (await _current_terms(db_session)).values():
+        for _term in terms:
             # TODO: if google drive permission is not active, update them
             pass
-        else:
-            # TODO: if google drive permissions are active, remove them
-            pass
+    # TODO: if google drive permissions of anyone else are active, remove them
 
     _logger.info("updated google permissions")
 
 
-async def update_github_permissions(db_session):
+async def update_github_permissions(db_session: database.DBSession):
     github_permissions, team_id_map = github.all_permissions()
 
-    for term in await get_all_officers(db_session):
-        new_teams = (
-            # move all active officers to their respective teams
-            github.officer_teams(term.position)
-            if utils.is_active(term)
-            # move all inactive officers to the past_officers github organization
-            else ["past_officers"]
-        )
-        if term.username not in github_permissions:
-            user = get_user_by_username(term.username)
+    terms_by_position = await _current_terms(db_session)
+    officer_info = await officers.crud.get_officer_infos(
+        db_session, {term.computing_id for terms in terms_by_position.values() for term in terms}
+    )
+    # the teams of every current officer, by github username; an officer with several positions is in all their teams
+    officer_teams: dict[str, list[str]] = {}
+    for position, terms in terms_by_position.items():
+        for term in terms:
+            username = officer_info[term.computing_id].github_username
+            if username is None:
+                continue
+            teams = officer_teams.setdefault(username, [])
+            teams += [team for team in github.officer_teams(position) if team not in teams]
+
+    for username, new_teams in officer_teams.items():
+        if username not in github_permissions:
+            user = await get_user_by_username(username)
+            if user is None:
+                _logger.warning(f"could not find the github user {username}")
+                continue
             github.invite_user(
                 user.id,
                 [team_id_map[team] for team in new_teams],
             )
         else:
-            github.set_user_teams(term.username, github_permissions[term.username].teams, new_teams)
+            github.set_user_teams(username, github_permissions[username].teams, new_teams)
 
-    _logger.info("updated github permissions")
+    # move everyone else in an officer team to the past_officers team
+    for username, permissions in github_permissions.items():
+        if username not in officer_teams and any(team in CURRENT_OFFICER_TEAMS for team in permissions.teams):
+            github.set_user_teams(username, permissions.teams, ["past_officers"])
 
+    _logger.info("updated github permissions")
 
-async def update_permissions():
-    db_session = get_db_session()
 
-    update_google_permissions(db_session)
-    db_session.commit()
-    update_github_permissions(db_session)
-    db_session.commit()
+async def update_permissions(db_session: database.DBSession):
+    await update_google_permissions(db_session)
+    await update_github_permissions(db_session)
 
     _logger.info("all permissions updated")
 
 
+async def main():
+    await database.setup_database()
+    try:
+        async with database.sessionmanager.session() as db_session:
+            await update_officer_terms(db_session)
+    finally:
+        await database.sessionmanager.close()
+
+
 if __name__ == "__main__":
-    asyncio.run(update_permissions())
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
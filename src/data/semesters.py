@@ -65,3 +65,13 @@ def get_semester_start(year: int, semester: Semester):
             return date(year, month=MAY, day=1)
         case Semester.Spring:
             return date(year, month=JANUARY, day=1)
+
+
+def earliest_date_within_semesters(the_date: date, num_semesters: int) -> date:
+    """
+    The earliest date `d` such that `the_date <= step_semesters(d, num_semesters)`, so "was `d` within the last
+    `num_semesters` semesters of `the_date`" can be checked in SQL as `d >= earliest_date_within_semesters(...)`.
+    """
+    if the_date == current_semester_start(the_date):
+        return step_semesters(the_date, -num_semesters)
+    return step_semesters(the_date, 1 - num_semesters)
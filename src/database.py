@@ -1,16 +1,27 @@
 import asyncio
 import contextlib
+import logging
+import math
 import os
+import time
+from collections import defaultdict
 from collections.abc import AsyncGenerator
+from dataclasses import dataclass
 from typing import Annotated, Any
 
 import asyncpg
-from fastapi import Depends
-from sqlalchemy import MetaData
+import sqlalchemy
+from fastapi import Depends, Request
+from sqlalchemy import MetaData, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config import settings
+from query_log import QueryLog
+
+_logger = logging.getLogger(__name__)
 
 convention = {
     "ix": "ix_%(column_0_label)s",  # index
@@ -25,12 +36,109 @@ class Base(DeclarativeBase):
     metadata = MetaData(naming_convention=convention)
 
 
+@dataclass
+class PoolMetrics:
+    """
+    How long requests waited to check a connection out of the pool.
+
+    Attributes:
+        checkouts: number of connections checked out
+        timeouts: number of checkouts that gave up after the pool timeout
+        total_wait: seconds spent waiting for a connection, over all checkouts
+        max_wait: the longest a single checkout waited, in seconds
+    """
+
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool that keeps track of how long each checkout waited for a free connection."""
+
+    # log under sqlalchemy like the pool we extend, so its messages follow the sqlalchemy log level
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            _logger.warning("timed out waiting for a database connection, the pool is exhausted: %s", self.status())
+            raise
+
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+def engine_kwargs() -> dict[str, Any]:
+    """The engine options for the app's database, tuned through `config.Settings`."""
+    return {
+        "echo": settings.db_echo,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_pool_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": {"prepared_statement_cache_size": settings.db_prepared_statement_cache_size},
+    }
+
+
+# Seconds the replica is behind the primary; a replica that has replayed everything it received is caught up,
+# even if the primary has been idle for a while
+REPLICA_LAG_QUERY = sqlalchemy.text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
 # from: https://medium.com/@tclaitken/setting-up-a-fastapi-app-with-async-sqlalchemy-2-0-pydantic-v2-e6c540be4308
 class DatabaseSessionManager:
-    def __init__(self, db_url: str, engine_kwargs: dict[str, Any], check_db=True):
+    def __init__(
+        self,
+        db_url: str,
+        engine_kwargs: dict[str, Any],
+        check_db=True,
+        replica_url: str | None = None,
+        max_replica_lag: float = 5,
+        replica_lag_check_interval: float = 10,
+    ):
         self._engine = create_async_engine(db_url, **engine_kwargs)
         self._sessionmaker = async_sessionmaker(autocommit=False, bind=self._engine)
 
+        # read only sessions go to the replica while it keeps up, and to the primary otherwise
+        self._replica_engine = create_async_engine(replica_url, **engine_kwargs) if replica_url else None
+        self._primary_read_sessionmaker = async_sessionmaker(
+            autocommit=False, bind=self._engine.execution_options(postgresql_readonly=True)
+        )
+        self._replica_read_sessionmaker = (
+            async_sessionmaker(autocommit=False, bind=self._replica_engine.execution_options(postgresql_readonly=True))
+            if self._replica_engine is not None
+            else None
+        )
+        self.max_replica_lag = max_replica_lag
+        self.replica_lag_check_interval = replica_lag_check_interval
+        self._replica_lag: float | None = None
+        self._replica_lag_checked_at = -math.inf
+        self._replica_lag_lock = asyncio.Lock()
+
         if check_db:
             # check if the database exists by making a test connection
             # NOTE: don't do this in an async function
@@ -58,13 +166,22 @@ class DatabaseSessionManager:
 
         return self._engine
 
+    @property
+    def replica_engine(self) -> AsyncEngine | None:
+        return self._replica_engine
+
     async def close(self):
         if self._engine is None:
             raise Exception("DatabaseSessionManager is not initialized")
         await self._engine.dispose()
+        if self._replica_engine is not None:
+            await self._replica_engine.dispose()
 
         self._engine = None
         self._sessionmaker = None
+        self._replica_engine = None
+        self._primary_read_sessionmaker = None
+        self._replica_read_sessionmaker = None
 
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncGenerator[AsyncConnection]:
@@ -78,12 +195,75 @@ class DatabaseSessionManager:
                 await connection.rollback()
                 raise
 
+    async def measure_replica_lag(self) -> float | None:
+        """
+        Measures how far the replica is behind the primary.
+
+        Returns:
+            The lag in seconds, or None if there is no replica or it can't be reached.
+        """
+        if self._replica_engine is None:
+            return None
+
+        try:
+            async with self._replica_engine.connect() as connection:
+                lag = await connection.scalar(REPLICA_LAG_QUERY)
+        except Exception as e:
+            _logger.warning("could not measure the read replica lag: %s", e)
+            return None
+
+        return float(lag)
+
+    async def use_replica(self) -> bool:
+        """True if read only sessions should go to the replica, re-measuring its lag at most once per interval."""
+        if self._replica_engine is None:
+            return False
+
+        if time.monotonic() - self._replica_lag_checked_at >= self.replica_lag_check_interval:
+            async with self._replica_lag_lock:
+                # another request may have measured it while we waited for the lock
+                if time.monotonic() - self._replica_lag_checked_at >= self.replica_lag_check_interval:
+                    self._replica_lag = await self.measure_replica_lag()
+                    self._replica_lag_checked_at = time.monotonic()
+                    if self._replica_lag is None or self._replica_lag > self.max_replica_lag:
+                        _logger.warning("read replica lag is %s seconds, reading from the primary", self._replica_lag)
+
+        return self._replica_lag is not None and self._replica_lag <= self.max_replica_lag
+
     @contextlib.asynccontextmanager
     async def session(self) -> AsyncGenerator[AsyncSession]:
         if self._sessionmaker is None:
             raise Exception("DatabaseSessionManager is not initialized")
 
-        session = self._sessionmaker()
+        async with self._managed_session(self._sessionmaker) as session:
+            yield session
+
+    @contextlib.asynccontextmanager
+    async def read_session(self) -> AsyncGenerator[AsyncSession]:
+        """A session in read only transactions, on the replica if it's caught up and on the primary otherwise."""
+        if self._primary_read_sessionmaker is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        sessionmaker = self._primary_read_sessionmaker
+        if self._replica_read_sessionmaker is not None and await self.use_replica():
+            sessionmaker = self._replica_read_sessionmaker
+
+        async with self._managed_session(sessionmaker) as session:
+            yield session
+
+    @contextlib.asynccontextmanager
+    async def primary_read_session(self) -> AsyncGenerator[AsyncSession]:
+        """A session in read only transactions on the primary, for reads that must see the latest writes."""
+        if self._primary_read_sessionmaker is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        async with self._managed_session(self._primary_read_sessionmaker) as session:
+            yield session
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def _managed_session(sessionmaker: async_sessionmaker[AsyncSession]) -> AsyncGenerator[AsyncSession]:
+        session = sessionmaker()
         try:
             yield session
         except Exception:
@@ -114,19 +294,79 @@ async def setup_database():
     # TODO: where is sys.stdout piped to? I want all these to go to a specific logs folder
     manager = DatabaseSessionManager(
         db_url,
-        {"echo": settings.environment != "prod"},
+        engine_kwargs(),
         check_db=False,
+        replica_url=settings.db_replica_url,
+        max_replica_lag=settings.db_replica_max_lag,
+        replica_lag_check_interval=settings.db_replica_lag_check_interval,
     )
+    query_log = QueryLog(settings.query_log_sample_rate, settings.query_log_slow_threshold)
+    query_log.install(manager.engine)
+    if manager.replica_engine is not None:
+        query_log.install(manager.replica_engine)
     await DatabaseSessionManager.test_connection(db_url)
     sessionmanager = manager
 
 
-async def get_db_session():
+@dataclass
+class SessionUsage:
+    """
+    How often a route's database session was used.
+
+    Attributes:
+        sessions: number of requests that were given a session
+        unused: number of those sessions that never checked out a connection
+    """
+
+    sessions: int = 0
+    unused: int = 0
+
+
+# route path -> usage of the sessions given to that route, for the current worker
+session_usage: defaultdict[str, SessionUsage] = defaultdict(SessionUsage)
+
+# Key in the session info set once the session has checked out a connection
+_CONNECTED_KEY = "connected"
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_connected(session: Session, *_: Any):
+    session.info[_CONNECTED_KEY] = True
+
+
+def _record_session_usage(request: Request, session: AsyncSession) -> None:
+    route = request.scope.get("route")
+    usage = session_usage[getattr(route, "path", request.url.path)]
+    usage.sessions += 1
+    usage.unused += not session.info.get(_CONNECTED_KEY, False)
+
+
+async def get_db_session(request: Request):
     if sessionmanager is None:
         raise RuntimeError("Database has not been initialized")
 
+    # An AsyncSession only checks out a pooled connection when it first runs a query, so routes that return early
+    # never hold one; the usage stats show which routes do that
     async with sessionmanager.session() as session:
-        yield session
+        try:
+            yield session
+        finally:
+            _record_session_usage(request, session)
 
 
 DBSession = Annotated[AsyncSession, Depends(get_db_session)]
+
+
+async def get_read_db_session(request: Request):
+    if sessionmanager is None:
+        raise RuntimeError("Database has not been initialized")
+
+    async with sessionmanager.read_session() as session:
+        try:
+            yield session
+        finally:
+            _record_session_usage(request, session)
+
+
+# for GET routes that only read, so they can be served by the read replica
+ReadOnlyDBSession = Annotated[AsyncSession, Depends(get_read_db_session)]
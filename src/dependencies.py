@@ -1,46 +1,74 @@
 from typing import Annotated
 
-from fastapi import Cookie, Depends, HTTPException, status
+from fastapi import Cookie, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import auth
 import auth.crud
 import database
 from auth.constants import COOKIE_SESSION_KEY
+from auth.renewal import renew_session
 from config import settings
-from utils.permissions import is_user_election_admin, is_user_website_admin
+from utils.permissions import get_session, is_user_election_admin, is_user_website_admin
+
+
+async def _optional_user(request: Request, db_session: AsyncSession, session_id: str | None) -> str | None:
+    if session_id is None:
+        return None
+
+    user_session = await get_session(db_session, session_id)
+    if user_session is None:
+        return None
+
+    renew_session(request, session_id, user_session)
+    return user_session.computing_id
 
 
 async def optional_user(
-    db_session: database.DBSession, session_id: Annotated[str | None, Cookie(alias=COOKIE_SESSION_KEY)] = None
+    request: Request,
+    db_session: database.DBSession,
+    session_id: Annotated[str | None, Cookie(alias=COOKIE_SESSION_KEY)] = None,
 ) -> str | None:
     """
-    Fetches the computing ID of the user from the user session's table.
+    Fetches the computing ID of the user from the user session's table, and renews their session.
 
     Args:
+        request: The request.
         db_session: The database session.
         session_id: The session ID from the request's cookie.
 
     Returns:
         The computing ID of the user if their session is valid.
     """
-    if session_id is None:
-        return None
+    return await _optional_user(request, db_session, session_id)
 
-    session_computing_id = await auth.crud.get_session_computing_id(db_session, session_id)
 
-    return session_computing_id
+async def optional_read_user(
+    request: Request,
+    db_session: database.ReadOnlyDBSession,
+    session_id: Annotated[str | None, Cookie(alias=COOKIE_SESSION_KEY)] = None,
+) -> str | None:
+    """
+    Same as `optional_user`, but looks the session up with the route's read only session, so routes that take a
+    `ReadOnlyDBSession` don't also open a session on the primary.
+    """
+    return await _optional_user(request, db_session, session_id)
 
 
 OptionalUser = Annotated[str | None, Depends(optional_user)]
+OptionalReadUser = Annotated[str | None, Depends(optional_read_user)]
 
 
 async def logged_in_user(
-    db_session: database.DBSession, session_id: Annotated[str | None, Cookie(alias=COOKIE_SESSION_KEY)] = None
+    request: Request,
+    db_session: database.DBSession,
+    session_id: Annotated[str | None, Cookie(alias=COOKIE_SESSION_KEY)] = None,
 ) -> str:
     """
-    Fetches the computing ID of the User from the user session's table.
+    Fetches the computing ID of the User from the user session's table, and renews their session.
 
     Args:
+        request: The request.
         db_session: The database session.
         session_id: The session ID from the request's cookie.
 
@@ -54,11 +82,12 @@ async def logged_in_user(
     if session_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="no session id")
 
-    session_computing_id = await auth.crud.get_session_computing_id(db_session, session_id)
-    if session_computing_id is None:
+    user_session = await get_session(db_session, session_id)
+    if user_session is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="no computing id")
 
-    return session_computing_id
+    renew_session(request, session_id, user_session)
+    return user_session.computing_id
 
 
 LoggedInUser = Annotated[str, Depends(logged_in_user)]
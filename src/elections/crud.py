@@ -4,6 +4,7 @@ from datetime import datetime
 import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import statements
 from candidates.tables import CandidateDB
 from elections.models import ElectionNomineeSummary, ElectionResponse
 from elections.tables import ElectionDB
@@ -16,7 +17,7 @@ async def get_all_elections(db_session: AsyncSession) -> Sequence[ElectionDB]:
 
 
 async def get_election(db_session: AsyncSession, election_slug: str) -> ElectionDB | None:
-    return await db_session.scalar(sqlalchemy.select(ElectionDB).where(ElectionDB.slug == election_slug))
+    return await db_session.scalar(statements.election_by_slug(election_slug))
 
 
 async def create_election(db_session: AsyncSession, election: ElectionDB):
@@ -9,7 +9,7 @@ import database
 import elections.crud
 import elections.tables
 import nominees.crud
-from dependencies import OptionalUser, perm_election
+from dependencies import OptionalReadUser, perm_election
 from elections.models import (
     ElectionParams,
     ElectionResponse,
@@ -80,8 +80,8 @@ def _raise_if_bad_election_data(
     operation_id="get_all_elections",
 )
 async def list_elections(
-    computing_id: OptionalUser,
-    db_session: database.DBSession,
+    computing_id: OptionalReadUser,
+    db_session: database.ReadOnlyDBSession,
     with_nominees: bool = Query(False),
 ):
     current_time = datetime.datetime.now(datetime.UTC)
@@ -121,8 +121,8 @@ async def list_elections(
     operation_id="get_election_by_name",
 )
 async def get_election(
-    db_session: database.DBSession,
-    computing_id: OptionalUser,
+    db_session: database.ReadOnlyDBSession,
+    computing_id: OptionalReadUser,
     election_name: str,
     with_nominees: bool = Query(False),
 ):
@@ -1,27 +1,41 @@
 from collections.abc import Sequence
-from datetime import date, datetime
+from datetime import datetime
 
-from sqlalchemy import and_, delete, extract, or_, select
+from sqlalchemy import and_, delete, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import statements
+from constants import TZ_INFO
 from event.tables import EventDB
 
 
 async def get_all_events(db_session: AsyncSession) -> Sequence[EventDB]:
-    events = (await db_session.scalars(select(EventDB))).all()
+    events = (await db_session.scalars(statements.all_events())).all()
     return events
 
 
+def _overlaps_range(start: datetime, end: datetime):
+    """
+    Events that start or end within [start, end).
+
+    Callers build the bounds in `TZ_INFO`, so years and months are the ones of our local calendar rather than UTC's.
+
+    These are plain range predicates rather than `extract(...)` on the columns, so they can use the indexes on
+    start_time and end_time.
+    """
+    return or_(
+        and_(EventDB.start_time >= start, EventDB.start_time < end),
+        and_(EventDB.end_time >= start, EventDB.end_time < end),
+    )
+
+
 async def get_events_for_this_year(
     db_session: AsyncSession,
     year: int,
 ) -> Sequence[EventDB]:
+    start = datetime(year, 1, 1, tzinfo=TZ_INFO)
     events = (
-        await db_session.scalars(
-            select(EventDB).where(
-                or_(extract("year", EventDB.start_time) == year, extract("year", EventDB.end_time) == year)
-            )
-        )
+        await db_session.scalars(select(EventDB).where(_overlaps_range(start, start.replace(year=year + 1))))
     ).all()
     return events
 
@@ -31,16 +45,9 @@ async def get_events_for_this_year_month(
     year: int,
     month: int,
 ) -> Sequence[EventDB]:
-    events = (
-        await db_session.scalars(
-            select(EventDB).where(
-                or_(
-                    and_(extract("year", EventDB.start_time) == year, extract("month", EventDB.start_time) == month),
-                    and_(extract("year", EventDB.end_time) == year, extract("month", EventDB.end_time) == month),
-                )
-            )
-        )
-    ).all()
+    start = datetime(year, month, 1, tzinfo=TZ_INFO)
+    end = start.replace(year=year + 1, month=1) if month == 12 else start.replace(month=month + 1)
+    events = (await db_session.scalars(select(EventDB).where(_overlaps_range(start, end)))).all()
     return events
 
 
@@ -13,8 +13,8 @@ class EventDB(Base):
     eid: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     name: Mapped[str] = mapped_column(String(64))
-    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
-    end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    start_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    end_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     frequency: Mapped[EventFrequencyEnum] = mapped_column(String(64), server_default=text("'NONE'"))
     repeat_start_date: Mapped[date] = mapped_column(Date, nullable=True)
     repeat_end_date: Mapped[date] = mapped_column(Date, nullable=True)
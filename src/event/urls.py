@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import MAXYEAR, MINYEAR
+
+from fastapi import APIRouter, Depends, HTTPException, Path, status
 from fastapi.encoders import jsonable_encoder
 from pydantic import ValidationError
 
@@ -22,7 +24,7 @@ router = APIRouter(
     operation_id="get_all_events",
 )
 async def get_all_events(
-    db_session: database.DBSession,
+    db_session: database.ReadOnlyDBSession,
 ):
     events_list = await event.crud.get_all_events(db_session)
 
@@ -36,8 +38,8 @@ async def get_all_events(
     operation_id="get_events_for_this_year",
 )
 async def get_events_for_this_year(
-    db_session: database.DBSession,
-    year: int,
+    db_session: database.ReadOnlyDBSession,
+    year: int = Path(ge=MINYEAR, lt=MAXYEAR),
 ):
     events_list = await event.crud.get_events_for_this_year(db_session, year)
 
@@ -50,7 +52,11 @@ async def get_events_for_this_year(
     response_model=list[Event],
     operation_id="get_events_for_this_year_month",
 )
-async def get_events_for_this_year_month(db_session: database.DBSession, year: int, month: int):
+async def get_events_for_this_year_month(
+    db_session: database.ReadOnlyDBSession,
+    year: int = Path(ge=MINYEAR, lt=MAXYEAR),
+    month: int = Path(ge=1, le=12),
+):
     events_list = await event.crud.get_events_for_this_year_month(db_session, year, month)
 
     return events_list
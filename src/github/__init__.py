@@ -6,7 +6,7 @@ from github.internals import add_user_to_team, list_members, list_team_members,
 from github.types import GithubUserPermissions
 
 # from admin.email import send_email
-from officers.constants import OfficerPosition
+from officers.constants import OfficerPositionEnum
 
 # Rules:
 # - all past officers will be members of the github org
@@ -34,9 +34,9 @@ def is_active() -> bool:
 
 
 def officer_teams(position: str) -> list[str]:
-    if position == OfficerPosition.DIRECTOR_OF_ARCHIVES:
+    if position == OfficerPositionEnum.DIRECTOR_OF_ARCHIVES:
         return ["doa", "officers"]
-    elif position == OfficerPosition.ELECTIONS_OFFICER:
+    elif position == OfficerPositionEnum.ELECTIONS_OFFICER:
         return ["election_officer", "officers"]
     else:
         return ["officers"]
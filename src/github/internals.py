@@ -5,10 +5,11 @@ from typing import Any
 import requests
 from requests import Response
 
-from constants import GITHUB_ORG_NAME
+from config import settings
 from github.types import GithubTeam, GithubUser
 
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+GITHUB_ORG_NAME = "CSSS" if settings.environment == "prod" else "CSSS-Test-Organization"
 
 # TODO: go through this module & make sure that all functions check for response.status_code
 # being invalid as specified by the API endpoints
@@ -3,12 +3,14 @@ from datetime import date
 from sqlalchemy import delete, select
 
 import database
+from honorary.models import HonoraryMember
 from honorary.tables import HonoraryMemberDB
+from utils import model_columns
 
 
-async def get_all_honorary_members(db_session: database.DBSession) -> list[HonoraryMemberDB]:
-    query = select(HonoraryMemberDB).order_by(HonoraryMemberDB.start_date.desc())
-    return list((await db_session.scalars(query)).all())
+async def get_all_honorary_members(db_session: database.DBSession) -> list[HonoraryMember]:
+    query = select(*model_columns(HonoraryMember, HonoraryMemberDB)).order_by(HonoraryMemberDB.start_date.desc())
+    return [HonoraryMember.model_validate(row._mapping) for row in await db_session.execute(query)]
 
 
 async def get_current_honorary_members(db_session: database.DBSession) -> list[HonoraryMemberDB]:
@@ -24,12 +24,7 @@ router = APIRouter(
 )
 async def get_all_honorary_members(db_session: database.DBSession):
     honorary_members = await honorary.crud.get_all_honorary_members(db_session)
-    return JSONResponse(
-        [
-            HonoraryMember.model_validate(member).model_dump(mode="json", exclude_unset=True)
-            for member in honorary_members
-        ]
-    )
+    return JSONResponse([member.model_dump(mode="json", exclude_unset=True) for member in honorary_members])
 
 
 @router.get(
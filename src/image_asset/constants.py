@@ -0,0 +1,6 @@
+# Widths of the scaled down copies saved next to every uploaded image, so a page only downloads the size it displays.
+# Images are never scaled up, so the variants of a narrow image are the same size as the original.
+IMAGE_VARIANT_WIDTHS = {
+    "thumbnail": 160,
+    "medium": 640,
+}
@@ -1,13 +1,23 @@
+from collections.abc import Iterable
+
 from sqlalchemy import select
 
 import database
 from config import settings
+from image_asset.models import ImageAsset
 from image_asset.tables import ImageAssetDB
+from utils import model_columns
+
+
+async def get_all_image_assets(db_session: database.DBSession) -> list[ImageAsset]:
+    query = select(*model_columns(ImageAsset, ImageAssetDB)).order_by(ImageAssetDB.image_id.desc())
+    return [ImageAsset.model_validate(row._mapping) for row in await db_session.execute(query)]
 
 
-async def get_all_image_assets(db_session: database.DBSession) -> list[ImageAssetDB]:
-    query = select(ImageAssetDB).order_by(ImageAssetDB.image_id.desc())
-    return list((await db_session.scalars(query)).all())
+async def get_existing_image_ids(db_session: database.DBSession, image_ids: Iterable[int]) -> set[int]:
+    """Which of these image IDs belong to an image asset, in one query."""
+    query = select(ImageAssetDB.image_id).where(ImageAssetDB.image_id.in_(list(image_ids)))
+    return set(await db_session.scalars(query))
 
 
 def create_image_asset(db_session: database.DBSession, image_asset: ImageAssetDB) -> None:
@@ -1,8 +1,36 @@
 from datetime import datetime
+from typing import Self
 
 from pydantic import BaseModel, ConfigDict, Field, computed_field
 
-from config import settings
+from image_asset.constants import IMAGE_VARIANT_WIDTHS
+from image_asset.variants import media_url, variant_size, variant_storage_key
+
+
+class ImageVariant(BaseModel):
+    name: str = Field(description="Which variant this is, e.g. thumbnail or medium.")
+    url: str = Field(description="Public URL to access the variant.")
+    width: int = Field(description="Width of the variant in pixels.")
+    height: int = Field(description="Height of the variant in pixels.")
+
+
+def image_variants(storage_key: str, width: int | None, height: int | None) -> list[ImageVariant]:
+    """The scaled down variants of an image. Images from before variants were saved have no size, and no variants."""
+    if width is None or height is None:
+        return []
+
+    variants = []
+    for name, max_width in IMAGE_VARIANT_WIDTHS.items():
+        variant_width, variant_height = variant_size(width, height, max_width)
+        variants.append(
+            ImageVariant(
+                name=name,
+                url=media_url(variant_storage_key(storage_key, name)),
+                width=variant_width,
+                height=variant_height,
+            )
+        )
+    return variants
 
 
 class ImageAsset(BaseModel):
@@ -19,6 +47,16 @@ class ImageAsset(BaseModel):
         description="The path to the image on the storage device.",
     )
 
+    width: int | None = Field(
+        None,
+        description="Width of the image in pixels. Unknown for images uploaded before sizes were recorded.",
+    )
+
+    height: int | None = Field(
+        None,
+        description="Height of the image in pixels. Unknown for images uploaded before sizes were recorded.",
+    )
+
     created_at: datetime = Field(
         description="The date, time, and timezone this image was created.",
     )
@@ -26,4 +64,27 @@ class ImageAsset(BaseModel):
     @computed_field(description="Public URL to access the image asset.")
     @property
     def image_url(self) -> str:
-        return f"{settings.media_base_url.rstrip('/')}/{self.storage_key}"
+        return media_url(self.storage_key)
+
+    @computed_field(description="Scaled down copies of the image, from smallest to largest.")
+    @property
+    def variants(self) -> list[ImageVariant]:
+        return image_variants(self.storage_key, self.width, self.height)
+
+
+class ResponsiveImage(BaseModel):
+    """An image to display, with the sizes needed to lay it out before it loads."""
+
+    url: str
+    width: int | None = None
+    height: int | None = None
+    variants: list[ImageVariant]
+
+    @classmethod
+    def from_asset(cls, storage_key: str, width: int | None, height: int | None) -> Self:
+        return cls(
+            url=media_url(storage_key),
+            width=width,
+            height=height,
+            variants=image_variants(storage_key, width, height),
+        )
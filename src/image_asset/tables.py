@@ -13,4 +13,7 @@ class ImageAssetDB(Base):
     image_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     storage_key: Mapped[str] = mapped_column(Text, unique=True)
     original_filename: Mapped[str] = mapped_column(Text)
+    # the size of the original image, which the size of each variant is computed from
+    width: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    height: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
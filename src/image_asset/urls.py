@@ -6,6 +6,7 @@ from pathlib import Path
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from PIL import Image, UnidentifiedImageError
 
 import database
@@ -14,6 +15,7 @@ from config import settings
 from dependencies import perm_admin
 from image_asset.models import ImageAsset
 from image_asset.tables import ImageAssetDB
+from image_asset.variants import delete_variants, save_variants
 from utils.shared_models import DetailModel
 
 _logger = logging.getLogger(__name__)
@@ -71,6 +73,16 @@ async def validate_upload(file: UploadFile) -> str:
     return image_format
 
 
+def _delete_image_files(destination: Path) -> None:
+    """Deletes an image that failed to upload, along with its variants."""
+    try:
+        destination.unlink(missing_ok=True)
+        delete_variants(destination)
+    except OSError:
+        # This logs to ensure we know there's now an orphaned file being stored.
+        _logger.info("Failed to clean up image after failed upload: %s.", destination)
+
+
 router = APIRouter(
     prefix="/image",
     tags=["media"],
@@ -115,7 +127,10 @@ async def create_image_asset_from_upload(file: UploadFile, db_session: database.
 
         with destination.open("wb") as output:
             shutil.copyfileobj(file.file, output)
+        # decoding and resizing a large image would block the event loop
+        width, height = await run_in_threadpool(save_variants, destination)
     except OSError as error:
+        _delete_image_files(destination)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to save image to storage.",
@@ -124,6 +139,8 @@ async def create_image_asset_from_upload(file: UploadFile, db_session: database.
     new_img_asset = ImageAssetDB(
         storage_key=storage_key,
         original_filename=file.filename,
+        width=width,
+        height=height,
     )
 
     try:
@@ -133,11 +150,7 @@ async def create_image_asset_from_upload(file: UploadFile, db_session: database.
     except Exception as e:
         await db_session.rollback()
 
-        try:
-            destination.unlink(missing_ok=True)
-        except OSError:
-            # This logs to ensure we know there's now an orphaned file being stored.
-            _logger.info("Failed to clean up image after failed DB insertion: %s.", destination)
+        _delete_image_files(destination)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to clean up image after failed write.",
@@ -0,0 +1,58 @@
+from pathlib import Path, PurePath, PurePosixPath
+
+from PIL import Image, ImageOps
+
+from config import settings
+from image_asset.constants import IMAGE_VARIANT_WIDTHS
+
+
+def media_url(storage_key: str) -> str:
+    """Public URL of a file in the media storage."""
+    return f"{settings.media_base_url.rstrip('/')}/{storage_key}"
+
+
+def variant_path[P: PurePath](path: P, variant: str) -> P:
+    """Where an image's variant is stored, e.g. `images/abc.thumbnail.jpg` for `images/abc.jpg`."""
+    return path.with_suffix(f".{variant}{path.suffix}")
+
+
+def variant_storage_key(storage_key: str, variant: str) -> str:
+    return variant_path(PurePosixPath(storage_key), variant).as_posix()
+
+
+def is_variant(path: PurePath) -> bool:
+    suffixes = path.suffixes
+    return len(suffixes) >= 2 and suffixes[-2].removeprefix(".") in IMAGE_VARIANT_WIDTHS
+
+
+def variant_size(width: int, height: int, max_width: int) -> tuple[int, int]:
+    """The size of an image scaled down to fit `max_width`, keeping its aspect ratio."""
+    if width <= max_width:
+        return width, height
+    return max_width, max(1, round(height * max_width / width))
+
+
+def save_variants(path: Path) -> tuple[int, int]:
+    """
+    Saves every variant of the image at `path` next to it, in the same format.
+
+    Variants are rotated upright by the image's EXIF orientation, since they don't keep its EXIF data.
+
+    Returns:
+        the (width, height) of the original image, as it's displayed after its EXIF orientation is applied
+
+    Raises:
+        OSError: when the image can't be read or a variant can't be written. Some variants may have been written.
+    """
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        for variant, max_width in IMAGE_VARIANT_WIDTHS.items():
+            size = variant_size(image.width, image.height, max_width)
+            scaled = image.resize(size, Image.Resampling.LANCZOS) if size != image.size else image
+            scaled.save(variant_path(path, variant), format=original.format)
+        return image.width, image.height
+
+
+def delete_variants(path: Path) -> None:
+    for variant in IMAGE_VARIANT_WIDTHS:
+        variant_path(path, variant).unlink(missing_ok=True)
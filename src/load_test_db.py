@@ -1,12 +1,19 @@
 # This script resets the test database, performs migrations, then loads test data into the db.
 #
 # python load_test_db.py
+#
+# For benchmarks and EXPLAIN runs, add synthetic data for N users; --scale 300000 loads about a million rows.
+#
+# python load_test_db.py --scale 300000
 
+import argparse
 import asyncio
+import time
+from collections.abc import Iterable, Iterator
 from datetime import UTC, date, datetime, timedelta
 
 import sqlalchemy
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
 import honorary.tables
 
@@ -18,7 +25,9 @@ from candidates.crud import add_candidate
 from candidates.tables import CandidateDB
 from database import SQLALCHEMY_TEST_DATABASE_URL, Base, DatabaseSessionManager
 from elections.crud import create_election, update_election
+from elections.models import ElectionTypeEnum
 from elections.tables import ElectionDB
+from event.constants import EventFrequencyEnum
 from image_asset.tables import ImageAssetDB
 from nominees.crud import create_nominee_info
 from nominees.tables import NomineeInfoDB
@@ -464,9 +473,187 @@ async def load_test_election_nominee_application_data(db_session: AsyncSession):
 
 
 # ----------------------------------------------------------------- #
+# load db with scaled synthetic data
+
+# tables filled by `load_scaled_data`, in the order they are loaded
+SCALED_TABLES = [
+    "site_user",
+    "user_session",
+    "auth_redirect",
+    "officer_info",
+    "officer_term",
+    "election",
+    "election_nominee_info",
+    "election_nominee_application",
+    "event_info",
+    "image_asset",
+]
+
+
+def _days_ago(i: int, count: int) -> int:
+    """Spreads `count` rows evenly over the last 100 years."""
+    return i * 36500 // count
+
+
+def _scaled_event(i: int, count: int, now: datetime, frequency: EventFrequencyEnum) -> tuple:
+    start_time = now - timedelta(days=_days_ago(i, count))
+    if frequency == EventFrequencyEnum.NONE:
+        return (f"Event {i}", start_time, start_time + timedelta(hours=2), frequency, None, None)
+    return (
+        f"Event {i}",
+        start_time,
+        start_time + timedelta(hours=2),
+        frequency,
+        start_time.date(),
+        start_time.date() + timedelta(days=90),
+    )
 
 
-async def async_main(sessionmanager):
+def scaled_records(scale: int) -> Iterator[tuple[str, list[str], Iterable[tuple]]]:
+    """
+    Generates synthetic rows for a site that has been running for a century, as (table, columns, records).
+
+    There are `scale` users, each with one session, and `scale // 10` login attempts, officers, nominees, events and
+    image assets. Officer terms, elections and events are spread over the last 100 years, and each election has about
+    2000 candidates. Only about 1% of the sessions and login attempts have expired.
+    """
+    now = datetime.now(UTC)
+    today = now.date()
+    num_officers = num_events = max(scale // 10, 1)
+    num_elections = max(scale // 2000, 1)
+    positions = list(OfficerPositionEnum)
+    frequencies = list(EventFrequencyEnum)
+
+    yield (
+        "site_user",
+        ["computing_id", "first_logged_in", "last_logged_in"],
+        ((f"s{i}", now, now) for i in range(scale)),
+    )
+    yield (
+        "user_session",
+        ["session_hash", "computing_id", "created_at", "expires_at"],
+        ((i.to_bytes(32), f"s{i}", now, now + timedelta(days=i % 100 - 1)) for i in range(scale)),
+    )
+    yield (
+        "auth_redirect",
+        ["id", "return_to", "expires_at", "created_at"],
+        ((f"s{i}", "https://example.com/", now + timedelta(minutes=i % 100 - 1), now) for i in range(num_events)),
+    )
+    yield (
+        "officer_info",
+        ["computing_id", "legal_name"],
+        ((f"s{i}", f"Officer {i}") for i in range(num_officers)),
+    )
+    yield (
+        "officer_term",
+        ["computing_id", "position", "start_date", "end_date", "is_active"],
+        (
+            (
+                f"s{i}",
+                positions[i % len(positions)],
+                today - timedelta(days=_days_ago(i, num_officers)),
+                today - timedelta(days=_days_ago(i, num_officers) - 120),
+                _days_ago(i, num_officers) <= 120,
+            )
+            for i in range(num_officers)
+        ),
+    )
+    yield (
+        "election",
+        [
+            "slug",
+            "name",
+            "type",
+            "datetime_start_nominations",
+            "datetime_start_voting",
+            "datetime_end_voting",
+            "available_positions",
+        ],
+        (
+            (
+                f"scale-{i}",
+                f"Election {i}",
+                ElectionTypeEnum.GENERAL,
+                now - timedelta(days=_days_ago(i, num_elections) + 14),
+                now - timedelta(days=_days_ago(i, num_elections) + 7),
+                now - timedelta(days=_days_ago(i, num_elections)),
+                ",".join(positions),
+            )
+            for i in range(num_elections)
+        ),
+    )
+    yield (
+        "election_nominee_info",
+        ["computing_id", "full_name"],
+        ((f"s{i}", f"Nominee {i}") for i in range(num_officers)),
+    )
+    # each nominee runs for one position in many elections, so (computing_id, election) stays unique
+    yield (
+        "election_nominee_application",
+        ["computing_id", "nominee_election", "position", "speech"],
+        (
+            (f"s{i // num_elections}", f"scale-{i % num_elections}", positions[i % len(positions)], None)
+            for i in range(min(scale, num_officers * num_elections))
+        ),
+    )
+    yield (
+        "event_info",
+        ["name", "start_time", "end_time", "frequency", "repeat_start_date", "repeat_end_date"],
+        (_scaled_event(i, num_events, now, frequencies[i % len(frequencies)]) for i in range(num_events)),
+    )
+    yield (
+        "image_asset",
+        ["storage_key", "original_filename", "created_at"],
+        ((f"scale/{i}.webp", f"image-{i}.png", now) for i in range(num_events)),
+    )
+
+
+async def load_scaled_data(connection: AsyncConnection, scale: int) -> int:
+    """
+    Bulk loads synthetic data with COPY, in the connection's transaction.
+
+    A scale of 300,000 loads about a million rows.
+
+    Returns:
+        The number of rows loaded.
+    """
+    # this is test data, so don't wait on the WAL; it also starts the driver's transaction before the COPYs below
+    await connection.exec_driver_sql("SET LOCAL synchronous_commit = off")
+    raw_connection = await connection.get_raw_connection()
+    asyncpg_connection = raw_connection.driver_connection
+
+    # Checking foreign keys row by row takes most of the load time, so they are dropped during the load and
+    # re-validated in one pass per constraint when they are added back. Their definitions are read from the database,
+    # since `DropConstraint` and `AddConstraint` would stop `Base.metadata.create_all` from creating them afterwards.
+    foreign_keys = (
+        await connection.execute(
+            sqlalchemy.text(
+                "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE contype = 'f' AND conrelid::regclass::text = ANY(:tables)"
+            ),
+            {"tables": SCALED_TABLES},
+        )
+    ).all()
+    for table, name, _ in foreign_keys:
+        await connection.exec_driver_sql(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+
+    total = 0
+    for table, columns, records in scaled_records(scale):
+        rows = list(records)
+        await asyncpg_connection.copy_records_to_table(table, columns=columns, records=rows)
+        total += len(rows)
+
+    for table, name, definition in foreign_keys:
+        await connection.exec_driver_sql(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+    for table in SCALED_TABLES:
+        await connection.exec_driver_sql(f"ANALYZE {table}")
+    return total
+
+
+# ----------------------------------------------------------------- #
+
+
+async def async_main(sessionmanager, scale: int = 0):
     await reset_db(sessionmanager._engine)
     async with sessionmanager.session() as db_session:
         await load_test_auth_data(db_session)
@@ -476,8 +663,19 @@ async def async_main(sessionmanager):
         await load_test_elections_data(db_session)
         await load_test_election_nominee_application_data(db_session)
 
+    if scale > 0:
+        print(f"loading scaled data for {scale} users...")
+        start = time.perf_counter()
+        async with sessionmanager._engine.begin() as connection:
+            total = await load_scaled_data(connection, scale)
+        print(f"loaded {total} rows in {time.perf_counter() - start:.1f}s")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reset the test database and load it with test data")
+    parser.add_argument("--scale", type=int, default=0, help="also load synthetic data for this many users")
+    args = parser.parse_args()
+
     response = input(f"This will reset the {SQLALCHEMY_TEST_DATABASE_URL} database, are you okay with this? (y/N): ")
     if response.lower() != "y":
         print("exiting without doing anything...")
@@ -485,6 +683,6 @@ if __name__ == "__main__":
 
     print("Resetting DB...")
     sessionmanager = DatabaseSessionManager(SQLALCHEMY_TEST_DATABASE_URL, {"echo": False})
-    asyncio.run(async_main(sessionmanager))
+    asyncio.run(async_main(sessionmanager, args.scale))
 
     print("Done!")
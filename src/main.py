@@ -13,10 +13,12 @@ import api.urls
 import auth.urls
 import database
 import kiosk.urls
+from auth.renewal import SessionRenewalMiddleware, run_session_renewer
 from config import settings
 from dependencies import PERMISSION_DEPENDENCIES
+from query_stats import QueryStatsMiddleware
 
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=settings.log_level)
 
 
 @contextlib.asynccontextmanager
@@ -27,7 +29,8 @@ async def lifespan(app: FastAPI):
     await database.setup_database()
     app.state.http_client = httpx.AsyncClient()
     try:
-        yield
+        async with run_session_renewer():
+            yield
     finally:
         await app.state.http_client.aclose()
         if database.sessionmanager is not None:
@@ -57,6 +60,8 @@ else:
         for dep in PERMISSION_DEPENDENCIES:
             app.dependency_overrides[dep] = lambda: None
 
+app.add_middleware(SessionRenewalMiddleware)
+app.add_middleware(QueryStatsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
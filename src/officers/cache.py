@@ -0,0 +1,161 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+
+import database
+import officers.crud
+from image_asset.tables import ImageAssetDB
+from officers.constants import ROSTER_CACHE_TTL
+from officers.serialization import officers_json
+from officers.tables import OfficerInfoDB, OfficerTermDB
+
+_logger = logging.getLogger(__name__)
+
+# Key used to remember that the officer tables were changed within an ORM session
+_ROSTER_CHANGED_KEY = "officers_cache_roster_changed"
+
+
+@dataclass(frozen=True, slots=True)
+class _RosterEntry:
+    version: int
+    built_on: date
+    cached_at: float
+    body: bytes
+
+
+class RosterCache:
+    """
+    The current officers as pre-serialized JSON, with a public and a private variant.
+
+    Every write to the officer tables bumps the version, and an entry is only stored if the version hasn't changed
+    since the roster was read, so a roster read before a concurrent write can't be cached after it.
+    Terms start and end at date boundaries, so entries are only valid on the date they were built.
+
+    Each gunicorn worker has its own cache, so invalidations only apply to the current process.
+    Other workers will pick up changes once their entries reach the TTL.
+    """
+
+    def __init__(self, ttl: float = ROSTER_CACHE_TTL):
+        self.ttl = ttl
+        self.version = 0
+        self.invalidated_at = -math.inf
+        self._entries: dict[bool, _RosterEntry] = {}
+
+    def get(self, include_private: bool) -> bytes | None:
+        """Returns the cached roster, or None if it isn't cached, is stale, or was built on another date."""
+        entry = self._entries.get(include_private)
+        if entry is None:
+            return None
+
+        if (
+            entry.version != self.version
+            or entry.built_on != date.today()
+            or time.monotonic() - entry.cached_at > self.ttl
+        ):
+            del self._entries[include_private]
+            return None
+
+        return entry.body
+
+    def put(self, include_private: bool, version: int, built_on: date, body: bytes) -> None:
+        """
+        Args:
+            include_private: whether the roster includes the officers' private info
+            version: the cache version from before the roster was read
+            built_on: the date the roster was read for
+            body: the serialized roster
+        """
+        if version != self.version:
+            return
+        self._entries[include_private] = _RosterEntry(version, built_on, time.monotonic(), body)
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self.invalidated_at = time.monotonic()
+        self._entries.clear()
+
+    def invalidated_within(self, seconds: float) -> bool:
+        return time.monotonic() - self.invalidated_at <= seconds
+
+    def clear(self) -> None:
+        self.invalidated_at = -math.inf
+        self._entries.clear()
+
+
+roster_cache = RosterCache()
+
+
+async def current_roster(db_session: database.DBSession, include_private: bool) -> bytes:
+    """The current officers as JSON, from the cache if possible."""
+    body = roster_cache.get(include_private)
+    if body is not None:
+        return body
+
+    version, today = roster_cache.version, date.today()
+    manager = database.sessionmanager
+    if (
+        manager is not None
+        and manager.replica_engine is not None
+        and roster_cache.invalidated_within(manager.max_replica_lag)
+    ):
+        # The replica may not have the write that invalidated the cache yet, and caching what it returns would serve
+        # the old roster under the new version until the TTL, so read it from the primary
+        async with manager.primary_read_session() as primary_session:
+            curr_officers = await officers.crud.current_officers(primary_session, include_private)
+    else:
+        curr_officers = await officers.crud.current_officers(db_session, include_private)
+    body = officers_json(curr_officers)
+    roster_cache.put(include_private, version, today, body)
+    return body
+
+
+# ----------------------- #
+# invalidation
+
+
+# The roster includes the officers' photos, so changing an image asset can change it too
+_ROSTER_TABLES = (OfficerTermDB, OfficerInfoDB, ImageAssetDB)
+
+
+def _is_roster_table(instance: object) -> bool:
+    return isinstance(instance, _ROSTER_TABLES)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_roster_changes(session: Session, _: UOWTransaction):
+    if not any(_is_roster_table(instance) for instance in (*session.new, *session.dirty, *session.deleted)):
+        return
+
+    roster_cache.invalidate()
+    session.info[_ROSTER_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_roster_changes(session: Session):
+    # The roster may have been re-cached between the flush and the commit, so invalidate again
+    if session.info.pop(_ROSTER_CHANGED_KEY, False):
+        roster_cache.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _invalidate_rolled_back_roster_changes(session: Session, _):
+    # The session may have cached a roster with its own changes before rolling them back
+    if session.info.pop(_ROSTER_CHANGED_KEY, False):
+        roster_cache.invalidate()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _invalidate_bulk_roster_changes(orm_execute_state: ORMExecuteState):
+    if orm_execute_state.is_select:
+        return
+
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in _ROSTER_TABLES:
+        _logger.debug("bulk change to the officer tables, invalidating the roster cache")
+        roster_cache.invalidate()
+        orm_execute_state.session.info[_ROSTER_CHANGED_KEY] = True
@@ -4,6 +4,12 @@ from enum import StrEnum
 OFFICER_POSITION_MAX = 128
 OFFICER_LEGAL_NAME_MAX = 128
 
+OFFICERS_PAGE_SIZE = 500  # terms fetched per query when streaming every officer term
+OFFICERS_MAX_PAGE_SIZE = 1000
+OFFICERS_SEARCH_PAGE_SIZE = 50  # default number of search results per page
+
+ROSTER_CACHE_TTL = 60  # seconds a cached current officers roster is served before it's read from the database again
+
 
 class OfficerPositionEnum(StrEnum):
     PRESIDENT = "president"
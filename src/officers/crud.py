@@ -1,40 +1,76 @@
+import re
+from collections.abc import AsyncIterator, Iterable
 from datetime import date
+from typing import Any
 
 from fastapi import HTTPException
-from sqlalchemy import delete, select, update
+from sqlalchemy import Row, delete, exists, func, or_, select, union, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import auth.crud
 import database
+import statements
 import utils
 from auth.tables import SiteUserDB
 from data import semesters
-from officers.constants import OfficerPosition, OfficerPositionEnum
-from officers.models import Officer, OfficerCreate
-from officers.tables import OfficerInfoDB, OfficerTermDB
+from image_asset.models import ResponsiveImage
+from image_asset.tables import ImageAssetDB
+from officers.constants import OFFICERS_SEARCH_PAGE_SIZE, OfficerPosition, OfficerPositionEnum
+from officers.models import Officer, OfficerCreate, OfficerCursor, officer_photo
+from officers.tables import (
+    OFFICER_INFO_SEARCH_VECTOR,
+    OFFICER_TERM_SEARCH_VECTOR,
+    SIMPLE_TEXT_SEARCH,
+    OfficerInfoDB,
+    OfficerTermDB,
+)
 
 # NOTE: this module should not do any data validation; that should be done in the urls.py or higher layer
 
 
+# The columns of an `Officer`, so rows can be turned into one by `_row_officer` without loading ORM entities.
+# Public officers only have the public fields set, so they can be dumped with `exclude_unset`.
+# The photo columns come from an outer join of the term's photo, so the photos of a whole page are fetched with it.
+PUBLIC_OFFICER_COLUMNS = (
+    OfficerTermDB.id.label("term_id"),
+    OfficerInfoDB.legal_name,
+    OfficerTermDB.position,
+    OfficerTermDB.start_date,
+    OfficerTermDB.end_date,
+    OfficerTermDB.biography,
+    ImageAssetDB.storage_key.label("photo_storage_key"),
+    ImageAssetDB.width.label("photo_width"),
+    ImageAssetDB.height.label("photo_height"),
+)
+PRIVATE_OFFICER_COLUMNS = (
+    *PUBLIC_OFFICER_COLUMNS,
+    OfficerInfoDB.discord_id,
+    OfficerInfoDB.discord_name,
+    OfficerInfoDB.discord_nickname,
+    OfficerInfoDB.computing_id,
+    OfficerInfoDB.phone_number,
+    OfficerInfoDB.github_username,
+    OfficerInfoDB.google_drive_email,
+    OfficerTermDB.photo_url,
+)
+
+
+def _row_officer(row: Row) -> Officer:
+    fields = dict(row._mapping)
+    storage_key, width, height = fields.pop("photo_storage_key"), fields.pop("photo_width"), fields.pop("photo_height")
+    photo = ResponsiveImage.from_asset(storage_key, width, height) if storage_key is not None else None
+    return Officer.model_validate(fields | {"photo": photo})
+
+
 async def current_officers(db_session: database.DBSession, include_private: bool = False) -> list[Officer]:
     """
     Get info about officers that are active. Go through all active & complete officer terms.
     """
-    curr_time = date.today()
-    query = (
-        select(OfficerTermDB, OfficerInfoDB)
-        .join(OfficerInfoDB, OfficerTermDB.computing_id == OfficerInfoDB.computing_id)
-        .where(
-            (OfficerTermDB.start_date <= curr_time)
-            & ((OfficerTermDB.end_date >= curr_time) | OfficerTermDB.end_date.is_(None))
-        )
-        .order_by(OfficerTermDB.start_date.desc())
-    )
-
-    result = (await db_session.execute(query)).all()
+    result = (await db_session.execute(statements.current_officer_terms(date.today()))).all()
     officer_list = []
     if include_private:
-        for term, officer in result:
+        for term, officer, photo in result:
             officer_list.append(
                 Officer(
                     term_id=term.id,
@@ -51,81 +87,163 @@ async def current_officers(db_session: database.DBSession, include_private: bool
                     github_username=officer.github_username,
                     google_drive_email=officer.google_drive_email,
                     photo_url=term.photo_url,
+                    photo=officer_photo(photo),
                 )
             )
     else:
-        for term, officer in result:
-            officer_list.append(Officer.public_fields(term, officer))
+        for term, officer, photo in result:
+            officer_list.append(Officer.public_fields(term, officer, photo))
 
     return officer_list
 
 
-async def get_current_terms_by_position(
-    db_session: database.DBSession, position: OfficerPositionEnum, computing_id: str | None = None
-) -> list[OfficerTermDB]:
+async def get_current_terms_by_positions(
+    db_session: database.DBSession, positions: Iterable[OfficerPositionEnum], computing_id: str | None = None
+) -> dict[OfficerPositionEnum, list[OfficerTermDB]]:
     """
-    Get current officer that holds a position
+    Who holds each of these positions now, such as for syncing Discord, GitHub, and Google permissions.
+    Every position is a key of the result, mapped to its current terms with the most recent start date first, so a
+    vacant position has no terms.
+
+    This is one query on the partial index of terms that haven't ended, no matter how many positions there are.
     """
-    curr_time = date.today()
+    terms_by_position: dict[OfficerPositionEnum, list[OfficerTermDB]] = {position: [] for position in positions}
+    if not terms_by_position:
+        return {}
+
     query = (
         select(OfficerTermDB)
-        .where(
-            (OfficerTermDB.start_date <= curr_time)
-            & (OfficerTermDB.end_date >= curr_time)
-            & (OfficerTermDB.position == position)
-        )
-        .order_by(OfficerTermDB.start_date.desc())
+        .where(OfficerTermDB.position.in_(terms_by_position))
+        .order_by(OfficerTermDB.start_date.desc(), OfficerTermDB.id)
     )
-    if computing_id:
-        query.where(OfficerTermDB.computing_id == computing_id)
+    query = utils.is_active_officer(query)
+    if computing_id is not None:
+        query = query.where(OfficerTermDB.computing_id == computing_id)
+
+    for term in await db_session.scalars(query):
+        terms_by_position[term.position].append(term)
+    return terms_by_position
 
-    result = list((await db_session.scalars(query)).all())
 
-    return result
+async def get_current_terms_by_position(
+    db_session: database.DBSession, position: OfficerPositionEnum, computing_id: str | None = None
+) -> list[OfficerTermDB]:
+    """
+    Get current officer that holds a position
+    """
+    return (await get_current_terms_by_positions(db_session, [position], computing_id))[position]
 
 
 async def get_all_officers(
-    db_session: AsyncSession, include_future_terms: bool, include_private: bool
+    db_session: AsyncSession,
+    include_future_terms: bool,
+    include_private: bool,
+    limit: int | None = None,
+    after: OfficerCursor | None = None,
 ) -> list[Officer]:
     """
-    This could be a lot of data, so be careful
+    Officer terms, most recent first.
+
+    Terms are ordered by start_date descending then id, and a page starts right after the `after` cursor, so each page
+    is a range scan of the index on those columns no matter how deep into the history it is.
     """
     query = (
-        select(OfficerTermDB, OfficerInfoDB)
+        select(*(PRIVATE_OFFICER_COLUMNS if include_private else PUBLIC_OFFICER_COLUMNS))
         .join(OfficerInfoDB, OfficerTermDB.computing_id == OfficerInfoDB.computing_id)
-        .order_by(OfficerTermDB.start_date.desc())
+        .outerjoin(ImageAssetDB, OfficerTermDB.photo_image_id == ImageAssetDB.image_id)
+        .order_by(OfficerTermDB.start_date.desc(), OfficerTermDB.id)
+        .limit(limit)
     )
     if not include_future_terms:
         query = utils.has_started_term(query)
-    officer_list = []
-    # NOTE: paginate data if needed
-    result = (await db_session.execute(query)).all()
+    if after is not None:
+        query = query.where(
+            (OfficerTermDB.start_date < after.start_date)
+            | ((OfficerTermDB.start_date == after.start_date) & (OfficerTermDB.id > after.term_id))
+        )
+    return [_row_officer(row) for row in await db_session.execute(query)]
 
-    if include_private:
-        for term, officer in result:
-            officer_list.append(
-                Officer(
-                    term_id=term.id,
-                    legal_name=officer.legal_name,
-                    position=term.position,
-                    start_date=term.start_date,
-                    end_date=term.end_date,
-                    biography=term.biography,
-                    discord_id=officer.discord_id,
-                    discord_name=officer.discord_name,
-                    discord_nickname=officer.discord_nickname,
-                    computing_id=officer.computing_id,
-                    phone_number=officer.phone_number,
-                    github_username=officer.github_username,
-                    google_drive_email=officer.google_drive_email,
-                    photo_url=term.photo_url,
-                )
-            )
-    else:
-        for term, officer in result:
-            officer_list.append(Officer.public_fields(term, officer))
 
-    return officer_list
+async def iter_all_officers(
+    db_session: AsyncSession,
+    include_future_terms: bool,
+    include_private: bool,
+    page_size: int,
+    after: OfficerCursor | None = None,
+) -> AsyncIterator[list[Officer]]:
+    """Every officer term after the cursor, most recent first, fetched one page at a time."""
+    while True:
+        page = await get_all_officers(db_session, include_future_terms, include_private, page_size, after)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = OfficerCursor.after(page[-1])
+
+
+def _prefix_tsquery(search: str) -> str | None:
+    """
+    Turns free text into a tsquery matching every word as a prefix, so results show up while a name is being typed.
+    Only word characters are kept, so the text can't inject tsquery operators.
+    """
+    words = re.findall(r"\w+", search.lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+async def search_officers(
+    db_session: AsyncSession,
+    search: str | None,
+    include_private: bool,
+    position: OfficerPositionEnum | None = None,
+    active_from: date | None = None,
+    active_to: date | None = None,
+    limit: int = OFFICERS_SEARCH_PAGE_SIZE,
+    offset: int = 0,
+) -> list[Officer]:
+    """
+    Started officer terms where either the officer's legal name, or the term's nickname and position, contain a word
+    starting with each word of `search`. Matches are ranked by how well they match, then ordered like
+    `get_all_officers`.
+
+    Args:
+        position: only terms for this position
+        active_from: only terms that hadn't ended before this date
+        active_to: only terms that had started by this date
+    """
+    query = (
+        select(*(PRIVATE_OFFICER_COLUMNS if include_private else PUBLIC_OFFICER_COLUMNS))
+        .join(OfficerInfoDB, OfficerTermDB.computing_id == OfficerInfoDB.computing_id)
+        .outerjoin(ImageAssetDB, OfficerTermDB.photo_image_id == ImageAssetDB.image_id)
+        .limit(limit)
+        .offset(offset)
+    )
+    query = utils.has_started_term(query)
+    if position is not None:
+        query = query.where(OfficerTermDB.position == position)
+    if active_from is not None:
+        query = query.where(or_(OfficerTermDB.end_date.is_(None), OfficerTermDB.end_date >= active_from))
+    if active_to is not None:
+        query = query.where(OfficerTermDB.start_date <= active_to)
+
+    order_by = [OfficerTermDB.start_date.desc(), OfficerTermDB.id]
+    tsquery_text = _prefix_tsquery(search) if search is not None else None
+    if tsquery_text is not None:
+        tsquery = func.to_tsquery(SIMPLE_TEXT_SEARCH, tsquery_text)
+        # Each side of the union is a lookup on its own table's search index, which an OR across the join couldn't use
+        matching_terms = union(
+            select(OfficerTermDB.id)
+            .join(OfficerInfoDB, OfficerTermDB.computing_id == OfficerInfoDB.computing_id)
+            .where(OFFICER_INFO_SEARCH_VECTOR.op("@@")(tsquery)),
+            select(OfficerTermDB.id).where(OFFICER_TERM_SEARCH_VECTOR.op("@@")(tsquery)),
+        )
+        query = query.where(OfficerTermDB.id.in_(matching_terms))
+        # a term matching on both its officer's name and its nickname or position ranks above one matching on either
+        rank = func.ts_rank(OFFICER_INFO_SEARCH_VECTOR, tsquery) + func.ts_rank(OFFICER_TERM_SEARCH_VECTOR, tsquery)
+        order_by.insert(0, rank.desc())
+
+    return [_row_officer(row) for row in await db_session.execute(query.order_by(*order_by))]
 
 
 async def get_officer_info_or_raise(db_session: database.DBSession, computing_id: str) -> OfficerInfoDB:
@@ -135,14 +253,10 @@ async def get_officer_info_or_raise(db_session: database.DBSession, computing_id
     return officer_term
 
 
-async def get_new_officer_info_or_raise(db_session: database.DBSession, computing_id: str) -> OfficerInfoDB:
-    """
-    This check is for after a create/update
-    """
-    officer_term = await db_session.scalar(select(OfficerInfoDB).where(OfficerInfoDB.computing_id == computing_id))
-    if officer_term is None:
-        raise HTTPException(status_code=500, detail=f"failed to fetch {computing_id} after update")
-    return officer_term
+async def get_officer_infos(db_session: database.DBSession, computing_ids: Iterable[str]) -> dict[str, OfficerInfoDB]:
+    """The officer info of each of these users, by computing ID, in one query."""
+    query = select(OfficerInfoDB).where(OfficerInfoDB.computing_id.in_(list(computing_ids)))
+    return {officer_info.computing_id: officer_info for officer_info in await db_session.scalars(query)}
 
 
 async def get_officer_terms(
@@ -182,6 +296,24 @@ async def get_active_officer_terms(
     return list((await db_session.scalars(query)).all())
 
 
+async def has_officer_term_ending_since(db_session: database.DBSession, computing_id: str, since: date) -> bool:
+    """
+    Whether the user has a started term that is active or ended on or after `since`.
+    This is a single lookup on the (computing_id, position, start_date) unique index.
+    """
+    return bool(
+        await db_session.scalar(
+            select(
+                exists().where(
+                    OfficerTermDB.computing_id == computing_id,
+                    OfficerTermDB.start_date <= date.today(),
+                    or_(OfficerTermDB.end_date.is_(None), OfficerTermDB.end_date >= since),
+                )
+            )
+        )
+    )
+
+
 async def current_officer_positions(
     db_session: database.DBSession, computing_id: str, positions: list[OfficerPositionEnum] | None = None
 ) -> list[str]:
@@ -233,51 +365,47 @@ async def create_new_officer_term(db_session: database.DBSession, new_officer_te
     db_session.add(new_officer_term)
 
 
-async def create_multiple_officers(db_session: database.DBSession, new_officers: list[OfficerCreate]):
-    computing_ids = {term.computing_id for term in new_officers}
+async def create_multiple_officers(
+    db_session: database.DBSession, new_officers: list[OfficerCreate]
+) -> list[OfficerTermDB]:
+    """
+    Creates a term for each new officer, along with their site user and officer info if they don't have them yet.
 
-    # Prepare new officer info
-    # If it's someone's first time being added as an officer, we need to create their Officer Info entry first
-    existing_officer_infos = set(
-        (
-            await db_session.scalars(
-                select(OfficerInfoDB.computing_id).where(OfficerInfoDB.computing_id.in_(computing_ids))
-            )
-        ).all()
-    )
+    This is three statements no matter how many officers there are. If someone is in the list more than once, their
+    first entry's info is used.
+    """
+    if not new_officers:
+        return []
 
-    new_officer_infos = []
-    seen_computing_ids: set[str] = set()  # Just in case duplicate slips through
+    # Site users and officer info are only created for people who don't have them yet
+    await db_session.execute(
+        insert(SiteUserDB)
+        .values([{"computing_id": computing_id} for computing_id in {off.computing_id for off in new_officers}])
+        .on_conflict_do_nothing(index_elements=[SiteUserDB.computing_id])
+    )
+    new_officer_infos = {}
     for off in new_officers:
-        if off.computing_id not in existing_officer_infos and off.computing_id not in seen_computing_ids:
-            new_officer_infos.append(
-                OfficerInfoDB(
-                    computing_id=off.computing_id,
-                    legal_name=off.legal_name,
-                    phone_number=off.phone_number,
-                    discord_id=off.discord_id,
-                    discord_name=off.discord_name,
-                    discord_nickname=off.discord_nickname,
-                    google_drive_email=off.google_drive_email,
-                    github_username=off.github_username,
-                )
-            )
-            seen_computing_ids.add(off.computing_id)
-
-    # Get existing site users and create ones that are missing
-    existing_site_users = set(
-        (
-            await db_session.scalars(select(SiteUserDB.computing_id).where(SiteUserDB.computing_id.in_(computing_ids)))
-        ).all()
+        new_officer_infos.setdefault(
+            off.computing_id,
+            {
+                "computing_id": off.computing_id,
+                "legal_name": off.legal_name,
+                "phone_number": off.phone_number,
+                "discord_id": off.discord_id,
+                "discord_name": off.discord_name,
+                "discord_nickname": off.discord_nickname,
+                "google_drive_email": off.google_drive_email,
+                "github_username": off.github_username,
+            },
+        )
+    await db_session.execute(
+        insert(OfficerInfoDB)
+        .values(list(new_officer_infos.values()))
+        .on_conflict_do_nothing(index_elements=[OfficerInfoDB.computing_id])
     )
-    new_site_users = [
-        SiteUserDB(computing_id=cid, first_logged_in=None, last_logged_in=None)
-        for cid in computing_ids
-        if cid not in existing_site_users
-    ]
 
     # Prepare officer terms with computed end dates
-    new_officer_terms: list[OfficerTermDB] = []
+    new_officer_terms = []
     for off in new_officers:
         end_date = off.end_date
         if end_date is None:
@@ -288,56 +416,45 @@ async def create_multiple_officers(db_session: database.DBSession, new_officers:
                     position_length,
                 )
         new_officer_terms.append(
-            OfficerTermDB(
-                computing_id=off.computing_id,
-                position=off.position,
-                start_date=off.start_date,
-                end_date=end_date,
-                nickname=off.nickname,
-                favourite_course_0=off.favourite_course_0,
-                favourite_course_1=off.favourite_course_1,
-                favourite_pl_0=off.favourite_pl_0,
-                favourite_pl_1=off.favourite_pl_1,
-                biography=off.biography,
-                photo_url=off.photo_url,
-            )
+            {
+                "computing_id": off.computing_id,
+                "position": off.position,
+                "start_date": off.start_date,
+                "end_date": end_date,
+                "nickname": off.nickname,
+                "favourite_course_0": off.favourite_course_0,
+                "favourite_course_1": off.favourite_course_1,
+                "favourite_pl_0": off.favourite_pl_0,
+                "favourite_pl_1": off.favourite_pl_1,
+                "biography": off.biography,
+                "photo_url": off.photo_url,
+                "photo_image_id": off.photo_image_id,
+            }
         )
 
-    # Create all the new entries
-    if new_site_users:
-        db_session.add_all(new_site_users)
-    if new_officer_infos:
-        db_session.add_all(new_officer_infos)
-    db_session.add_all(new_officer_terms)
-
-    # Flush gets the generated IDs, but does not commit
-    await db_session.flush()
-
-    # Refresh each term to ensure all attributes are loaded for Pydantic validation
-    for term in new_officer_terms:
-        await db_session.refresh(term)
-
-    return new_officer_terms
+    # RETURNING gives back the generated IDs and every column, in the order the terms were given.
+    # Rendering the NULLs keeps terms with different unset fields in the same batch.
+    result = await db_session.scalars(
+        insert(OfficerTermDB).returning(OfficerTermDB, sort_by_parameter_order=True),
+        new_officer_terms,
+        execution_options={"render_nulls": True},
+    )
+    return list(result.all())
 
 
 async def update_officer_info(db_session: database.DBSession, new_officer_info: OfficerInfoDB) -> bool:
     """
     Return False if the officer doesn't exist yet
     """
-    officer_info = await db_session.scalar(
-        select(OfficerInfoDB).where(OfficerInfoDB.computing_id == new_officer_info.computing_id)
-    )
-    if officer_info is None:
-        return False
-
     # NOTE: if there's ever an insert entry error, it will raise SQLAlchemyError
     # see: https://stackoverflow.com/questions/2136739/how-to-check-and-handle-errors-in-sqlalchemy
-    await db_session.execute(
+    updated_computing_id = await db_session.scalar(
         update(OfficerInfoDB)
-        .where(OfficerInfoDB.computing_id == officer_info.computing_id)
+        .where(OfficerInfoDB.computing_id == new_officer_info.computing_id)
         .values(new_officer_info.to_update_dict())
+        .returning(OfficerInfoDB.computing_id)
     )
-    return True
+    return updated_computing_id is not None
 
 
 async def update_officer_term(
@@ -348,14 +465,84 @@ async def update_officer_term(
     Update all officer term data in `new_officer_term` based on the term id.
     Returns false if the above entry does not exist.
     """
-    officer_term = await db_session.scalar(select(OfficerTermDB).where(OfficerTermDB.id == new_officer_term.id))
+    updated_id = await db_session.scalar(
+        update(OfficerTermDB)
+        .where(OfficerTermDB.id == new_officer_term.id)
+        .values(
+            new_officer_term.to_update_dict()
+            | {"is_active": new_officer_term.end_date is None or date.today() <= new_officer_term.end_date}
+        )
+        .returning(OfficerTermDB.id)
+    )
+    return updated_id is not None
+
+
+async def patch_officer_info_or_raise(
+    db_session: database.DBSession, computing_id: str, changes: dict[str, Any]
+) -> OfficerInfoDB:
+    """
+    Updates only the given fields of an officer's info, and returns the updated info from the same statement.
+    Fields that aren't officer info columns, like the term fields of `OfficerInfoUpdate`, are ignored.
+    """
+    changes = {key: value for key, value in changes.items() if key in OfficerInfoDB.__table__.columns}
+    if not changes:
+        return await get_officer_info_or_raise(db_session, computing_id)
+    if "legal_name" in changes and changes["legal_name"] is None:
+        # TODO (#71): same as `OfficerInfoDB.to_update_dict`
+        changes["legal_name"] = "default name"
+
+    officer_info = await db_session.scalar(
+        update(OfficerInfoDB)
+        .where(OfficerInfoDB.computing_id == computing_id)
+        .values(changes)
+        .returning(OfficerInfoDB)
+        .execution_options(populate_existing=True)
+    )
+    if officer_info is None:
+        raise HTTPException(status_code=404, detail=f"officer_info for computing_id={computing_id} does not exist yet")
+    return officer_info
+
+
+async def patch_officer_term_or_raise(
+    db_session: database.DBSession, term_id: int, changes: dict[str, Any]
+) -> OfficerTermDB:
+    """Updates only the given fields of an officer term, and returns the updated term from the same statement."""
+    if not changes:
+        return await get_officer_term_by_id_or_raise(db_session, term_id)
+    if "end_date" in changes:
+        changes = changes | {"is_active": changes["end_date"] is None or date.today() <= changes["end_date"]}
+
+    officer_term = await db_session.scalar(
+        update(OfficerTermDB)
+        .where(OfficerTermDB.id == term_id)
+        .values(changes)
+        .returning(OfficerTermDB)
+        .execution_options(populate_existing=True)
+    )
     if officer_term is None:
-        return False
+        raise HTTPException(status_code=404, detail=f"could not find officer_term with id={term_id}")
+    return officer_term
 
-    await db_session.execute(
-        update(OfficerTermDB).where(OfficerTermDB.id == new_officer_term.id).values(new_officer_term.to_update_dict())
+
+async def update_active_terms(db_session: database.DBSession, today: date) -> list[OfficerTermDB]:
+    """
+    Clears `is_active` on the terms that have ended by `today`, and returns them.
+    Terms that haven't started yet are already flagged, so there is nothing to set.
+    """
+    ended = await db_session.scalars(
+        update(OfficerTermDB)
+        .where(OfficerTermDB.is_active, ~utils.term_not_ended_on(today))
+        .values(is_active=False)
+        .returning(OfficerTermDB)
+        .execution_options(populate_existing=True)
     )
-    return True
+    return list(ended.all())
+
+
+async def get_terms_starting_on(db_session: database.DBSession, day: date) -> list[OfficerTermDB]:
+    """The terms that start on `day`, if it hasn't passed yet. These are still flagged, so they're found with its index."""
+    query = select(OfficerTermDB).where(OfficerTermDB.is_active, OfficerTermDB.start_date == day)
+    return list((await db_session.scalars(query)).all())
 
 
 async def delete_officer_term_by_id(db_session: database.DBSession, term_id: int):
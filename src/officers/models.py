@@ -1,9 +1,12 @@
+import base64
 from datetime import date
 from typing import Self
 
 from pydantic import BaseModel, ConfigDict, Field, computed_field
 
 from constants import COMPUTING_ID_LEN
+from image_asset.models import ResponsiveImage
+from image_asset.tables import ImageAssetDB
 from officers.constants import OFFICER_LEGAL_NAME_MAX, OfficerPosition, OfficerPositionEnum
 from officers.tables import OfficerInfoDB, OfficerTermDB
 from utils import is_active_term
@@ -48,6 +51,7 @@ class OfficerTermCreate(BaseModel):
     favourite_pl_1: str | None = Field(None, max_length=64)
     biography: str | None = None
     photo_url: str | None = None
+    photo_image_id: int | None = None
 
 
 class OfficerTerm(OfficerTermCreate):
@@ -77,6 +81,31 @@ class OfficerTermUpdate(BaseModel):
     favourite_pl_1: str | None = Field(None, max_length=64)
     biography: str | None = None
     photo_url: str | None = None
+    photo_image_id: int | None = None
+
+
+class OfficerCursor(BaseModel):
+    """Position in the list of all officer terms, which is ordered by start_date descending then term_id."""
+
+    start_date: date
+    term_id: int
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(f"{self.start_date.isoformat()}:{self.term_id}".encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> Self:
+        """Raises ValueError if the cursor is malformed."""
+        start_date, term_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return cls(start_date=date.fromisoformat(start_date), term_id=int(term_id))
+
+    @classmethod
+    def after(cls, officer: "Officer") -> Self:
+        return cls(start_date=officer.start_date, term_id=officer.term_id)
+
+
+def officer_photo(photo: ImageAssetDB | None) -> ResponsiveImage | None:
+    return ResponsiveImage.from_asset(photo.storage_key, photo.width, photo.height) if photo is not None else None
 
 
 # Concatenated Officer Models
@@ -92,7 +121,7 @@ class OfficerBase(BaseModel):
 
 class Officer(OfficerBase):
     @classmethod
-    def public_fields(cls, term: OfficerTermDB, info: OfficerInfoDB) -> Self:
+    def public_fields(cls, term: OfficerTermDB, info: OfficerInfoDB, photo: ImageAssetDB | None = None) -> Self:
         return cls(
             term_id=term.id,
             legal_name=info.legal_name,
@@ -100,6 +129,7 @@ class Officer(OfficerBase):
             start_date=term.start_date,
             end_date=term.end_date,
             biography=term.biography,
+            photo=officer_photo(photo),
         )
 
     @computed_field
@@ -113,6 +143,7 @@ class Officer(OfficerBase):
         return OfficerPosition.to_email(self.position)
 
     term_id: int
+    photo: ResponsiveImage | None = None
 
     # Private Info
     discord_id: str | None = None
@@ -139,6 +170,7 @@ class OfficerCreate(OfficerBase):
     github_username: str | None = None
     google_drive_email: str | None = None
     photo_url: str | None = None
+    photo_image_id: int | None = None
     favourite_course_0: str | None = Field(None, max_length=64)
     favourite_course_1: str | None = Field(None, max_length=64)
     favourite_pl_0: str | None = Field(None, max_length=64)
@@ -0,0 +1,46 @@
+from collections.abc import Iterable
+
+from pydantic import TypeAdapter
+
+from officers.models import Officer, OfficerInfo, OfficerTerm
+from officers.tables import OfficerInfoDB, OfficerTermDB
+
+# Officer responses are written straight to JSON bytes by pydantic's serializer, rather than dumped to python objects
+# with `model_dump(mode="json")` and encoded again by `JSONResponse`.
+# Every response leaves out unset fields, so public officers don't include the private ones.
+
+_OFFICER = TypeAdapter(Officer)
+_OFFICER_LIST = TypeAdapter(list[Officer])
+_OFFICER_TERM = TypeAdapter(OfficerTerm)
+_OFFICER_TERM_LIST = TypeAdapter(list[OfficerTerm])
+_OFFICER_INFO = TypeAdapter(OfficerInfo)
+
+
+def officers_json(officer_list: list[Officer]) -> bytes:
+    return _OFFICER_LIST.dump_json(officer_list, exclude_unset=True)
+
+
+def officers_json_items(officer_list: list[Officer]) -> bytes:
+    """The officers as comma separated JSON objects, without the brackets, for streaming one array in pages."""
+    return officers_json(officer_list)[1:-1]
+
+
+def officers_ndjson(officer_list: list[Officer]) -> bytes:
+    """The officers as newline delimited JSON, one object per line."""
+    return b"".join(_OFFICER.dump_json(officer, exclude_unset=True) + b"\n" for officer in officer_list)
+
+
+def officer_term_json(term: OfficerTermDB) -> bytes:
+    return _OFFICER_TERM.dump_json(_OFFICER_TERM.validate_python(term, from_attributes=True), exclude_unset=True)
+
+
+def officer_terms_json(terms: Iterable[OfficerTermDB]) -> bytes:
+    return _OFFICER_TERM_LIST.dump_json(
+        _OFFICER_TERM_LIST.validate_python(terms, from_attributes=True), exclude_unset=True
+    )
+
+
+def officer_info_json(officer_info: OfficerInfoDB) -> bytes:
+    return _OFFICER_INFO.dump_json(
+        _OFFICER_INFO.validate_python(officer_info, from_attributes=True), exclude_unset=True
+    )
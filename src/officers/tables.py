@@ -3,13 +3,19 @@ from __future__ import annotations
 from datetime import date
 
 from sqlalchemy import (
+    Boolean,
     Date,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
+    func,
+    text,
+    true,
 )
+from sqlalchemy.engine.default import DefaultExecutionContext
 from sqlalchemy.orm import Mapped, mapped_column
 
 from constants import (
@@ -23,6 +29,12 @@ from database import Base
 from officers.constants import OFFICER_LEGAL_NAME_MAX, OFFICER_POSITION_MAX, OfficerPositionEnum
 
 
+def _not_ended(context: DefaultExecutionContext) -> bool:
+    """Whether a term being inserted hasn't ended yet."""
+    end_date = context.get_current_parameters().get("end_date")
+    return end_date is None or date.today() <= end_date
+
+
 # A row represents an assignment of a person to a position.
 # An officer with multiple positions, such as Frosh Chair & DoE, is broken up into multiple assignments.
 class OfficerTermDB(Base):
@@ -36,7 +48,7 @@ class OfficerTermDB(Base):
         nullable=False,
     )
 
-    position: Mapped[OfficerPositionEnum] = mapped_column(String(OFFICER_POSITION_MAX), nullable=False)
+    position: Mapped[OfficerPositionEnum] = mapped_column(String(OFFICER_POSITION_MAX), nullable=False, index=True)
     start_date: Mapped[date] = mapped_column(Date, nullable=False)
     # end_date is only not-specified for positions that don't have a length (ie. webmaster)
     end_date: Mapped[date] = mapped_column(Date, nullable=True)
@@ -49,8 +61,24 @@ class OfficerTermDB(Base):
     favourite_pl_1: Mapped[str] = mapped_column(String(64), nullable=True)
     biography: Mapped[str] = mapped_column(Text, nullable=True)
     photo_url: Mapped[str] = mapped_column(Text, nullable=True)  # some urls get big, best to let it be a string
+    # an uploaded photo, which officer responses include with its scaled down variants
+    photo_image_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("image_asset.image_id", ondelete="SET NULL"), nullable=True, index=True
+    )
 
-    __table_args__ = (UniqueConstraint("computing_id", "position", "start_date"),)  # This needs a comma to work
+    # Whether the term hasn't ended yet, kept up to date when a term is written and by the daily job in `cron/daily.py`,
+    # so the few current and upcoming terms can be found with a partial index instead of comparing every term's dates
+    # to today. Readers still check the dates: upcoming terms are flagged, so a term is never missing on the day it
+    # starts, and the flag of a term that has just ended is only cleared once the job runs.
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=_not_ended, server_default=true())
+
+    __table_args__ = (
+        UniqueConstraint("computing_id", "position", "start_date"),
+        # For finding active terms. Most terms have already ended, so end_date is the selective column and goes first
+        Index("ix_officer_term_end_date_start_date", "end_date", "start_date"),
+        Index("ix_officer_term_active_computing_id", "computing_id", postgresql_where=text("is_active")),
+        Index("ix_officer_term_active_position", "position", postgresql_where=text("is_active")),
+    )
 
     def is_filled_in(self):
         return (
@@ -79,9 +107,22 @@ class OfficerTermDB(Base):
             "favourite_pl_1": self.favourite_pl_1,
             "biography": self.biography,
             "photo_url": self.photo_url,
+            "photo_image_id": self.photo_image_id,
         }
 
 
+# For paging through every term, most recent first
+Index("ix_officer_term_start_date_desc_id", OfficerTermDB.start_date.desc(), OfficerTermDB.id)
+
+# The 'simple' text search configuration lowercases words without stemming them or dropping stop words, which suits
+# names. Queries must use these exact expressions for Postgres to use the indexes on them.
+SIMPLE_TEXT_SEARCH = text("'simple'::regconfig")
+OFFICER_TERM_SEARCH_VECTOR = func.to_tsvector(SIMPLE_TEXT_SEARCH, func.coalesce(OfficerTermDB.nickname, text("''"))).op(
+    "||"
+)(func.to_tsvector(SIMPLE_TEXT_SEARCH, OfficerTermDB.position))
+Index("ix_officer_term_search", OFFICER_TERM_SEARCH_VECTOR, postgresql_using="gin")
+
+
 # this table contains information that we only need a most up-to-date version of, and
 # don't need to keep a history of. However, it also can't be easily updated.
 class OfficerInfoDB(Base):
@@ -128,3 +169,7 @@ class OfficerInfoDB(Base):
             "github_username": self.github_username,
             "google_drive_email": self.google_drive_email,
         }
+
+
+OFFICER_INFO_SEARCH_VECTOR = func.to_tsvector(SIMPLE_TEXT_SEARCH, OfficerInfoDB.legal_name)
+Index("ix_officer_info_search", OFFICER_INFO_SEARCH_VECTOR, postgresql_using="gin")
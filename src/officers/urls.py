@@ -1,19 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from collections.abc import AsyncIterator
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import auth.crud
 import database
+import image_asset.crud
 import officers.crud
 from auth.constants import COOKIE_SESSION_KEY
 from dependencies import LoggedInUser, OptionalUser, perm_admin
+from officers.cache import current_roster
+from officers.constants import (
+    OFFICER_LEGAL_NAME_MAX,
+    OFFICERS_MAX_PAGE_SIZE,
+    OFFICERS_PAGE_SIZE,
+    OFFICERS_SEARCH_PAGE_SIZE,
+    OfficerPositionEnum,
+)
 from officers.models import (
     Officer,
     OfficerCreate,
+    OfficerCursor,
     OfficerInfo,
     OfficerInfoUpdate,
     OfficerTerm,
     OfficerTermUpdate,
 )
+from officers.serialization import (
+    officer_info_json,
+    officer_term_json,
+    officer_terms_json,
+    officers_json,
+    officers_json_items,
+    officers_ndjson,
+)
 from permission.types import OfficerPrivateInfo
 from utils.permissions import is_user_website_admin, verify_update
 from utils.shared_models import DetailModel, SuccessResponse
@@ -28,7 +50,7 @@ router = APIRouter(
 
 
 async def _has_officer_private_info_access(
-    request: Request, db_session: database.DBSession
+    request: Request, db_session: AsyncSession
 ) -> tuple[
     bool,
     str | None,
@@ -59,36 +81,107 @@ async def _has_officer_private_info_access(
 )
 async def current_officers(
     request: Request,
-    db_session: database.DBSession,
+    db_session: database.ReadOnlyDBSession,
 ):
     has_private_access, _ = await _has_officer_private_info_access(request, db_session)
 
-    curr_officers = await officers.crud.current_officers(db_session, has_private_access)
+    return Response(await current_roster(db_session, has_private_access), media_type="application/json")
+
 
-    return JSONResponse([o.model_dump(mode="json", exclude_unset=True) for o in curr_officers])
+async def _stream_json_array(first_page: list[Officer], rest: AsyncIterator[list[Officer]]) -> AsyncIterator[bytes]:
+    yield b"[" + officers_json_items(first_page)
+    async for page in rest:
+        yield b"," + officers_json_items(page)
+    yield b"]"
+
+
+async def _stream_ndjson(first_page: list[Officer], rest: AsyncIterator[list[Officer]]) -> AsyncIterator[bytes]:
+    yield officers_ndjson(first_page)
+    async for page in rest:
+        yield officers_ndjson(page)
 
 
 @router.get(
     "/all",
-    description="Information for all execs from all exec terms",
+    description="""
+        Information for all execs from all exec terms, most recent first.
+        With a `limit`, returns one page and a `Link` header with the URL of the next page, if there is one.
+        Otherwise streams every term, as newline delimited JSON if the request accepts `application/x-ndjson`.
+    """,
     response_model=list[Officer],
-    responses={403: {"description": "not authorized", "model": DetailModel}},
+    responses={
+        400: {"description": "malformed cursor", "model": DetailModel},
+        403: {"description": "not authorized", "model": DetailModel},
+    },
     operation_id="get_all_officers",
 )
 async def all_officers(
     request: Request,
-    db_session: database.DBSession,
+    db_session: database.ReadOnlyDBSession,
     # Officer terms for officers which have not yet started their term yet are considered private,
     # and may only be accessed by that officer and executives. All other officer terms are public.
     include_future_terms: bool = False,
+    limit: int | None = Query(None, ge=1, le=OFFICERS_MAX_PAGE_SIZE),
+    cursor: str | None = None,
 ):
     has_private_access, computing_id = await _has_officer_private_info_access(request, db_session)
     if include_future_terms and (computing_id is None or not (await is_user_website_admin(computing_id, db_session))):
         raise HTTPException(status_code=401, detail="not authorized")
 
-    all_officers = await officers.crud.get_all_officers(db_session, include_future_terms, has_private_access)
+    try:
+        after = OfficerCursor.decode(cursor) if cursor is not None else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="malformed cursor") from None
+
+    if limit is not None:
+        page = await officers.crud.get_all_officers(db_session, include_future_terms, has_private_access, limit, after)
+        headers = {}
+        if len(page) == limit:
+            next_url = request.url.include_query_params(cursor=OfficerCursor.after(page[-1]).encode())
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return Response(officers_json(page), media_type="application/json", headers=headers)
+
+    # The first page is fetched before the response starts, so it's reported with the request's queries
+    pages = officers.crud.iter_all_officers(
+        db_session, include_future_terms, has_private_access, OFFICERS_PAGE_SIZE, after
+    )
+    first_page = await anext(pages, [])
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(_stream_ndjson(first_page, pages), media_type="application/x-ndjson")
+    return StreamingResponse(_stream_json_array(first_page, pages), media_type="application/json")
 
-    return JSONResponse([officer_data.model_dump(mode="json", exclude_unset=True) for officer_data in all_officers])
+
+@router.get(
+    "/search",
+    description="""
+        Search the history of exec terms that have started. `q` matches words at the start of words in the officer's
+        legal name, or in the term's nickname and position, and the best matches come first.
+        Returns one page, and a `Link` header with the URL of the next page if there may be more results.
+    """,
+    response_model=list[Officer],
+    operation_id="search_officers",
+)
+async def search_officers(
+    request: Request,
+    db_session: database.ReadOnlyDBSession,
+    q: str | None = Query(None, max_length=OFFICER_LEGAL_NAME_MAX),
+    position: OfficerPositionEnum | None = None,
+    # only terms that hadn't ended before `active_from`, and had started by `active_to`
+    active_from: date | None = None,
+    active_to: date | None = None,
+    limit: int = Query(OFFICERS_SEARCH_PAGE_SIZE, ge=1, le=OFFICERS_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    has_private_access, _ = await _has_officer_private_info_access(request, db_session)
+    page = await officers.crud.search_officers(
+        db_session, q, has_private_access, position, active_from, active_to, limit, offset
+    )
+
+    headers = {}
+    if len(page) == limit:
+        next_url = request.url.include_query_params(offset=offset + limit)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return Response(officers_json(page), media_type="application/json", headers=headers)
 
 
 @router.get(
@@ -112,9 +205,7 @@ async def get_officer_terms(
 
     # all term info is public, so anyone can get any of it
     officer_terms = await officers.crud.get_officer_terms(db_session, computing_id, include_future_terms)
-    return JSONResponse(
-        [OfficerTerm.model_validate(term).model_dump(mode="json", exclude_unset=True) for term in officer_terms]
-    )
+    return Response(officer_terms_json(officer_terms), media_type="application/json")
 
 
 @router.get(
@@ -133,7 +224,21 @@ async def get_officer_info(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="not authorized")
 
     officer_info = await officers.crud.get_officer_info_or_raise(db_session, computing_id)
-    return JSONResponse(OfficerInfo.model_validate(officer_info).model_dump(mode="json", exclude_unset=True))
+    return Response(officer_info_json(officer_info), media_type="application/json")
+
+
+async def _raise_if_missing_photos(db_session: database.DBSession, photo_image_ids: set[int | None]):
+    """Officer photos reference image assets, so writing an unknown ID would fail the foreign key."""
+    photo_image_ids.discard(None)
+    if not photo_image_ids:
+        return
+
+    missing = photo_image_ids - await image_asset.crud.get_existing_image_ids(db_session, photo_image_ids)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"no image asset with photo_image_id {', '.join(str(image_id) for image_id in sorted(missing))}",
+        )
 
 
 @router.post(
@@ -144,6 +249,7 @@ async def get_officer_info(
     """,
     response_model=list[OfficerTerm],
     responses={
+        400: {"description": "photo image does not exist", "model": DetailModel},
         403: {"description": "must be a website admin", "model": DetailModel},
         500: {"model": DetailModel},
     },
@@ -154,11 +260,12 @@ async def create_officer_term(
     db_session: database.DBSession,
     officer_list: list[OfficerCreate],
 ):
+    await _raise_if_missing_photos(db_session, {officer.photo_image_id for officer in officer_list})
     new_terms = await officers.crud.create_multiple_officers(db_session, officer_list)
-    content = [OfficerTerm.model_validate(term).model_dump(mode="json", exclude_unset=True) for term in new_terms]
+    content = officer_terms_json(new_terms)
 
     await db_session.commit()
-    return JSONResponse(content)
+    return Response(content, media_type="application/json")
 
 
 @router.patch(
@@ -171,7 +278,7 @@ async def create_officer_term(
     response_model=OfficerInfo,
     responses={
         403: {"description": "must be a website admin", "model": DetailModel},
-        500: {"description": "failed to fetch after update", "model": DetailModel},
+        404: {"description": "officer info does not exist", "model": DetailModel},
     },
     operation_id="update_officer_info",
 )
@@ -183,18 +290,15 @@ async def update_officer_info(
 ):
     await verify_update(user_id, db_session, computing_id)
 
-    old_officer_info = await officers.crud.get_officer_info_or_raise(db_session, computing_id)
-    update_data = officer_info_upload.model_dump(exclude_unset=True)
-    for k, v in update_data.items():
-        setattr(old_officer_info, k, v)
-    await officers.crud.update_officer_info(db_session, old_officer_info)
+    updated_officer_info = await officers.crud.patch_officer_info_or_raise(
+        db_session, computing_id, officer_info_upload.model_dump(exclude_unset=True)
+    )
+    content = officer_info_json(updated_officer_info)
 
     # TODO (#27): log all important changes just to a .log file & persist them for a few years
 
     await db_session.commit()
-
-    updated_officer_info = await officers.crud.get_new_officer_info_or_raise(db_session, computing_id)
-    return JSONResponse(OfficerInfo.model_validate(updated_officer_info).model_dump(mode="json", exclude_unset=True))
+    return Response(content, media_type="application/json")
 
 
 @router.patch(
@@ -202,8 +306,9 @@ async def update_officer_info(
     description="Update the information for an Officer's term",
     response_model=OfficerTerm,
     responses={
+        400: {"description": "photo image does not exist", "model": DetailModel},
         403: {"description": "must be a website admin", "model": DetailModel},
-        500: {"description": "failed to fetch after update", "model": DetailModel},
+        404: {"description": "officer term does not exist", "model": DetailModel},
     },
     operation_id="update_officer_term_by_id",
     dependencies=[Depends(perm_admin)],
@@ -214,24 +319,19 @@ async def update_officer_term(db_session: database.DBSession, term_id: int, body
     For now, only website admins can change these things.
     """
 
-    old_officer_term = await officers.crud.get_officer_term_by_id_or_raise(db_session, term_id)
-
     # TODO: Enable this check if we allow non-website admins to change their information
     # if utils.is_past_term(old_officer_term):
     #     raise HTTPException(status_code=403, detail="you may not update past terms")
 
-    new_data = body.model_dump(exclude_unset=True)
-
-    for key, value in new_data.items():
-        setattr(old_officer_term, key, value)
-
     # TODO (#27): log all important changes to a .log file
-    await officers.crud.update_officer_term(db_session, old_officer_term)
+    await _raise_if_missing_photos(db_session, {body.photo_image_id})
+    new_officer_term = await officers.crud.patch_officer_term_or_raise(
+        db_session, term_id, body.model_dump(exclude_unset=True)
+    )
+    content = officer_term_json(new_officer_term)
 
     await db_session.commit()
-    await db_session.refresh(old_officer_term)
-
-    return JSONResponse(OfficerTerm.model_validate(old_officer_term).model_dump(mode="json", exclude_unset=True))
+    return Response(content, media_type="application/json")
 
 
 @router.delete(
@@ -1,27 +1,23 @@
 from datetime import date
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
 import database
 import officers.crud
-import utils
-from data.semesters import step_semesters
+from data.semesters import earliest_date_within_semesters
+
+# how many semesters after their last term an exec keeps access to private officer info
+PRIVATE_INFO_NUM_SEMESTERS = 5
 
 
 # TODO: Determine if we still need this
 class OfficerPrivateInfo:
     @staticmethod
-    async def has_permission(db_session: database.DBSession, computing_id: str) -> bool:
+    async def has_permission(db_session: AsyncSession, computing_id: str) -> bool:
         """
         A user has access to private officer info if they've been an exec sometime in the past 5 semesters.
         A semester is defined in semester_start
         """
-
-        term_list = await officers.crud.get_officer_terms(db_session, computing_id, include_future_terms=False)
-        for term in term_list:
-            if utils.is_active_term(term):
-                return True
-
-            NUM_SEMESTERS = 5
-            if date.today() <= step_semesters(term.end_date, NUM_SEMESTERS):
-                return True
-
-        return False
+        # a term ending on or after this date ended within the past 5 semesters, and active terms end after today
+        since = earliest_date_within_semesters(date.today(), PRIVATE_INFO_NUM_SEMESTERS)
+        return await officers.crud.has_officer_term_ending_since(db_session, computing_id, since)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_logger = logging.getLogger(__name__)
+
+# Key in the connection info holding the start times of the statements being executed
+_START_TIMES_KEY = "query_log_start_times"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_OR_PARAMETER = re.compile(r"(?<![\w.])(?:\$\d+|-?\d+(?:\.\d+)?)\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUE_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Strips the values out of a SQL statement, so every execution of the same query looks the same.
+
+    Literals and bind parameters become `?`, and lists of them (e.g. `IN (...)` or multi-row `VALUES`) are
+    collapsed to `(...)`, so the normalized statement doesn't change with the number of values either.
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_OR_PARAMETER.sub("?", statement)
+    statement = _VALUE_LIST.sub("(...)", statement)
+    statement = _VALUE_ROWS.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def fingerprint(normalized_statement: str) -> str:
+    return hashlib.sha1(normalized_statement.encode("utf-8")).hexdigest()[:16]
+
+
+class QueryLog:
+    """
+    Logs database queries as JSON, one line per query.
+
+    Every query slower than `slow_threshold` is logged as a warning, and a random `sample_rate` fraction of the rest
+    is logged as info, so the log stays cheap enough to leave on during load tests.
+    """
+
+    def __init__(self, sample_rate: float, slow_threshold: float | None):
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+
+    def install(self, engine: AsyncEngine) -> None:
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn: Connection, *_: Any) -> None:
+        conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        _parameters: Any,
+        _context: ExecutionContext | None,
+        executemany: bool,
+    ) -> None:
+        duration = time.perf_counter() - conn.info[_START_TIMES_KEY].pop()
+
+        slow = self.slow_threshold is not None and duration >= self.slow_threshold
+        if not slow and random.random() >= self.sample_rate:
+            return
+
+        normalized = normalize_statement(statement)
+        _logger.log(
+            logging.WARNING if slow else logging.INFO,
+            json.dumps(
+                {
+                    "event": "query",
+                    "fingerprint": fingerprint(normalized),
+                    "statement": normalized,
+                    "duration_ms": round(duration * 1000, 3),
+                    "rows": cursor.rowcount,
+                    "executemany": executemany,
+                    "slow": slow,
+                }
+            ),
+        )
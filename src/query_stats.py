@@ -0,0 +1,123 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from sqlalchemy.sql.elements import ReleaseSavepointClause, RollbackToSavepointClause, SavepointClause
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import settings
+
+_logger = logging.getLogger(__name__)
+
+# Key in the connection info holding the start times of the statements being executed
+_START_TIMES_KEY = "query_stats_start_times"
+
+# Savepoints are bookkeeping of the transaction, not queries made by the endpoint
+_SAVEPOINT_CLAUSES = (SavepointClause, ReleaseSavepointClause, RollbackToSavepointClause)
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements executed while handling one request.
+
+    Attributes:
+        queries: number of statements sent to the database
+        db_time: seconds spent executing them
+        statements: the SQL of each statement, in order
+    """
+
+    queries: int = 0
+    db_time: float = 0.0
+    statements: list[str] = field(default_factory=list)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_time * 1000:.1f};desc="queries={self.queries}"'
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    """The stats of the request being handled, or None outside of a request."""
+    return _current_stats.get()
+
+
+def start_query_stats() -> QueryStats:
+    """Count the statements executed from here on in the current context, e.g. in a test or a script."""
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def _is_savepoint(context: ExecutionContext | None) -> bool:
+    compiled = context.compiled if context is not None else None
+    return compiled is not None and isinstance(compiled.statement, _SAVEPOINT_CLAUSES)
+
+
+# SQLAlchemy runs the driver in a greenlet that shares the caller's context, so these see the request's stats
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn: Connection, *_: Any):
+    if _current_stats.get() is not None:
+        conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Connection,
+    _cursor: Any,
+    statement: str,
+    _parameters: Any,
+    context: ExecutionContext | None,
+    _executemany: bool,
+):
+    stats = _current_stats.get()
+    start_times = conn.info.get(_START_TIMES_KEY)
+    if stats is None or not start_times:
+        return
+
+    duration = time.perf_counter() - start_times.pop()
+    if _is_savepoint(context):
+        return
+
+    stats.queries += 1
+    stats.db_time += duration
+    stats.statements.append(statement)
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the database statements of each request and reports them in a `Server-Timing` header.
+
+    Statements run by background tasks after the response has started aren't included in the header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            if settings.query_stats_log:
+                _logger.info(
+                    "%s %s: %s queries in %.1f ms", scope["method"], scope["path"], stats.queries, stats.db_time * 1000
+                )
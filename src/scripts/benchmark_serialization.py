@@ -0,0 +1,86 @@
+# Compares serializing officer responses with `model_dump(mode="json")` and `JSONResponse` against writing them straight
+# to JSON bytes with `officers.serialization`. No database is needed; run from `src/` with
+# `python -m scripts.benchmark_serialization`.
+import argparse
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import configure_mappers
+
+from officers.constants import OfficerPositionEnum
+from officers.models import Officer, OfficerTerm
+from officers.serialization import officer_terms_json, officers_json
+from officers.tables import OfficerInfoDB, OfficerTermDB
+
+
+def _terms(count: int) -> list[OfficerTermDB]:
+    positions = list(OfficerPositionEnum)
+    return [
+        OfficerTermDB(
+            id=i,
+            computing_id=f"s{i}",
+            position=positions[i % len(positions)],
+            start_date=date.today() - timedelta(days=i),
+            end_date=date.today() - timedelta(days=i - 120),
+            nickname=f"Nickname {i}",
+            favourite_course_0="CMPT 120",
+            favourite_course_1="MACM 101",
+            favourite_pl_0="Python",
+            favourite_pl_1="C",
+            biography="Hi! I'm an officer and I do lots of cool things! :)",
+            photo_url=None,
+        )
+        for i in range(count)
+    ]
+
+
+def _officers(terms: list[OfficerTermDB]) -> list[Officer]:
+    return [
+        Officer.public_fields(term, OfficerInfoDB(computing_id=term.computing_id, legal_name=f"Officer {term.id}"))
+        for term in terms
+    ]
+
+
+def _dump_officers(officer_list: list[Officer]) -> bytes:
+    return JSONResponse([officer.model_dump(mode="json", exclude_unset=True) for officer in officer_list]).body
+
+
+def _dump_officer_terms(terms: list[OfficerTermDB]) -> bytes:
+    return JSONResponse(
+        [OfficerTerm.model_validate(term).model_dump(mode="json", exclude_unset=True) for term in terms]
+    ).body
+
+
+def per_call(serialize: Callable[[], bytes], iterations: int) -> float:
+    """Seconds spent per call serializing a response body."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        serialize()
+    return (time.perf_counter() - start) / iterations
+
+
+def main(num_terms: int, iterations: int):
+    configure_mappers()
+    terms = _terms(num_terms)
+    officer_list = _officers(terms)
+    benchmarks: dict[str, tuple[Callable[[], bytes], Callable[[], bytes]]] = {
+        "officers": (lambda: _dump_officers(officer_list), lambda: officers_json(officer_list)),
+        "officer_terms": (lambda: _dump_officer_terms(terms), lambda: officer_terms_json(terms)),
+    }
+
+    print(f"{num_terms} terms per response")
+    print(f"{'response':<16}{'model_dump (ms)':>18}{'dump_json (ms)':>18}{'speedup':>10}")
+    for name, (before_fn, after_fn) in benchmarks.items():
+        before = per_call(before_fn, iterations)
+        after = per_call(after_fn, iterations)
+        print(f"{name:<16}{before * 1e3:>18.2f}{after * 1e3:>18.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serializing officer responses")
+    parser.add_argument("--terms", type=int, default=1000, help="number of terms in each response")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+    main(args.terms, args.iterations)
@@ -0,0 +1,92 @@
+# Compares the per request overhead of building and compiling the hot queries with `select()` against the cached
+# statements in `statements.py`. No database is needed; run from `src/` with `python -m scripts.benchmark_statements`.
+import argparse
+import time
+from collections.abc import Callable
+from datetime import UTC, date, datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.sql.base import Executable
+
+import statements
+from auth.tables import UserSessionDB
+from elections.tables import ElectionDB
+from event.tables import EventDB
+from image_asset.tables import ImageAssetDB
+from officers.tables import OfficerInfoDB, OfficerTermDB
+
+
+def _session_computing_id() -> Executable:
+    return select(UserSessionDB.computing_id).where(
+        UserSessionDB.session_hash == b"0" * 32,
+        UserSessionDB.expires_at >= datetime.now(UTC),
+    )
+
+
+def _current_officer_terms() -> Executable:
+    today = date.today()
+    return (
+        select(OfficerTermDB, OfficerInfoDB, ImageAssetDB)
+        .join(OfficerInfoDB, OfficerTermDB.computing_id == OfficerInfoDB.computing_id)
+        .outerjoin(ImageAssetDB, OfficerTermDB.photo_image_id == ImageAssetDB.image_id)
+        .where(
+            OfficerTermDB.is_active
+            & (OfficerTermDB.start_date <= today)
+            & ((OfficerTermDB.end_date >= today) | OfficerTermDB.end_date.is_(None))
+        )
+        .order_by(OfficerTermDB.start_date.desc())
+    )
+
+
+def _election_by_slug() -> Executable:
+    return select(ElectionDB).where(ElectionDB.slug == "spring-2026")
+
+
+def _all_events() -> Executable:
+    return select(EventDB)
+
+
+QUERIES: dict[str, tuple[Callable[[], Executable], Callable[[], Executable]]] = {
+    "session_computing_id": (
+        _session_computing_id,
+        lambda: statements.session_computing_id(b"0" * 32, datetime.now(UTC)),
+    ),
+    "current_officer_terms": (_current_officer_terms, lambda: statements.current_officer_terms(date.today())),
+    "election_by_slug": (_election_by_slug, lambda: statements.election_by_slug("spring-2026")),
+    "all_events": (_all_events, statements.all_events),
+}
+
+
+def per_call_overhead(build: Callable[[], Executable], iterations: int) -> float:
+    """
+    Seconds spent per call building a statement and finding its compiled SQL, like `Connection.execute` does.
+
+    The compiled SQL cache is shared by all calls, so only the first call compiles.
+    """
+    dialect = asyncpg_dialect()
+    compiled_cache = {}
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        statement = build()
+        cache_key = statement._generate_cache_key().key  # pyright: ignore[reportAttributeAccessIssue]
+        if cache_key not in compiled_cache:
+            compiled_cache[cache_key] = statement.compile(dialect=dialect)  # pyright: ignore[reportAttributeAccessIssue]
+    return (time.perf_counter() - start) / iterations
+
+
+def main(iterations: int):
+    configure_mappers()
+    print(f"{'query':<24}{'select() (us)':>16}{'cached (us)':>16}{'speedup':>10}")
+    for name, (build_select, build_cached) in QUERIES.items():
+        before = per_call_overhead(build_select, iterations)
+        after = per_call_overhead(build_cached, iterations)
+        print(f"{name:<24}{before * 1e6:>16.1f}{after * 1e6:>16.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the cached statements against select()")
+    parser.add_argument("--iterations", type=int, default=5000)
+    main(parser.parse_args().iterations)
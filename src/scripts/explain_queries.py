@@ -0,0 +1,165 @@
+# Runs EXPLAIN (ANALYZE) on every query issued by the hot CRUD functions against a scaled up copy of the test database,
+# and fails if a query reads a whole table when it only needs a few of its rows.
+#
+# Load the test database with `python load_test_db.py` first, then run from `src/` with
+# `python -m scripts.explain_queries`. The synthetic data from `load_test_db.load_scaled_data` is loaded in a
+# transaction that is rolled back at the end, so the test database is left as it was.
+import argparse
+import asyncio
+import sys
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+import auth.crud
+import candidates.crud
+import elections.crud
+import event.crud
+import officers.crud
+from database import SQLALCHEMY_TEST_DATABASE_URL
+from load_test_db import SCALED_TABLES, load_scaled_data
+from officers.constants import OfficerPositionEnum
+from officers.models import OfficerCursor
+
+
+@dataclass
+class Check:
+    name: str
+    run: Callable[[AsyncSession], Awaitable[object]]
+    # scaled tables the query is meant to read in full
+    full_scans: frozenset[str] = field(default_factory=frozenset)
+
+
+TODAY = date.today()
+CHECKS = [
+    Check("get_session_computing_id", lambda db: auth.crud.get_session_computing_id(db, "s1")),
+    Check("get_session_with_roles", lambda db: auth.crud.get_session_with_roles(db, (1).to_bytes(32))),
+    Check("get_site_user", lambda db: auth.crud.get_site_user(db, "s1")),
+    Check("get_user_sessions", lambda db: auth.crud.get_user_sessions(db, "s1")),
+    Check("task_clean_expired_user_sessions", auth.crud.task_clean_expired_user_sessions),
+    Check("task_clean_expired_auth_redirects", auth.crud.task_clean_expired_auth_redirects),
+    Check(
+        "task_clean_refilled_rate_limit_buckets",
+        lambda db: auth.crud.task_clean_refilled_rate_limit_buckets(db, 600),
+    ),
+    Check("delete_auth_redirect", lambda db: auth.crud.delete_auth_redirect(db, "s1")),
+    Check("current_officers", officers.crud.current_officers),
+    Check(
+        "get_current_terms_by_position",
+        lambda db: officers.crud.get_current_terms_by_position(db, OfficerPositionEnum.PRESIDENT, "s1"),
+    ),
+    Check(
+        "get_current_terms_by_positions",
+        lambda db: officers.crud.get_current_terms_by_positions(db, list(OfficerPositionEnum)),
+    ),
+    Check("get_officer_infos", lambda db: officers.crud.get_officer_infos(db, [f"s{i}" for i in range(50)])),
+    Check("get_officer_terms", lambda db: officers.crud.get_officer_terms(db, "s1", include_future_terms=True)),
+    Check("get_active_officer_terms", lambda db: officers.crud.get_active_officer_terms(db, "s1")),
+    Check(
+        "has_officer_term_ending_since",
+        lambda db: officers.crud.has_officer_term_ending_since(db, "s1", TODAY - timedelta(days=365 * 2)),
+    ),
+    # every term is read, so hashing the officers and their photos beats looking each one up
+    Check(
+        "get_all_officers",
+        lambda db: officers.crud.get_all_officers(db, include_future_terms=True, include_private=False),
+        frozenset({"officer_term", "officer_info", "image_asset"}),
+    ),
+    Check(
+        "get_all_officers (page)",
+        lambda db: officers.crud.get_all_officers(
+            db, True, False, limit=100, after=OfficerCursor(start_date=TODAY - timedelta(days=365 * 50), term_id=0)
+        ),
+    ),
+    Check("update_active_terms", lambda db: officers.crud.update_active_terms(db, TODAY + timedelta(days=1))),
+    Check("get_terms_starting_on", lambda db: officers.crud.get_terms_starting_on(db, TODAY)),
+    Check("search_officers", lambda db: officers.crud.search_officers(db, "officer 1234", include_private=False)),
+    Check("get_election", lambda db: elections.crud.get_election(db, "scale-1")),
+    Check(
+        "get_all_elections_with_nominees",
+        lambda db: elections.crud.get_all_elections_with_nominees(db, datetime.now(UTC), has_permission=True),
+        frozenset({"election", "election_nominee_application", "election_nominee_info"}),
+    ),
+    # an election's candidates are a large share of all nominees, so hashing the nominees beats looking each one up
+    Check(
+        "get_election_nominees",
+        lambda db: elections.crud.get_election_nominees(db, "scale-1", has_permission=True),
+        frozenset({"election_nominee_info"}),
+    ),
+    Check("get_all_candidates_in_election", lambda db: candidates.crud.get_all_candidates_in_election(db, "scale-1")),
+    Check("get_all_events", event.crud.get_all_events, frozenset({"event_info"})),
+    Check("get_events_for_this_year", lambda db: event.crud.get_events_for_this_year(db, TODAY.year)),
+    Check(
+        "get_events_for_this_year_month",
+        lambda db: event.crud.get_events_for_this_year_month(db, TODAY.year, TODAY.month),
+    ),
+]
+
+
+def _plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+async def explain(conn: AsyncConnection, db_session: AsyncSession, check: Check) -> bool:
+    """Runs a check's CRUD function, then explains each statement it issued. Returns whether they all passed."""
+    issued = []
+
+    def record(_conn, _cursor, statement, parameters, _context, _executemany):
+        if not statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE")):
+            issued.append((statement, parameters))
+
+    sqlalchemy.event.listen(conn.sync_connection, "before_cursor_execute", record)
+    try:
+        await check.run(db_session)
+    finally:
+        sqlalchemy.event.remove(conn.sync_connection, "before_cursor_execute", record)
+
+    passed = True
+    for statement, parameters in issued:
+        result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters)
+        plan = result.scalar_one()[0]
+        seq_scans = {
+            node["Relation Name"]
+            for node in _plan_nodes(plan["Plan"])
+            if node["Node Type"] == "Seq Scan" and node["Relation Name"] in SCALED_TABLES
+        } - check.full_scans
+
+        status = "FAIL" if seq_scans else "ok"
+        print(f"{status:<6}{check.name:<36}{plan['Execution Time']:>10.3f} ms")
+        for table in sorted(seq_scans):
+            print(f"      sequential scan on {table}")
+        passed = passed and not seq_scans
+
+    return passed
+
+
+async def main(scale: int, random_page_cost: float) -> bool:
+    engine = create_async_engine(SQLALCHEMY_TEST_DATABASE_URL)
+    try:
+        async with engine.connect() as conn:
+            await conn.begin()
+            await conn.exec_driver_sql(f"SET LOCAL random_page_cost = {random_page_cost}")
+            await load_scaled_data(conn, scale)
+            # CRUD functions that commit only release a savepoint, so everything is rolled back at the end
+            db_session = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+            results = [await explain(conn, db_session, check) for check in CHECKS]
+            await db_session.close()
+            await conn.rollback()
+    finally:
+        await engine.dispose()
+    return all(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN the CRUD queries against a scaled up test database")
+    parser.add_argument("--scale", type=int, default=100_000, help="number of synthetic users to add")
+    # Postgres' default of 4 models spinning disks, which makes the planner prefer hashing a whole table over a few
+    # hundred index lookups. Our database is on an SSD, where 1.1 is the usual setting.
+    parser.add_argument("--random-page-cost", type=float, default=1.1, help="planner cost of a random page read")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.scale, args.random_page_cost)) else 1)
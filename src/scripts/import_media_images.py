@@ -8,6 +8,7 @@ from sqlalchemy import select
 import database
 import image_asset.crud
 from config import settings
+from image_asset.variants import is_variant, save_variants
 
 _logger = logging.getLogger(__name__)
 
@@ -21,7 +22,7 @@ async def import_existing_images():
 
     async with database.sessionmanager.session() as session:
         for path in image_dir.rglob("*"):
-            if not path.is_file():
+            if not path.is_file() or is_variant(path):
                 continue
 
             storage_key = path.relative_to(settings.media_root).as_posix()
@@ -34,9 +35,17 @@ async def import_existing_images():
                 continue
 
             print(f"Adding {storage_key}")
+            try:
+                width, height = save_variants(path)
+            except OSError:
+                # still import it, it just won't have variants
+                _logger.warning("Failed to save the variants of %s", path, exc_info=True)
+                width = height = None
             asset = image_asset.crud.ImageAssetDB(
                 storage_key=storage_key,
                 original_filename=path.name,
+                width=width,
+                height=height,
                 created_at=datetime.now(UTC),
             )
 
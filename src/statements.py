@@ -0,0 +1,52 @@
+from datetime import date, datetime
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from auth.tables import UserSessionDB
+from elections.tables import ElectionDB
+from event.tables import EventDB
+from image_asset.tables import ImageAssetDB
+from officers.tables import OfficerInfoDB, OfficerTermDB
+
+# Cached statements for the hottest queries.
+#
+# A `select()` is rebuilt and its cache key recomputed on every call, even when its compiled SQL is already cached.
+# A `lambda_stmt` is only built the first time; after that SQLAlchemy reuses the statement and its compiled SQL, and
+# only pulls the new values of the variables the lambda closes over, which become bound parameters.
+# Only close over plain values (never build a different statement depending on them), or the cache will be wrong.
+# See: https://docs.sqlalchemy.org/en/20/core/connections.html#quick-guidelines-for-lambdas
+# `scripts/benchmark_statements.py` compares the two.
+
+
+def session_computing_id(session_hash: bytes, now: datetime) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(UserSessionDB.computing_id).where(
+            UserSessionDB.session_hash == session_hash,
+            UserSessionDB.expires_at >= now,
+        )
+    )
+
+
+def current_officer_terms(today: date) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: (
+            select(OfficerTermDB, OfficerInfoDB, ImageAssetDB)
+            .join(OfficerInfoDB, OfficerTermDB.computing_id == OfficerInfoDB.computing_id)
+            .outerjoin(ImageAssetDB, OfficerTermDB.photo_image_id == ImageAssetDB.image_id)
+            .where(
+                OfficerTermDB.is_active
+                & (OfficerTermDB.start_date <= today)
+                & ((OfficerTermDB.end_date >= today) | OfficerTermDB.end_date.is_(None))
+            )
+            .order_by(OfficerTermDB.start_date.desc())
+        )
+    )
+
+
+def election_by_slug(slug: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(ElectionDB).where(ElectionDB.slug == slug))
+
+
+def all_events() -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(EventDB))
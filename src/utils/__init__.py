@@ -1,7 +1,9 @@
 import re
 from datetime import date
 
-from sqlalchemy import Select
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Select
+from sqlalchemy.orm import InstrumentedAttribute
 
 # we can't use and/or in sql expressions, so we must use these functions
 from sqlalchemy.sql.expression import and_, or_
@@ -9,23 +11,52 @@ from sqlalchemy.sql.expression import and_, or_
 from officers.tables import OfficerTermDB
 
 
+def term_not_ended_on(
+    today: date, end_date: ColumnElement[date | None] = OfficerTermDB.end_date
+) -> ColumnElement[bool]:
+    """
+    Whether a term with this end date hasn't ended by `today`, as a SQL expression. By default, for the term's current
+    end date. This is what `OfficerTermDB.is_active` is kept in sync with.
+    """
+    return or_(
+        # executives without a specified end_date are considered active
+        end_date.is_(None),
+        # check that today's timestamp is before (smaller than) the term's end date
+        today <= end_date,
+    )
+
+
+def term_active_on(
+    today: date,
+    start_date: ColumnElement[date] = OfficerTermDB.start_date,
+    end_date: ColumnElement[date | None] = OfficerTermDB.end_date,
+) -> ColumnElement[bool]:
+    """Whether a term with these dates is active on `today`, as a SQL expression. By default, for the term's current dates."""
+    return and_(
+        # cannot be an officer who has not started yet
+        start_date <= today,
+        term_not_ended_on(today, end_date),
+    )
+
+
 def is_active_officer(query: Select) -> Select:
     """
     An active officer is one who is currently part of the CSSS officer team.
     That is, they are not upcoming, or in the past.
     """
-    return query.where(
-        and_(
-            # cannot be an officer who has not started yet
-            OfficerTermDB.start_date <= date.today(),
-            or_(
-                # executives without a specified end_date are considered active
-                OfficerTermDB.end_date.is_(None),
-                # check that today's timestamp is before (smaller than) the term's end date
-                date.today() <= OfficerTermDB.end_date,
-            ),
-        )
-    )
+    # The flag narrows the query down to the partial index of terms that haven't ended. The dates are still checked,
+    # since upcoming terms are flagged too, and the flag of a term that ended yesterday is only cleared by the daily job.
+    return query.where(OfficerTermDB.is_active, term_active_on(date.today()))
+
+
+def model_columns(model: type[BaseModel], table: type) -> list[InstrumentedAttribute]:
+    """
+    The columns of a table with the same names as the fields of a model.
+
+    Selecting these instead of the whole ORM entity returns plain rows that can be validated straight into the model,
+    without the entities being tracked by the session.
+    """
+    return [getattr(table, field) for field in model.model_fields]
 
 
 def has_started_term(query: Select) -> Select[tuple[OfficerTermDB]]:
@@ -1,11 +1,13 @@
 from enum import Enum, StrEnum
 
 from fastapi import HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import auth
 import auth.crud
 import database
 import officers.crud
+from auth.cache import CachedSession, session_cache
 from auth.constants import COOKIE_SESSION_KEY, UserRole
 from auth.tables import SiteUserRoleDB
 from officers.constants import OfficerPositionEnum
@@ -39,10 +41,78 @@ ROLE_HIERARCHY: dict[UserRole, set[UserRole]] = {
 }
 
 
+def _role_closure(role: UserRole) -> frozenset[UserRole]:
+    closure = {role}
+    pending = [role]
+    while pending:
+        for implied in ROLE_HIERARCHY[pending.pop()]:
+            if implied not in closure:
+                closure.add(implied)
+                pending.append(implied)
+    return frozenset(closure)
+
+
+# Every role a user with the key role satisfies, including itself
+EFFECTIVE_ROLES: dict[UserRole, frozenset[UserRole]] = {role: _role_closure(role) for role in ROLE_HIERARCHY}
+
+
 def role_satisfies(user_role: UserRole, required_role: UserRole) -> bool:
     return (user_role == required_role) or required_role in ROLE_HIERARCHY[user_role]
 
 
+def effective_roles(user_roles: list[UserRole]) -> frozenset[UserRole]:
+    return frozenset().union(*(EFFECTIVE_ROLES[role] for role in user_roles))
+
+
+async def _load_session(db_session: AsyncSession, session_hash: bytes) -> CachedSession | None:
+    result = await auth.crud.get_session_with_roles(db_session, session_hash)
+    if result is None:
+        return None
+
+    computing_id, expires_at, roles = result
+    return CachedSession(computing_id=computing_id, expires_at=expires_at, roles=effective_roles(roles))
+
+
+async def get_session(db_session: AsyncSession, session_id: str) -> CachedSession | None:
+    """
+    Resolve a session to its user and effective roles from the database, so a session that was logged out or revoked
+    by any worker is rejected straight away.
+
+    Args:
+        db_session: The database session.
+        session_id: The session ID from the request's cookie.
+
+    Returns:
+        The resolved session, or None if the session is invalid or expired.
+    """
+    return await _load_session(db_session, auth.crud.hash_session_id(session_id))
+
+
+async def get_cached_session(db_session: AsyncSession, session_id: str) -> CachedSession | None:
+    """
+    Resolve a session to its user and effective roles, using the in-memory session cache when possible.
+
+    Only for `/auth/verify`, which nginx calls for every protected asset. The cache is per worker, so a session that
+    another worker logged out or revoked is accepted here until its entry reaches the TTL.
+
+    Args:
+        db_session: The database session, only used on a cache miss.
+        session_id: The session ID from the request's cookie.
+
+    Returns:
+        The resolved session, or None if the session is invalid or expired.
+    """
+    session_hash = auth.crud.hash_session_id(session_id)
+    cached = session_cache.get(session_hash)
+    if cached is not None:
+        return cached
+
+    cached = await _load_session(db_session, session_hash)
+    if cached is not None:
+        session_cache.put(session_hash, cached)
+    return cached
+
+
 async def roles_satisfy(db_session: database.DBSession, computing_id: str, required_role: UserRole) -> bool:
     """
     Check if any of the user's roles satisfy the required role.
@@ -65,7 +135,7 @@ async def is_user_role(db_session: database.DBSession, computing_id: str, role:
 
 
 # TODO: Add an election admin version that checks the election attempting to be modified as well
-async def is_user_election_admin(computing_id: str, db_session: database.DBSession) -> bool:
+async def is_user_election_admin(computing_id: str, db_session: AsyncSession) -> bool:
     """
     An current election officer has access to all election, prior election officers have no access.
     """
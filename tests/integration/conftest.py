@@ -7,12 +7,22 @@ import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
+from auth.cache import session_cache
 from auth.constants import COOKIE_SESSION_KEY
 from auth.crud import create_user_session, remove_user_session_by_id
+from auth.ratelimit import memory_rate_limit_store
+from auth.renewal import session_renewer
 from config import settings
-from database import SQLALCHEMY_TEST_DATABASE_URL, DatabaseSessionManager, get_db_session
+from database import (
+    SQLALCHEMY_TEST_DATABASE_URL,
+    DatabaseSessionManager,
+    DBSession,
+    get_db_session,
+    get_read_db_session,
+)
 from load_test_db import SYSADMIN_COMPUTING_ID, async_main
 from main import app
+from officers.cache import roster_cache
 
 TEST_FRONTEND_ORIGIN = "http://frontend.test"
 
@@ -61,8 +71,18 @@ async def client(
         ) as session:
             yield session
 
+    # savepoints of two sessions on the same connection can't interleave, so read only routes share the request's session
+    async def override_get_read_db_session(db_session: DBSession):
+        yield db_session
+
     app.dependency_overrides[get_db_session] = override_get_db_session
+    app.dependency_overrides[get_read_db_session] = override_get_read_db_session
     monkeypatch.setattr(settings, "allowed_origins", [TEST_FRONTEND_ORIGIN])
+    # every test rolls back its transaction, so nothing cached by a previous test is valid
+    session_cache.clear()
+    session_renewer.clear()
+    memory_rate_limit_store.clear()
+    roster_cache.clear()
     # base_url is just a random placeholder url
     # ASGITransport is just telling the async client to pass all requests to app
     # `async with` syntax used so that the connecton will automatically be closed once done
@@ -8,9 +8,11 @@ from urllib.parse import parse_qs, urlsplit
 import httpx
 import pytest
 import sqlalchemy
-from httpx import AsyncClient, Request, Response
+from httpx import ASGITransport, AsyncClient, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import auth.crud
+from auth.cache import SessionCache
 from auth.constants import (
     CAS_LOGIN_URL,
     CAS_VALIDATE_URL,
@@ -22,8 +24,11 @@ from auth.constants import (
     UserRole,
 )
 from auth.crud import create_user_session
-from auth.tables import AuthRedirectDB, SiteUserRoleDB, UserSessionDB
+from auth.ratelimit import task_clean_rate_limit_buckets
+from auth.renewal import session_renewer
+from auth.tables import AuthRedirectDB, RateLimitBucketDB, SiteUserRoleDB, UserSessionDB
 from config import settings
+from load_test_db import SYSADMIN_COMPUTING_ID
 from main import app
 
 pytestmark = pytest.mark.asyncio(loop_scope="session")
@@ -557,3 +562,230 @@ async def test__verify_enforces_role_hierarchy(
     )
 
     assert response.status_code == expected_status
+
+
+async def test__verify_sees_role_changes_after_the_session_is_cached(
+    client: AsyncClient,
+    db_session: AsyncSession,
+):
+    computing_id = "cached"
+    await _create_logged_in_client(db_session, client, "cached-session", computing_id)
+
+    before_response = await client.get("/auth/verify", headers={"X-Required-Role": UserRole.EXEC.value})
+    db_session.add(SiteUserRoleDB(computing_id=computing_id, role=UserRole.ADMIN, added_by=None))
+    await db_session.commit()
+    after_response = await client.get("/auth/verify", headers={"X-Required-Role": UserRole.EXEC.value})
+
+    assert before_response.status_code == HTTPStatus.FORBIDDEN
+    assert after_response.status_code == HTTPStatus.NO_CONTENT
+
+
+async def test__verify_rejects_a_cached_session_after_logout(client: AsyncClient, db_session: AsyncSession):
+    await _create_logged_in_client(db_session, client, "cached-logout-session", "cachedlogout")
+
+    verify_response = await client.get("/auth/verify")
+    session_id = client.cookies[COOKIE_SESSION_KEY]
+    await client.post("/auth/logout")
+    client.cookies.set(COOKIE_SESSION_KEY, session_id, domain="test.local", path="/")
+    after_logout_response = await client.get("/auth/verify")
+
+    assert verify_response.status_code == HTTPStatus.NO_CONTENT
+    assert after_logout_response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+async def test__active_session_is_renewed_once_per_interval(client: AsyncClient, db_session: AsyncSession):
+    session_hash = await _create_logged_in_client(db_session, client, "renew-session", "renew")
+    old_expires_at = datetime.now(UTC) + timedelta(minutes=10)
+    await db_session.execute(
+        sqlalchemy.update(UserSessionDB)
+        .where(UserSessionDB.session_hash == session_hash)
+        .values(expires_at=old_expires_at)
+    )
+    await db_session.commit()
+
+    first_response = await client.get("/api/officers/info/renew")
+    second_response = await client.get("/api/officers/info/renew")
+
+    session_cookie = first_response.headers["set-cookie"]
+    assert session_cookie.startswith(f"{COOKIE_SESSION_KEY}=renew-session")
+    assert f"Max-Age={COOKIE_MAX_AGE}" in session_cookie
+    assert "set-cookie" not in second_response.headers
+
+    assert await session_renewer.flush(db_session) == 1
+    db_session.expire_all()
+    user_session = await db_session.get(UserSessionDB, session_hash)
+    assert user_session is not None
+    assert user_session.expires_at > old_expires_at + timedelta(hours=1)
+
+
+async def test__verify_renews_the_session_without_reissuing_the_cookie(client: AsyncClient, db_session: AsyncSession):
+    session_hash = await _create_logged_in_client(db_session, client, "renew-on-verify", "renew")
+    old_expires_at = datetime.now(UTC) + timedelta(minutes=10)
+    await db_session.execute(
+        sqlalchemy.update(UserSessionDB)
+        .where(UserSessionDB.session_hash == session_hash)
+        .values(expires_at=old_expires_at)
+    )
+    await db_session.commit()
+
+    response = await client.get("/auth/verify")
+
+    # nginx wouldn't pass the cookie on from an auth_request subrequest anyway
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert "set-cookie" not in response.headers
+    assert await session_renewer.flush(db_session) == 1
+
+
+async def test__admin_lists_and_revokes_every_session_of_a_user(
+    admin_client: AsyncClient,
+    client: AsyncClient,
+    db_session: AsyncSession,
+):
+    computing_id = "revoked"
+    session_hashes = [await create_user_session(db_session, f"revoke-session-{i}", computing_id) for i in range(3)]
+    await db_session.commit()
+    # put one of the sessions in the cache, as if it had been used recently
+    admin_session_id = client.cookies[COOKIE_SESSION_KEY]
+    client.cookies.set(COOKIE_SESSION_KEY, "revoke-session-0", domain="test.local", path="/")
+    assert (await client.get("/auth/verify")).status_code == HTTPStatus.NO_CONTENT
+    client.cookies = {COOKIE_SESSION_KEY: admin_session_id}
+
+    list_response = await admin_client.get(f"/auth/sessions/{computing_id}")
+    revoke_response = await admin_client.delete(f"/auth/sessions/{computing_id}")
+    after_revoke_response = await admin_client.get(f"/auth/sessions/{computing_id}")
+
+    assert list_response.status_code == HTTPStatus.OK
+    assert len(list_response.json()) == len(session_hashes)
+    assert all(user_session["computing_id"] == computing_id for user_session in list_response.json())
+    assert revoke_response.status_code == HTTPStatus.OK
+    assert revoke_response.json() == {"revoked": len(session_hashes)}
+    assert after_revoke_response.json() == []
+
+    client.cookies.set(COOKIE_SESSION_KEY, "revoke-session-0", domain="test.local", path="/")
+    assert (await client.get("/auth/verify")).status_code == HTTPStatus.UNAUTHORIZED
+
+
+async def test__sessions_revoked_on_another_worker_are_rejected(
+    admin_client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # this worker has the admin's session cached
+    assert (await admin_client.get("/auth/verify")).status_code == HTTPStatus.NO_CONTENT
+    assert (await admin_client.get(f"/auth/sessions/{SYSADMIN_COMPUTING_ID}")).status_code == HTTPStatus.OK
+
+    # another worker, with its own session cache, revokes them
+    with monkeypatch.context() as other_worker:
+        other_worker.setattr(auth.crud, "session_cache", SessionCache())
+        assert await auth.crud.remove_user_sessions(db_session, SYSADMIN_COMPUTING_ID) > 0
+    await db_session.commit()
+
+    response = await admin_client.get(f"/auth/sessions/{SYSADMIN_COMPUTING_ID}")
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    # only nginx's verify subrequests are served from this worker's cache, until the entry reaches its TTL
+    assert (await admin_client.get("/auth/verify")).status_code == HTTPStatus.NO_CONTENT
+
+
+async def test__revoking_sessions_requires_admin(client: AsyncClient, db_session: AsyncSession):
+    await _create_logged_in_client(db_session, client, "not-admin-session", "notadmin")
+
+    response = await client.delete("/auth/sessions/notadmin")
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+@pytest.mark.parametrize("backend", ["memory", "postgres"])
+async def test__login_is_rate_limited_before_writing_an_auth_redirect(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    backend: str,
+):
+    monkeypatch.setattr(settings, "login_rate_limit_backend", backend)
+    monkeypatch.setattr(settings, "login_rate_limit_burst", 2)
+    monkeypatch.setattr(settings, "login_rate_limit_per_minute", 1)
+
+    responses = [await client.get("/auth/login", params={"return_to": TEST_RETURN_TO}) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [
+        HTTPStatus.TEMPORARY_REDIRECT,
+        HTTPStatus.TEMPORARY_REDIRECT,
+        HTTPStatus.TOO_MANY_REQUESTS,
+    ]
+    assert responses[2].headers["Retry-After"] == "60"
+    num_redirects = await db_session.scalar(sqlalchemy.select(sqlalchemy.func.count()).select_from(AuthRedirectDB))
+    assert num_redirects == 2
+    num_buckets = await db_session.scalar(sqlalchemy.select(sqlalchemy.func.count()).select_from(RateLimitBucketDB))
+    assert num_buckets == (1 if backend == "postgres" else 0)
+
+
+async def test__validate_is_rate_limited_per_computing_id(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(settings, "login_rate_limit_burst", 1)
+    _mock_cas_response(monkeypatch, _successful_cas_xml())
+    await _start_login(client)
+    first_response = await client.get("/auth/validate", params={"ticket": TEST_TICKET})
+
+    # a different client, so only the computing ID's bucket is empty
+    async with AsyncClient(transport=ASGITransport(app, client=("10.0.0.2", 123)), base_url="http://test") as other:
+        await _start_login(other)
+        second_response = await other.get("/auth/validate", params={"ticket": TEST_TICKET})
+
+    assert first_response.status_code == HTTPStatus.OK
+    assert second_response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    num_sessions = await db_session.scalar(
+        sqlalchemy.select(sqlalchemy.func.count())
+        .select_from(UserSessionDB)
+        .where(UserSessionDB.computing_id == TEST_COMPUTING_ID)
+    )
+    assert num_sessions == 1
+
+
+async def test__login_is_rate_limited_per_client_behind_a_proxy(client: AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "login_rate_limit_burst", 1)
+
+    async def login(headers: dict[str, str]) -> int:
+        response = await client.get("/auth/login", params={"return_to": TEST_RETURN_TO}, headers=headers)
+        return response.status_code
+
+    # the test client connects from 127.0.0.1, like nginx does, so each forwarded client has its own bucket
+    assert await login({"X-Real-IP": "203.0.113.1"}) == HTTPStatus.TEMPORARY_REDIRECT
+    assert await login({"X-Real-IP": "203.0.113.2"}) == HTTPStatus.TEMPORARY_REDIRECT
+    assert await login({"X-Real-IP": "203.0.113.1"}) == HTTPStatus.TOO_MANY_REQUESTS
+    # only the entry added by the proxy counts, so a client can't get a new bucket by forging the ones before it
+    assert await login({"X-Forwarded-For": "198.51.100.1, 203.0.113.3"}) == HTTPStatus.TEMPORARY_REDIRECT
+    assert await login({"X-Forwarded-For": "198.51.100.2, 203.0.113.3"}) == HTTPStatus.TOO_MANY_REQUESTS
+
+    # headers from a client that isn't a trusted proxy are ignored
+    async with AsyncClient(transport=ASGITransport(app, client=("10.0.0.2", 123)), base_url="http://test") as other:
+        responses = [
+            await other.get("/auth/login", params={"return_to": TEST_RETURN_TO}, headers={"X-Real-IP": forged_ip})
+            for forged_ip in ["203.0.113.4", "203.0.113.5"]
+        ]
+    assert [response.status_code for response in responses] == [
+        HTTPStatus.TEMPORARY_REDIRECT,
+        HTTPStatus.TOO_MANY_REQUESTS,
+    ]
+
+
+async def test__refilled_rate_limit_buckets_are_cleaned_up(db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "login_rate_limit_backend", "postgres")
+    monkeypatch.setattr(settings, "login_rate_limit_burst", 10)
+    monkeypatch.setattr(settings, "login_rate_limit_per_minute", 1)
+    now = datetime.now(UTC)
+    # an empty bucket refills in 10 minutes
+    db_session.add_all(
+        [
+            RateLimitBucketDB(key="refilled", tokens=0, updated_at=now - timedelta(minutes=11)),
+            RateLimitBucketDB(key="refilling", tokens=0, updated_at=now - timedelta(minutes=9)),
+        ]
+    )
+    await db_session.commit()
+
+    await task_clean_rate_limit_buckets(db_session)
+
+    keys = await db_session.scalars(sqlalchemy.select(RateLimitBucketDB.key))
+    assert list(keys) == ["refilling"]
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import cron.daily
+import github
+from github.types import GithubUser, GithubUserPermissions
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test__github_permissions_follow_the_current_officers(
+    db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    # person_a and person_b are the github usernames of current officers, only person_a is in the organization
+    github_permissions = {
+        "person_a": GithubUserPermissions("person_a", []),
+        "past_officer": GithubUserPermissions("past_officer", ["officers"]),
+        "w3_member": GithubUserPermissions("w3_member", ["w3_committee"]),
+    }
+    team_ids = {team: i for i, team in enumerate(github.GITHUB_TEAMS)}
+    team_changes = []
+    invites = []
+
+    async def get_user_by_username(username: str) -> GithubUser:
+        return GithubUser(username, 1000, username)
+
+    monkeypatch.setattr(github, "all_permissions", lambda: (github_permissions, team_ids))
+    monkeypatch.setattr(github, "set_user_teams", lambda *args: team_changes.append(args))
+    monkeypatch.setattr(github, "invite_user", lambda *args: invites.append(args))
+    monkeypatch.setattr(cron.daily, "get_user_by_username", get_user_by_username)
+
+    await cron.daily.update_github_permissions(db_session)
+
+    assert [(username, old_teams) for username, old_teams, _ in team_changes] == [
+        ("person_a", []),
+        ("past_officer", ["officers"]),
+    ]
+    assert "officers" in team_changes[0][2]
+    assert team_changes[1][2] == ["past_officers"]
+    assert [user_id for user_id, _ in invites] == [1000]
+    assert team_ids["officers"] in invites[0][1]
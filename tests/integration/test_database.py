@@ -0,0 +1,291 @@
+import asyncio
+import json
+import logging
+import re
+from collections import defaultdict
+from http import HTTPStatus
+
+import pytest
+import pytest_asyncio
+import sqlalchemy
+from httpx import AsyncClient
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateTable
+
+import database
+from auth.constants import COOKIE_SESSION_KEY
+from database import (
+    SQLALCHEMY_TEST_DATABASE_URL,
+    DatabaseSessionManager,
+    InstrumentedQueuePool,
+    SessionUsage,
+    engine_kwargs,
+    get_db_session,
+)
+from load_test_db import SYSADMIN_COMPUTING_ID, load_scaled_data
+from main import app
+from officers.cache import roster_cache
+from officers.tables import OfficerTermDB
+from query_log import QueryLog
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+@pytest_asyncio.fixture(scope="function", loop_scope="session")
+async def small_pool_manager():
+    kwargs = engine_kwargs() | {"echo": False, "pool_size": 1, "max_overflow": 0, "pool_timeout": 0.1}
+    manager = DatabaseSessionManager(SQLALCHEMY_TEST_DATABASE_URL, kwargs, check_db=False)
+    yield manager
+    await manager.close()
+
+
+async def test__pool_records_checkout_waits_and_timeouts(small_pool_manager: DatabaseSessionManager):
+    pool = small_pool_manager.engine.pool
+    assert isinstance(pool, InstrumentedQueuePool)
+
+    async with small_pool_manager.connect() as connection:
+        await connection.execute(sqlalchemy.text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            async with small_pool_manager.connect():
+                pass
+
+    async def hold_connection():
+        async with small_pool_manager.connect() as connection:
+            await asyncio.sleep(0.05)
+            await connection.execute(sqlalchemy.text("SELECT 1"))
+
+    await asyncio.gather(hold_connection(), hold_connection())
+
+    assert pool.metrics.checkouts == 4
+    assert pool.metrics.timeouts == 1
+    assert pool.metrics.max_wait >= 0.05
+
+
+async def test__admin_can_see_the_pool_status(
+    admin_client: AsyncClient,
+    small_pool_manager: DatabaseSessionManager,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(database, "sessionmanager", small_pool_manager)
+    async with small_pool_manager.connect():
+        pass
+
+    response = await admin_client.get("/api/admin/database/pool")
+
+    assert response.status_code == HTTPStatus.OK
+    pool_status = response.json()
+    assert pool_status["size"] == 1
+    assert pool_status["checked_out"] == 0
+    assert pool_status["checkouts"] == 1
+    assert pool_status["timeouts"] == 0
+
+
+async def test__query_log_logs_slow_queries_and_samples_the_rest(
+    small_pool_manager: DatabaseSessionManager,
+    caplog: pytest.LogCaptureFixture,
+):
+    QueryLog(sample_rate=0, slow_threshold=0.05).install(small_pool_manager.engine)
+
+    with caplog.at_level(logging.INFO, logger="query_log"):
+        async with small_pool_manager.connect() as connection:
+            await connection.execute(sqlalchemy.text("SELECT 1"))
+            await connection.execute(sqlalchemy.text("SELECT pg_sleep(0.1), x FROM generate_series(1, 3) AS x"))
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].levelno == logging.WARNING
+    entry = json.loads(caplog.records[0].getMessage())
+    assert entry["statement"] == "SELECT pg_sleep(?), x FROM generate_series(...) AS x"
+    assert entry["rows"] == 3
+    assert entry["slow"]
+    assert entry["duration_ms"] >= 100
+
+
+@pytest_asyncio.fixture(scope="function", loop_scope="session")
+async def replica_manager():
+    # the test database stands in for the replica; it isn't in recovery, so it never lags
+    manager = DatabaseSessionManager(
+        SQLALCHEMY_TEST_DATABASE_URL,
+        engine_kwargs() | {"echo": False},
+        check_db=False,
+        replica_url=SQLALCHEMY_TEST_DATABASE_URL,
+        max_replica_lag=5,
+    )
+    yield manager
+    await manager.close()
+
+
+async def test__read_sessions_use_the_replica_in_read_only_transactions(replica_manager: DatabaseSessionManager):
+    assert replica_manager.replica_engine is not None
+
+    async with replica_manager.read_session() as session:
+        connection = await session.connection()
+        assert connection.engine.pool is replica_manager.replica_engine.pool
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            await session.execute(sqlalchemy.text("CREATE TEMPORARY TABLE read_only_check (id int)"))
+
+    assert await replica_manager.measure_replica_lag() == 0
+
+
+async def test__read_sessions_fall_back_to_the_primary_when_the_replica_lags(
+    replica_manager: DatabaseSessionManager,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    measurements = []
+
+    async def measure_replica_lag() -> float:
+        measurements.append(60.0)
+        return 60.0
+
+    monkeypatch.setattr(replica_manager, "measure_replica_lag", measure_replica_lag)
+
+    async with replica_manager.read_session() as session:
+        connection = await session.connection()
+        assert connection.engine.pool is replica_manager.engine.pool
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            await session.execute(sqlalchemy.text("CREATE TEMPORARY TABLE read_only_check (id int)"))
+
+    # the lag is only measured once per check interval
+    assert not await replica_manager.use_replica()
+    assert measurements == [60.0]
+
+
+@pytest.mark.parametrize(
+    "route",
+    [
+        "/api/officers/current",
+        "/api/officers/all",
+        "/api/officers/search?q=a",
+        "/api/event",
+        "/api/event/2025",
+        "/api/event/2025/1",
+        "/api/election",
+        "/api/election/test-election-1",
+    ],
+)
+@pytest.mark.parametrize("logged_in", [False, True])
+async def test__read_only_routes_only_use_the_replica(
+    client: AsyncClient,
+    replica_manager: DatabaseSessionManager,
+    monkeypatch: pytest.MonkeyPatch,
+    route: str,
+    logged_in: bool,
+):
+    # use real sessions so each route gets the engine it would in production; none of these routes write anything
+    app.dependency_overrides.clear()
+    monkeypatch.setattr(database, "sessionmanager", replica_manager)
+    assert replica_manager.replica_engine is not None
+    statements = {"primary": 0, "replica": 0}
+
+    def count_statements(name: str):
+        def before_cursor_execute(*args):
+            statements[name] += 1
+
+        return before_cursor_execute
+
+    sqlalchemy.event.listen(replica_manager.engine.sync_engine, "before_cursor_execute", count_statements("primary"))
+    sqlalchemy.event.listen(
+        replica_manager.replica_engine.sync_engine, "before_cursor_execute", count_statements("replica")
+    )
+    if logged_in:
+        client.cookies = {COOKIE_SESSION_KEY: "temp_id_" + SYSADMIN_COMPUTING_ID}
+
+    response = await client.get(route)
+
+    assert response.status_code == HTTPStatus.OK
+    assert statements["primary"] == 0
+    assert statements["replica"] > 0
+
+
+async def test__roster_is_read_from_the_primary_right_after_an_invalidation(
+    client: AsyncClient,
+    replica_manager: DatabaseSessionManager,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    app.dependency_overrides.clear()
+    monkeypatch.setattr(database, "sessionmanager", replica_manager)
+    assert replica_manager.replica_engine is not None
+    # measure the replica lag up front, so the counts below are only the roster's queries
+    assert await replica_manager.use_replica()
+    statements = {"primary": 0, "replica": 0}
+
+    def count_statements(name: str):
+        def before_cursor_execute(*args):
+            statements[name] += 1
+
+        return before_cursor_execute
+
+    sqlalchemy.event.listen(replica_manager.engine.sync_engine, "before_cursor_execute", count_statements("primary"))
+    sqlalchemy.event.listen(
+        replica_manager.replica_engine.sync_engine, "before_cursor_execute", count_statements("replica")
+    )
+
+    roster_cache.invalidate()
+    fresh_response = await client.get("/api/officers/current")
+    fresh_statements = dict(statements)
+    # forget the invalidation, as if the replica has had time to catch up
+    roster_cache.clear()
+    settled_response = await client.get("/api/officers/current")
+
+    assert fresh_response.status_code == HTTPStatus.OK
+    assert fresh_statements["primary"] > 0
+    assert fresh_statements["replica"] == 0
+    assert settled_response.json() == fresh_response.json()
+    assert statements["primary"] == fresh_statements["primary"]
+    assert statements["replica"] > 0
+
+
+async def test__sessions_only_check_out_a_connection_when_used(
+    client: AsyncClient,
+    small_pool_manager: DatabaseSessionManager,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # use real sessions for these requests; neither of them writes anything
+    app.dependency_overrides.pop(get_db_session)
+    monkeypatch.setattr(database, "sessionmanager", small_pool_manager)
+    monkeypatch.setattr(database, "session_usage", defaultdict(SessionUsage))
+
+    await client.post("/auth/logout")
+    await client.post("/auth/logout")
+    client.cookies.set(COOKIE_SESSION_KEY, "no-such-session", domain="test.local", path="/")
+    await client.get("/auth/user")
+
+    assert database.session_usage["/auth/logout"] == SessionUsage(sessions=2, unused=2)
+    assert database.session_usage["/auth/user"] == SessionUsage(sessions=1, unused=0)
+    pool = small_pool_manager.engine.pool
+    assert isinstance(pool, InstrumentedQueuePool)
+    assert pool.metrics.checkouts == 1
+
+
+async def test__responses_report_their_query_count_and_db_time(client: AsyncClient):
+    response = await client.get("/api/officers/current")
+
+    assert response.status_code == HTTPStatus.OK
+    # no session cookie, so only the officers are queried
+    assert re.fullmatch(r'db;dur=\d+\.\d;desc="queries=1"', response.headers["Server-Timing"])
+
+
+async def test__scaled_data_loads_with_its_foreign_keys_intact(db_connection: AsyncConnection):
+    total = await load_scaled_data(db_connection, 20000)
+
+    # users and sessions, 2000 of everything else, 10 elections and their candidates
+    assert total == 20000 * 2 + 2000 * 6 + 10 + 20000
+    candidates_per_election = await db_connection.scalar(
+        sqlalchemy.text(
+            "SELECT min(count) FROM (SELECT count(*) FROM election_nominee_application "
+            "WHERE nominee_election LIKE 'scale-%' GROUP BY nominee_election) AS counts"
+        )
+    )
+    assert candidates_per_election == 2000
+    # the foreign keys were added back
+    with pytest.raises(DBAPIError):
+        async with db_connection.begin_nested():
+            await db_connection.execute(
+                sqlalchemy.text(
+                    "INSERT INTO officer_term (computing_id, position, start_date) VALUES ('nobody', 'president', now())"
+                )
+            )
+    # and the models still create them
+    create_officer_term = str(CreateTable(OfficerTermDB.__table__).compile(dialect=db_connection.dialect))
+    assert "FOREIGN KEY(computing_id) REFERENCES site_user" in create_officer_term
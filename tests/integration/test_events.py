@@ -0,0 +1,58 @@
+from datetime import datetime
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from constants import TZ_INFO
+from event.tables import EventDB
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test__events_by_year_and_month(client: AsyncClient, db_session: AsyncSession):
+    # a New Year's Eve party belongs to both years and both months
+    db_session.add(
+        EventDB(
+            name="New Year's Eve",
+            start_time=datetime(2030, 12, 31, 22, tzinfo=TZ_INFO),
+            end_time=datetime(2031, 1, 1, 2, tzinfo=TZ_INFO),
+        )
+    )
+    await db_session.flush()
+
+    for path in ["/api/event/2030", "/api/event/2031", "/api/event/2030/12", "/api/event/2031/1"]:
+        response = await client.get(path)
+        assert response.status_code == HTTPStatus.OK
+        assert [event["name"] for event in response.json()] == ["New Year's Eve"], path
+
+    for path in ["/api/event/2029", "/api/event/2030/11", "/api/event/2031/2"]:
+        response = await client.get(path)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [], path
+
+    response = await client.get("/api/event/2030/13")
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_CONTENT
+
+
+async def test__events_are_grouped_by_local_year_and_month(client: AsyncClient, db_session: AsyncSession):
+    # this is already January 1st in UTC, but still December 31st in Vancouver
+    db_session.add(
+        EventDB(
+            name="Countdown Social",
+            start_time=datetime(2030, 12, 31, 20, tzinfo=TZ_INFO),
+            end_time=datetime(2030, 12, 31, 23, tzinfo=TZ_INFO),
+        )
+    )
+    await db_session.flush()
+
+    for path in ["/api/event/2030", "/api/event/2030/12"]:
+        response = await client.get(path)
+        assert response.status_code == HTTPStatus.OK
+        assert [event["name"] for event in response.json()] == ["Countdown Social"], path
+
+    for path in ["/api/event/2031", "/api/event/2031/1"]:
+        response = await client.get(path)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [], path
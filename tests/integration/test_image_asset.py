@@ -7,7 +7,7 @@ from uuid import UUID
 import pytest
 from fastapi import UploadFile, status
 from httpx import AsyncClient
-from PIL import Image
+from PIL import ExifTags, Image
 from pydantic import TypeAdapter
 from sqlalchemy.exc import IntegrityError
 
@@ -191,6 +191,52 @@ async def test__admin_upload_good_image(
     assert saved_file.is_file()
 
 
+async def test__admin_upload_saves_variants(db_session: DBSession, admin_client: AsyncClient, tmp_path: Path):
+    response = await admin_client.post(
+        "/api/image",
+        files={"file": ("wide.jpg", make_image("JPEG", size=(1000, 500)), "image/jpeg")},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    asset = ImageAsset.model_validate(response.json())
+    assert (asset.width, asset.height) == (1000, 500)
+    assert [(variant["name"], variant["width"], variant["height"]) for variant in response.json()["variants"]] == [
+        ("thumbnail", 160, 80),
+        ("medium", 640, 320),
+    ]
+    for variant in asset.variants:
+        storage_key = variant.url.removeprefix(f"{settings.media_base_url.rstrip('/')}/")
+        with Image.open(tmp_path / storage_key) as image:
+            assert image.size == (variant.width, variant.height)
+            assert image.format == "JPEG"
+
+    db_asset = await db_session.get(image_asset.crud.ImageAssetDB, asset.image_id)
+    assert db_asset is not None
+    assert (db_asset.width, db_asset.height) == (1000, 500)
+
+
+async def test__admin_upload_applies_exif_orientation(admin_client: AsyncClient, tmp_path: Path):
+    # a portrait photo stored sideways, as phone cameras do, with the rotation in its EXIF orientation
+    buffer = BytesIO()
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = 6
+    Image.new("RGB", (1000, 500)).save(buffer, format="JPEG", exif=exif)
+
+    response = await admin_client.post("/api/image", files={"file": ("portrait.jpg", buffer.getvalue(), "image/jpeg")})
+    assert response.status_code == status.HTTP_201_CREATED
+
+    asset = ImageAsset.model_validate(response.json())
+    assert (asset.width, asset.height) == (500, 1000)
+    assert [(variant.name, variant.width, variant.height) for variant in asset.variants] == [
+        ("thumbnail", 160, 320),
+        ("medium", 500, 1000),
+    ]
+    for variant in asset.variants:
+        storage_key = variant.url.removeprefix(f"{settings.media_base_url.rstrip('/')}/")
+        with Image.open(tmp_path / storage_key) as image:
+            assert image.size == (variant.width, variant.height)
+
+
 @pytest.mark.parametrize(
     ("filename", "content", "content_type", "http_status"),
     [
@@ -261,3 +307,4 @@ async def test__admin_failed_db_insert_is_cleaned_up(
     saved_file = tmp_path / storage_key
 
     assert not saved_file.exists()
+    assert [path.name for path in tmp_path.rglob("*") if path.is_file()] == []
@@ -0,0 +1,97 @@
+import logging
+import time
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+import sqlalchemy
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.constants import CAS_VALIDATE_URL, COOKIE_AUTH_REDIRECT_KEY, COOKIE_SESSION_KEY
+from auth.tables import SiteUserDB, UserSessionDB
+from config import settings
+from main import app
+
+_logger = logging.getLogger(__name__)
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+TEST_APP_URL = "http://api.test"
+TEST_RETURN_ORIGIN = "http://frontend.test"
+NUM_LOGINS = 200
+# fewer users than logins, so both the insert and the "last_logged_in" update paths of the upsert are exercised
+NUM_USERS = 20
+
+
+@pytest.fixture(autouse=True)
+def auth_settings(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "app_url", TEST_APP_URL)
+    monkeypatch.setattr(settings, "allowed_return_origins", [TEST_RETURN_ORIGIN])
+    monkeypatch.setattr(settings, "cookie_secure", False)
+    monkeypatch.setattr(settings, "cookie_domain", None)
+    # every login comes from the same client, so keep the rate limiter out of the measurement
+    monkeypatch.setattr(settings, "login_rate_limit_burst", NUM_LOGINS)
+
+
+def _stub_cas_server(request: httpx.Request) -> httpx.Response:
+    """Answers serviceValidate requests like SFU's CAS, where ticket `ST-<computing_id>-<n>` logs in that user."""
+    url = urlsplit(str(request.url))
+    if f"{url.scheme}://{url.netloc}{url.path}" != CAS_VALIDATE_URL:
+        return httpx.Response(HTTPStatus.NOT_FOUND)
+
+    params = parse_qs(url.query)
+    if params.get("service") != [f"{TEST_APP_URL}/auth/validate"]:
+        return httpx.Response(HTTPStatus.BAD_REQUEST)
+
+    computing_id = params["ticket"][0].split("-")[1]
+    return httpx.Response(
+        HTTPStatus.OK,
+        text=f"""
+        <cas:serviceResponse xmlns:cas="http://www.yale.edu/tp/cas">
+            <cas:authenticationSuccess>
+                <cas:user>{computing_id}</cas:user>
+            </cas:authenticationSuccess>
+        </cas:serviceResponse>
+        """,
+    )
+
+
+async def test__login_throughput(client: AsyncClient, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch):
+    cas_client = httpx.AsyncClient(transport=httpx.MockTransport(_stub_cas_server))
+    monkeypatch.setattr(app.state, "http_client", cas_client, raising=False)
+    computing_ids = [f"load{i}" for i in range(NUM_USERS)]
+
+    validate_time = 0.0
+    for i in range(NUM_LOGINS):
+        client.cookies.clear()
+        response = await client.get("/auth/login", params={"return_to": f"{TEST_RETURN_ORIGIN}/"})
+        assert response.status_code == HTTPStatus.TEMPORARY_REDIRECT
+        assert client.cookies.get(COOKIE_AUTH_REDIRECT_KEY) is not None
+
+        start = time.perf_counter()
+        response = await client.get("/auth/validate", params={"ticket": f"ST-{computing_ids[i % NUM_USERS]}-{i}"})
+        validate_time += time.perf_counter() - start
+        assert response.status_code == HTTPStatus.OK
+        assert COOKIE_SESSION_KEY in client.cookies
+
+    await cas_client.aclose()
+    # shown with `pytest --log-cli-level=INFO`
+    _logger.info("%d logins: %.1f /auth/validate calls per second", NUM_LOGINS, NUM_LOGINS / validate_time)
+
+    num_sessions = await db_session.scalar(
+        sqlalchemy.select(sqlalchemy.func.count())
+        .select_from(UserSessionDB)
+        .where(UserSessionDB.computing_id.in_(computing_ids))
+    )
+    num_users = await db_session.scalar(
+        sqlalchemy.select(sqlalchemy.func.count())
+        .select_from(SiteUserDB)
+        .where(
+            SiteUserDB.computing_id.in_(computing_ids),
+            SiteUserDB.last_logged_in > SiteUserDB.first_logged_in,
+        )
+    )
+    assert num_sessions == NUM_LOGINS
+    assert num_users == NUM_USERS
@@ -4,11 +4,25 @@ from datetime import date, timedelta
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import select, update
 
 import load_test_db
+import officers.cache
+import statements
 from database import DBSession
+from image_asset.tables import ImageAssetDB
 from officers.constants import OfficerPositionEnum
-from officers.crud import current_officers, get_active_officer_terms, get_all_officers
+from officers.crud import (
+    current_officers,
+    get_active_officer_terms,
+    get_all_officers,
+    get_current_terms_by_position,
+    get_current_terms_by_positions,
+    patch_officer_term_or_raise,
+    update_active_terms,
+)
+from officers.tables import OfficerTermDB
+from tests.integration.test_query_budgets import query_count
 
 # TODO: setup a database on the CI machine & run this as a unit test then (since
 # this isn't really an integration test)
@@ -334,3 +348,328 @@ async def test__admin_patch_officer_term(admin_client: AsyncClient):
 
     response = await admin_client.get("/api/officers/all?include_future_terms=True")
     assert len(response.json()) == 5
+
+
+async def test__current_officers_roster_is_cached_until_a_term_changes(admin_client: AsyncClient):
+    response = await admin_client.get("/api/officers/current")
+    assert response.status_code == 200
+    roster = response.json()
+
+    response = await admin_client.get("/api/officers/current")
+    assert response.json() == roster
+    # only the session and permission checks, the roster comes from the cache
+    assert 'desc="queries=2"' in response.headers["Server-Timing"]
+
+    term_id = roster[0]["term_id"]
+    response = await admin_client.delete(f"/api/officers/term/{term_id}")
+    assert response.status_code == 200
+
+    response = await admin_client.get("/api/officers/current")
+    assert [officer["term_id"] for officer in response.json()] == [
+        officer["term_id"] for officer in roster if officer["term_id"] != term_id
+    ]
+
+
+async def test__current_officers_roster_is_rebuilt_on_a_new_day(client: AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    response = await client.get("/api/officers/current")
+    assert response.status_code == 200
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+
+    monkeypatch.setattr(officers.cache, "date", Tomorrow)
+    response = await client.get("/api/officers/current")
+    assert 'desc="queries=1"' in response.headers["Server-Timing"]
+
+
+async def test__get_all_officers_in_pages(admin_client: AsyncClient):
+    response = await admin_client.get("/api/officers/all?include_future_terms=true")
+    assert response.status_code == 200
+    all_terms = response.json()
+    # most recent first, then in the order they were added
+    by_id = sorted(all_terms, key=lambda term: term["term_id"])
+    assert all_terms == sorted(by_id, key=lambda term: term["start_date"], reverse=True)
+
+    paged_terms = []
+    url = "/api/officers/all?include_future_terms=true&limit=4"
+    while url:
+        response = await admin_client.get(url)
+        assert response.status_code == 200
+        paged_terms += response.json()
+        url = response.links.get("next", {}).get("url")
+    assert paged_terms == all_terms
+
+    response = await admin_client.get("/api/officers/all?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+async def test__stream_all_officers_as_ndjson(client: AsyncClient):
+    response = await client.get("/api/officers/all")
+    response_ndjson = await client.get("/api/officers/all", headers={"Accept": "application/x-ndjson"})
+
+    assert response_ndjson.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response_ndjson.text.splitlines()] == response.json()
+
+
+async def test__create_officer_terms_in_constant_queries(admin_client: AsyncClient):
+    def new_officer(computing_id: str, start_date: str = "2027-01-01") -> dict:
+        return {
+            "computing_id": computing_id,
+            "position": OfficerPositionEnum.EXECUTIVE_AT_LARGE,
+            "start_date": start_date,
+            "legal_name": f"Bulk {computing_id}",
+        }
+
+    await admin_client.get("/auth/verify")
+    single = await admin_client.post("/api/officers/term", json=[new_officer("bulk0")])
+    assert single.status_code == status.HTTP_200_OK
+
+    # a mix of new people, an existing officer, and someone with two terms
+    batch = [new_officer(f"bulk{i}") for i in range(1, 21)]
+    batch += [new_officer("abc11"), new_officer("bulk1", "2027-05-01")]
+    batch[0]["nickname"] = "the first"
+    response = await admin_client.post("/api/officers/term", json=batch)
+    assert response.status_code == status.HTTP_200_OK
+    assert query_count(response) == query_count(single)
+
+    terms = response.json()
+    assert [term["computing_id"] for term in terms] == [officer["computing_id"] for officer in batch]
+    assert len({term["id"] for term in terms}) == len(batch)
+    assert all(term["end_date"] is not None for term in terms)
+
+    # existing officer info is left alone
+    response = await admin_client.get("/api/officers/info/abc11")
+    assert response.json()["legal_name"] != "Bulk abc11"
+
+
+async def test__patch_officer_in_one_update(admin_client: AsyncClient):
+    response = await admin_client.patch("/api/officers/term/1", json={"nickname": "patched"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["nickname"] == "patched"
+    assert response.json()["computing_id"] == "abc11"
+    # the session lookup and admin check, then the update
+    assert query_count(response) == 3
+
+    response = await admin_client.patch("/api/officers/term/999999", json={"nickname": "patched"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    # term fields in an info update are ignored
+    response = await admin_client.patch(
+        "/api/officers/info/abc11", json={"discord_name": "patched", "nickname": "not a column"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["discord_name"] == "patched"
+    assert response.json()["legal_name"] == "Person A"
+    assert query_count(response) == 3
+
+
+async def test__search_officers(client: AsyncClient):
+    response = await client.get("/api/officers/search", params={"q": "pers"})
+    assert response.status_code == status.HTTP_200_OK
+    assert sorted(officer["legal_name"] for officer in response.json()) == [
+        "Person A",
+        "Person A",
+        "Person B",
+        "Person C ----",
+    ]
+    assert all("computing_id" not in officer for officer in response.json())
+
+    # every word has to match, here the nickname and position of one term
+    response = await client.get("/api/officers/search", params={"q": "Vice pres"})
+    assert [(officer["legal_name"], officer["position"]) for officer in response.json()] == [
+        ("Person A", OfficerPositionEnum.VICE_PRESIDENT)
+    ]
+
+    # a term matching on both its legal name and nickname ranks first
+    response = await client.get("/api/officers/search", params={"q": "jon briones"})
+    assert [officer["position"] for officer in response.json()] == [
+        OfficerPositionEnum.FIRST_YEAR_REPRESENTATIVE,
+        OfficerPositionEnum.WEBMASTER,
+    ]
+
+    # future terms aren't searched
+    response = await client.get("/api/officers/search", params={"position": OfficerPositionEnum.DIRECTOR_OF_ARCHIVES})
+    assert [officer["legal_name"] for officer in response.json()] == ["Person B"]
+
+    two_years_ago = (date.today() - timedelta(days=365 * 2)).isoformat()
+    response = await client.get("/api/officers/search", params={"active_to": two_years_ago})
+    assert sorted(officer["legal_name"] for officer in response.json()) == ["Jon Andre Briones", "Puneet North"]
+    response = await client.get("/api/officers/search", params={"q": "north", "active_from": two_years_ago})
+    assert [officer["position"] for officer in response.json()] == [OfficerPositionEnum.SYSTEM_ADMINISTRATOR]
+
+    # tsquery operators are ignored
+    response = await client.get("/api/officers/search", params={"q": "!(person) | &"})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 4
+
+
+async def test__search_officers_in_pages(client: AsyncClient):
+    response = await client.get("/api/officers/search", params={"q": "person"})
+    everyone = response.json()
+    assert "Link" not in response.headers
+
+    pages = []
+    url = "/api/officers/search?q=person&limit=3"
+    while url:
+        response = await client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.json())
+        url = response.links.get("next", {}).get("url")
+
+    assert [len(page) for page in pages] == [3, 1]
+    assert [officer for page in pages for officer in page] == everyone
+
+
+async def test__terms_are_flagged_active_when_written(db_session: DBSession):
+    # the terms from load_test_db were all created without setting the flag
+    terms = list(await db_session.scalars(select(OfficerTermDB)))
+    assert any(term.is_active for term in terms)
+    assert all(term.is_active == (term.end_date is None or date.today() <= term.end_date) for term in terms)
+
+    active_term = next(term for term in terms if term.is_active and term.end_date is not None)
+    term = await patch_officer_term_or_raise(db_session, active_term.id, {"end_date": date.today() - timedelta(days=1)})
+    assert not term.is_active
+    # the flag only depends on the end date
+    term = await patch_officer_term_or_raise(db_session, active_term.id, {"start_date": date.today()})
+    assert not term.is_active
+    term = await patch_officer_term_or_raise(db_session, active_term.id, {"end_date": None})
+    assert term.is_active
+    term = await patch_officer_term_or_raise(
+        db_session, active_term.id, {"start_date": date.today() + timedelta(days=7)}
+    )
+    assert term.is_active
+    term = await patch_officer_term_or_raise(db_session, active_term.id, {"nickname": "still active"})
+    assert term.is_active
+
+
+async def test__upcoming_terms_are_active_once_they_start(db_session: DBSession):
+    tomorrow = date.today() + timedelta(days=1)
+    db_session.add(OfficerTermDB(computing_id="abc11", position=OfficerPositionEnum.TREASURER, start_date=tomorrow))
+    await db_session.flush()
+
+    # without the daily job having run, the roster query finds the term on the day it starts, but not before
+    rows = (await db_session.execute(statements.current_officer_terms(tomorrow))).all()
+    assert ("abc11", OfficerPositionEnum.TREASURER) in [(term.computing_id, term.position) for term, *_ in rows]
+    rows = (await db_session.execute(statements.current_officer_terms(date.today()))).all()
+    assert ("abc11", OfficerPositionEnum.TREASURER) not in [(term.computing_id, term.position) for term, *_ in rows]
+    assert await update_active_terms(db_session, tomorrow) == []
+
+
+async def test__update_active_terms(db_session: DBSession):
+    assert await update_active_terms(db_session, date.today()) == []
+    num_current_officers = len(await current_officers(db_session))
+
+    # a term that ended yesterday, before the daily job has run
+    ended_term = (
+        await db_session.execute(
+            select(OfficerTermDB.id, OfficerTermDB.computing_id).where(OfficerTermDB.is_active).limit(1)
+        )
+    ).one()
+    await db_session.execute(
+        update(OfficerTermDB)
+        .where(OfficerTermDB.id == ended_term.id)
+        .values(start_date=date.today() - timedelta(days=100), end_date=date.today() - timedelta(days=1))
+    )
+    # readers only trust the flag for terms whose dates are also active
+    assert len(await current_officers(db_session)) == num_current_officers - 1
+    assert ended_term.id not in [
+        term.id for term in await get_active_officer_terms(db_session, ended_term.computing_id)
+    ]
+
+    ended = await update_active_terms(db_session, date.today())
+    assert [term.id for term in ended] == [ended_term.id]
+    assert not ended[0].is_active
+    assert len(await current_officers(db_session)) == num_current_officers - 1
+    assert await update_active_terms(db_session, date.today()) == []
+
+
+async def test__officers_include_photo_variants(db_session: DBSession, admin_client: AsyncClient):
+    photo = ImageAssetDB(storage_key="images/officer.jpg", original_filename="officer.jpg", width=1200, height=1600)
+    db_session.add(photo)
+    await db_session.flush()
+    photo_id = photo.image_id
+    await db_session.commit()
+
+    response = await admin_client.get("/api/officers/current")
+    term_id = response.json()[0]["term_id"]
+    assert all(officer["photo"] is None for officer in response.json())
+    response = await admin_client.patch(f"/api/officers/term/{term_id}", json={"photo_image_id": photo_id})
+    assert response.status_code == 200
+    assert response.json()["photo_image_id"] == photo_id
+
+    for url in ["/api/officers/current", "/api/officers/all?include_future_terms=true"]:
+        response = await admin_client.get(url)
+        officer = next(officer for officer in response.json() if officer["term_id"] == term_id)
+        assert officer["photo"]["url"].endswith("/images/officer.jpg")
+        assert (officer["photo"]["width"], officer["photo"]["height"]) == (1200, 1600)
+        assert [(variant["name"], variant["width"], variant["height"]) for variant in officer["photo"]["variants"]] == [
+            ("thumbnail", 160, 213),
+            ("medium", 640, 853),
+        ]
+        assert officer["photo"]["variants"][0]["url"].endswith("/images/officer.thumbnail.jpg")
+
+    # deleting the image unlinks it from the term, and changes the roster
+    await db_session.delete(await db_session.get(ImageAssetDB, photo_id))
+    await db_session.commit()
+    response = await admin_client.get("/api/officers/current")
+    officer = next(officer for officer in response.json() if officer["term_id"] == term_id)
+    assert officer["photo"] is None
+
+
+async def test__unknown_officer_photos_are_rejected(admin_client: AsyncClient):
+    response = await admin_client.patch("/api/officers/term/1", json={"photo_image_id": 999999})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": "no image asset with photo_image_id 999999"}
+
+    new_officer = {
+        "computing_id": "nophoto",
+        "position": OfficerPositionEnum.TREASURER,
+        "start_date": date.today().isoformat(),
+        "legal_name": "No Photo",
+        "photo_image_id": 999998,
+    }
+    response = await admin_client.post("/api/officers/term", json=[new_officer])
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {"detail": "no image asset with photo_image_id 999998"}
+    response = await admin_client.get("/api/officers/terms/nophoto?include_future_terms=true")
+    assert response.json() == []
+
+
+async def test__get_current_terms_by_positions(db_session: DBSession):
+    current = await current_officers(db_session, include_private=True)
+    held_positions = {officer.position for officer in current}
+    vacant_position = next(position for position in OfficerPositionEnum if position not in held_positions)
+    positions = [vacant_position, *held_positions]
+
+    terms_by_position = await get_current_terms_by_positions(db_session, positions)
+    assert list(terms_by_position) == positions
+    assert terms_by_position[vacant_position] == []
+    for position, terms in terms_by_position.items():
+        assert [term.id for term in terms] == [officer.term_id for officer in current if officer.position == position]
+    assert await get_current_terms_by_positions(db_session, []) == {}
+
+    # only the terms of the given officer
+    officer = current[0]
+    terms = await get_current_terms_by_position(db_session, officer.position, officer.computing_id)
+    assert terms and all(term.computing_id == officer.computing_id for term in terms)
+    assert await get_current_terms_by_position(db_session, officer.position, "blarg") == []
+
+    # terms without an end date are current
+    await patch_officer_term_or_raise(db_session, officer.term_id, {"end_date": None})
+    terms = await get_current_terms_by_position(db_session, officer.position, officer.computing_id)
+    assert officer.term_id in [term.id for term in terms]
+
+    # a term added before it started is found on its first day, before the daily job has run
+    upcoming = OfficerTermDB(
+        computing_id=officer.computing_id, position=vacant_position, start_date=date.today() + timedelta(days=1)
+    )
+    db_session.add(upcoming)
+    await db_session.flush()
+    assert await get_current_terms_by_position(db_session, vacant_position) == []
+    # the day passing, which doesn't touch the flag
+    await db_session.execute(
+        update(OfficerTermDB).where(OfficerTermDB.id == upcoming.id).values(start_date=date.today())
+    )
+    assert [term.id for term in await get_current_terms_by_position(db_session, vacant_position)] == [upcoming.id]
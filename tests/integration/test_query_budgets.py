@@ -0,0 +1,80 @@
+import re
+from datetime import date
+
+import pytest
+from fastapi.routing import APIRoute
+from httpx import AsyncClient, Response
+
+from main import app
+
+YEAR = date.today().year
+
+# Most SQL statements each route may issue, as counted by the Server-Timing header from `query_stats`.
+# Requests are made by the sysadmin, so the session lookup and permission checks are included. Only /auth/verify uses
+# the session cache, warmed like it is for most requests of a logged in user. If a change makes a route issue more
+# queries, make sure it isn't an N+1 before raising its budget.
+# (path, budget)
+QUERY_BUDGETS = [
+    ("/auth/user", 1),
+    ("/auth/verify", 0),
+    ("/auth/sessions/pkn4", 3),
+    ("/api/admin/database/sessions", 2),
+    ("/api/election", 3),
+    ("/api/election?with_nominees=true", 3),
+    ("/api/election/test-election-1", 3),
+    ("/api/election/test-election-1?with_nominees=true", 4),
+    ("/api/candidate", 1),
+    ("/api/candidate/test-election-1", 3),
+    ("/api/nominee", 4),
+    ("/api/nominee/pkn4", 4),
+    ("/api/officers/current", 3),
+    ("/api/officers/all", 3),
+    ("/api/officers/all?include_future_terms=true", 4),
+    ("/api/officers/search?q=person", 3),
+    ("/api/officers/terms/abc11", 2),
+    ("/api/officers/info/abc11", 3),
+    ("/api/event", 1),
+    (f"/api/event/{YEAR}", 1),
+    (f"/api/event/{YEAR}/1", 1),
+    ("/api/honorary", 3),
+    ("/api/honorary/current", 3),
+    ("/api/image", 3),
+]
+
+# GET routes that don't need a budget, because they don't query our database
+UNBUDGETED_ROUTES = {
+    "/",
+    "/auth/login",  # rate limited, covered by test_login_throughput
+    "/auth/validate",  # needs CAS, covered by test_login_throughput
+    "/api/admin/database/pool",  # needs the app's own pool, covered by test_database
+    "/kiosk/translink/realtime",
+    "/kiosk/translink/static",
+    "/kiosk/translink/schedule",
+}
+
+
+def query_count(response: Response) -> int:
+    """The number of SQL statements a request issued, from the Server-Timing header added by `query_stats`."""
+    match = re.search(r'desc="queries=(\d+)"', response.headers["Server-Timing"])
+    assert match is not None
+    return int(match.group(1))
+
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize(("path", "budget"), QUERY_BUDGETS)
+async def test__route_stays_within_its_query_budget(admin_client: AsyncClient, path: str, budget: int):
+    # the first request caches the admin's session for /auth/verify
+    await admin_client.get("/auth/verify")
+    response = await admin_client.get(path)
+
+    assert response.status_code < 400, response.text
+    assert query_count(response) <= budget
+
+
+def test__every_get_route_has_a_query_budget():
+    budgeted = {path.split("?")[0] for path, _ in QUERY_BUDGETS}
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "GET" not in route.methods or route.path in UNBUDGETED_ROUTES:
+            continue
+        pattern = re.sub(r"\{[^/]+\}", "[^/]+", route.path)
+        assert any(re.fullmatch(pattern, path) for path in budgeted), f"{route.path} has no query budget"
@@ -1,8 +1,15 @@
+from datetime import UTC, datetime, timedelta
+
 import pytest
 from fastapi import HTTPException, Request, status
 
 from api.auth import SAFE_METHODS, require_trusted_origin
+from auth.cache import CachedSession, SessionCache
+from auth.constants import SESSION_MAX_AGE, UserRole
+from auth.ratelimit import MemoryRateLimitStore, RateLimit
+from auth.renewal import SessionRenewer
 from config import settings
+from utils.permissions import EFFECTIVE_ROLES, effective_roles
 
 pytestmark = pytest.mark.unit
 
@@ -49,3 +56,105 @@ async def test__unsafe_methods_reject_an_invalid_origin(origin: str | None, monk
 
     assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
     assert exc_info.value.detail == "Invalid request"
+
+
+def make_cached_session(computing_id: str = "abc123", expires_in: timedelta = timedelta(hours=1)) -> CachedSession:
+    return CachedSession(
+        computing_id=computing_id,
+        expires_at=datetime.now(UTC) + expires_in,
+        roles=frozenset({UserRole.USER}),
+    )
+
+
+def test__effective_roles_include_the_role_hierarchy():
+    assert EFFECTIVE_ROLES[UserRole.ADMIN] == {UserRole.ADMIN, UserRole.EXEC, UserRole.USER}
+    assert EFFECTIVE_ROLES[UserRole.EXEC] == {UserRole.EXEC, UserRole.USER}
+    assert EFFECTIVE_ROLES[UserRole.USER] == {UserRole.USER}
+    assert effective_roles([]) == frozenset()
+    assert effective_roles([UserRole.USER, UserRole.EXEC]) == {UserRole.EXEC, UserRole.USER}
+
+
+def test__session_cache_returns_fresh_entries():
+    cache = SessionCache(ttl=60, max_entries=10)
+    session = make_cached_session()
+
+    cache.put(b"hash", session)
+
+    assert cache.get(b"hash") == session
+    assert cache.get(b"other") is None
+
+
+def test__session_cache_drops_stale_and_expired_entries():
+    cache = SessionCache(ttl=0, max_entries=10)
+    cache.put(b"stale", make_cached_session())
+    assert cache.get(b"stale") is None
+
+    cache = SessionCache(ttl=60, max_entries=10)
+    cache.put(b"expired", make_cached_session(expires_in=timedelta(seconds=-1)))
+    assert cache.get(b"expired") is None
+    assert len(cache) == 0
+
+
+def test__session_cache_invalidates_every_session_of_a_user():
+    cache = SessionCache(ttl=60, max_entries=10)
+    cache.put(b"first", make_cached_session("abc123"))
+    cache.put(b"second", make_cached_session("abc123"))
+    cache.put(b"other", make_cached_session("def456"))
+
+    cache.invalidate_user("abc123")
+
+    assert cache.get(b"first") is None
+    assert cache.get(b"second") is None
+    assert cache.get(b"other") is not None
+
+
+def test__session_cache_evicts_the_oldest_entry_when_full():
+    cache = SessionCache(ttl=60, max_entries=2)
+    cache.put(b"first", make_cached_session())
+    cache.put(b"second", make_cached_session())
+    cache.put(b"third", make_cached_session())
+
+    assert len(cache) == 2
+    assert cache.get(b"first") is None
+    assert cache.get(b"third") is not None
+
+
+def test__session_renewer_coalesces_renewals():
+    renewer = SessionRenewer(renewal_interval=timedelta(minutes=5), flush_interval=5)
+    recently_extended = datetime.now(UTC) + SESSION_MAX_AGE - timedelta(minutes=1)
+    due_for_renewal = datetime.now(UTC) + SESSION_MAX_AGE - timedelta(minutes=10)
+
+    assert renewer.maybe_renew(b"recent", recently_extended) is None
+    new_expires_at = renewer.maybe_renew(b"due", due_for_renewal)
+    assert new_expires_at is not None
+    assert new_expires_at > due_for_renewal
+    # already queued, so it isn't queued again
+    assert renewer.maybe_renew(b"due", due_for_renewal) is None
+    assert len(renewer) == 1
+
+
+async def test__memory_rate_limit_refills_over_time(monkeypatch: pytest.MonkeyPatch):
+    now = 1000.0
+    monkeypatch.setattr("auth.ratelimit.time.monotonic", lambda: now)
+    store = MemoryRateLimitStore()
+    limit = RateLimit(capacity=2, refill_rate=0.5)
+
+    burst = [await store.take(None, "key", limit) for _ in range(3)]
+    now += 2
+    after_refill = [await store.take(None, "key", limit) for _ in range(2)]
+
+    assert burst == [True, True, False]
+    assert after_refill == [True, False]
+
+
+async def test__memory_rate_limit_drops_the_least_recently_used_bucket():
+    store = MemoryRateLimitStore(max_entries=2)
+    limit = RateLimit(capacity=1, refill_rate=0.001)
+
+    await store.take(None, "first", limit)
+    await store.take(None, "second", limit)
+    await store.take(None, "third", limit)
+
+    assert len(store) == 2
+    assert await store.take(None, "first", limit)
+    assert not await store.take(None, "third", limit)
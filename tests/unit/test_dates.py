@@ -1,6 +1,6 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
-from data.semesters import current_semester, current_semester_start, step_semesters
+from data.semesters import current_semester, current_semester_start, earliest_date_within_semesters, step_semesters
 
 
 def test_semesters():
@@ -37,3 +37,14 @@ def test_semesters():
     assert step_semesters(start3, -4).year == start3.year - 2
 
     assert str(current_semester(start1)) == "fall"
+
+
+def test_earliest_date_within_semesters():
+    days = [date(2020, 1, 1) + timedelta(days=i) for i in range(6 * 365)]
+    # around every semester start, where the cutoff moves
+    todays = [day + timedelta(days=offset) for day in days[2 * 365 : 4 * 365 : 30] for offset in (-1, 0, 1)]
+    todays += [start for start in days[2 * 365 : 4 * 365] if start == current_semester_start(start)]
+    for today in todays:
+        cutoff = earliest_date_within_semesters(today, 5)
+        for day in days:
+            assert (day >= cutoff) == (today <= step_semesters(day, 5)), (today, day)
@@ -1,10 +1,14 @@
 from io import BytesIO
+from pathlib import PurePosixPath
 
 import pytest
 from fastapi import HTTPException, UploadFile, status
 from PIL import Image
 
+from image_asset.constants import IMAGE_VARIANT_WIDTHS
+from image_asset.models import image_variants
 from image_asset.urls import ALLOWED_IMAGE_TYPES, MAX_PIXELS, validate_upload
+from image_asset.variants import is_variant, variant_size, variant_storage_key
 
 pytestmark = pytest.mark.unit
 
@@ -114,3 +118,28 @@ async def test__corrupted_image():
         await validate_upload(file)
 
     assert ex.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test__variant_sizes_keep_the_aspect_ratio():
+    assert variant_size(1000, 500, 160) == (160, 80)
+    assert variant_size(3, 1000, 2) == (2, 667)
+    assert variant_size(1000, 1, 160) == (160, 1)
+    # never scaled up
+    assert variant_size(100, 50, 160) == (100, 50)
+
+
+def test__variant_storage_keys():
+    assert variant_storage_key("images/abc.jpg", "thumbnail") == "images/abc.thumbnail.jpg"
+    assert is_variant(PurePosixPath(variant_storage_key("images/abc.jpg", "medium")))
+    assert not is_variant(PurePosixPath("images/abc.jpg"))
+    assert not is_variant(PurePosixPath("images/my.photo.jpg"))
+
+
+def test__image_variants():
+    variants = image_variants("images/abc.png", 1000, 500)
+    assert [variant.name for variant in variants] == list(IMAGE_VARIANT_WIDTHS)
+    thumbnail = variants[0]
+    assert thumbnail.url.endswith("/images/abc.thumbnail.png")
+    assert (thumbnail.width, thumbnail.height) == (160, 80)
+    # images without a known size have no variants
+    assert image_variants("images/abc.png", None, None) == []
@@ -0,0 +1,32 @@
+import pytest
+
+from query_log import fingerprint, normalize_statement
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize(
+    ("statement", "expected"),
+    [
+        (
+            "SELECT officer_term.id \n  FROM officer_term\nWHERE officer_term.id = $1 AND nickname = 'o''reilly'",
+            "SELECT officer_term.id FROM officer_term WHERE officer_term.id = ? AND nickname = ?",
+        ),
+        ("SELECT * FROM t WHERE x IN ($1, $2, $3) LIMIT 10", "SELECT * FROM t WHERE x IN (...) LIMIT ?"),
+        ("INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4), ($5, $6)", "INSERT INTO t (a, b) VALUES (...)"),
+        (
+            "SELECT site_user_2.computing_id FROM site_user AS site_user_2",
+            "SELECT site_user_2.computing_id FROM site_user AS site_user_2",
+        ),
+    ],
+)
+def test__normalize_statement_strips_values(statement: str, expected: str):
+    assert normalize_statement(statement) == expected
+
+
+def test__fingerprint_ignores_the_number_of_values():
+    one = normalize_statement("SELECT * FROM t WHERE x IN ($1, $2)")
+    many = normalize_statement("SELECT * FROM t WHERE x IN ($1, $2, $3, $4)")
+
+    assert fingerprint(one) == fingerprint(many)
+    assert fingerprint(one) != fingerprint(normalize_statement("SELECT * FROM u WHERE x IN ($1, $2)"))
@@ -0,0 +1,78 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from officers.constants import OfficerPositionEnum
+from officers.models import Officer, OfficerInfo, OfficerTerm
+from officers.serialization import (
+    officer_info_json,
+    officer_term_json,
+    officer_terms_json,
+    officers_json,
+    officers_json_items,
+)
+from officers.tables import OfficerInfoDB, OfficerTermDB
+
+pytestmark = pytest.mark.unit
+
+
+def _term(term_id: int) -> OfficerTermDB:
+    return OfficerTermDB(
+        id=term_id,
+        computing_id=f"abc{term_id}",
+        position=OfficerPositionEnum.PRESIDENT,
+        start_date=date.today() - timedelta(days=term_id),
+        end_date=None if term_id % 2 else date.today(),
+        nickname="the A",
+        favourite_course_0="CMPT 120",
+        favourite_course_1=None,
+        favourite_pl_0="Python",
+        favourite_pl_1=None,
+        biography='quotes " and unicode é',
+        photo_url=None,
+    )
+
+
+def _info(computing_id: str) -> OfficerInfoDB:
+    return OfficerInfoDB(
+        computing_id=computing_id,
+        legal_name="Person A",
+        phone_number=None,
+        discord_id="1234",
+        discord_name="person_a",
+        discord_nickname=None,
+        google_drive_email=None,
+        github_username="person-a",
+    )
+
+
+def test__officer_terms_serialize_like_model_dump():
+    terms = [_term(i) for i in range(3)]
+
+    assert json.loads(officer_terms_json(terms)) == [
+        OfficerTerm.model_validate(term).model_dump(mode="json", exclude_unset=True) for term in terms
+    ]
+    assert json.loads(officer_term_json(terms[0])) == OfficerTerm.model_validate(terms[0]).model_dump(
+        mode="json", exclude_unset=True
+    )
+    assert json.loads(officer_terms_json([])) == []
+
+
+def test__officer_info_serializes_like_model_dump():
+    info = _info("abc1")
+    assert json.loads(officer_info_json(info)) == OfficerInfo.model_validate(info).model_dump(
+        mode="json", exclude_unset=True
+    )
+
+
+def test__public_officers_leave_out_private_fields():
+    officer_list = [Officer.public_fields(_term(i), _info(f"abc{i}")) for i in range(3)]
+
+    serialized = json.loads(officers_json(officer_list))
+    assert serialized == [officer.model_dump(mode="json", exclude_unset=True) for officer in officer_list]
+    assert all("computing_id" not in officer for officer in serialized)
+    # pages of items join into the same array
+    joined = b"[" + officers_json_items(officer_list[:1]) + b"," + officers_json_items(officer_list[1:]) + b"]"
+    assert json.loads(joined) == serialized
+    assert officers_json_items([]) == b""
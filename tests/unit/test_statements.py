@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+import statements
+from elections.tables import ElectionDB
+from image_asset.tables import ImageAssetDB
+from officers.tables import OfficerInfoDB, OfficerTermDB
+
+pytestmark = pytest.mark.unit
+
+
+def _compile(statement) -> tuple[str, dict]:
+    compiled = statement.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+def test__cached_statements_bind_new_values_on_every_call():
+    first_sql, first_params = _compile(statements.election_by_slug("fall-2025"))
+    second_sql, second_params = _compile(statements.election_by_slug("spring-2026"))
+
+    assert first_sql == second_sql
+    assert list(first_params.values()) == ["fall-2025"]
+    assert list(second_params.values()) == ["spring-2026"]
+
+
+def _render(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test__cached_current_officer_terms_match_the_select():
+    today = date(2026, 1, 1)
+    expected = (
+        select(OfficerTermDB, OfficerInfoDB, ImageAssetDB)
+        .join(OfficerInfoDB, OfficerTermDB.computing_id == OfficerInfoDB.computing_id)
+        .outerjoin(ImageAssetDB, OfficerTermDB.photo_image_id == ImageAssetDB.image_id)
+        .where(
+            OfficerTermDB.is_active
+            & (OfficerTermDB.start_date <= today)
+            & ((OfficerTermDB.end_date >= today) | OfficerTermDB.end_date.is_(None))
+        )
+        .order_by(OfficerTermDB.start_date.desc())
+    )
+
+    assert _render(statements.current_officer_terms(today)) == _render(expected)
+
+
+def test__cached_election_by_slug_matches_the_select():
+    expected = select(ElectionDB).where(ElectionDB.slug == "slug")
+
+    assert _render(statements.election_by_slug("slug")) == _render(expected)